@@ -7,11 +7,15 @@ This allows the package to be executed as:
 This is the standard Python way to make packages executable.
 """
 
+import logging
 import sys
 from colorama import Style, Fore
 from .agent_main import AgentMainInterface
+from .planner.logging_config import configure_logging
 
 if __name__ == "__main__":
+    # Interactive runs show the full LLM reasoning, which is logged at DEBUG level
+    configure_logging(level=logging.DEBUG)
     try:
         agent = AgentMainInterface()
         agent.run()
@@ -0,0 +1,76 @@
+"""
+JSON Utilities
+
+Serialization helpers shared across the package. orjson is used when it is
+installed, with the standard library json module as the fallback, so orjson
+stays an optional speed-up rather than a hard dependency.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def dumps_pretty(obj: Any) -> str:
+    """
+    Serialize an object to JSON text indented by 2 spaces.
+
+    Non-ASCII characters are kept as-is. Objects orjson cannot serialize
+    (e.g. non-string dictionary keys) fall back to the json module.
+
+    Args:
+        obj: JSON serializable object
+
+    Returns:
+        str: Indented JSON text
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def dumps_compact(obj: Any) -> str:
+    """
+    Serialize an object to JSON text without insignificant whitespace.
+
+    Non-ASCII characters are kept as-is. Objects orjson cannot serialize
+    (e.g. non-string dictionary keys) fall back to the json module.
+
+    Args:
+        obj: JSON serializable object
+
+    Returns:
+        str: Compact JSON text
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(data: Any) -> Any:
+    """
+    Parse JSON text (str or bytes) into Python objects.
+
+    Args:
+        data: JSON document as str or bytes
+
+    Returns:
+        Parsed Python object
+
+    Raises:
+        ValueError: If the document is not valid JSON (json.JSONDecodeError, of which
+                    orjson.JSONDecodeError is a subclass)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -10,11 +10,13 @@ Core Components:
 Helper Components:
 - BedrockClientManager: AWS Bedrock client management and load balancing
 - WorkflowProcessor: Workflow data processing and manipulation
+- configure_logging: Handler setup for the planner hot-path logging
 """
 
 # Core architecture - use absolute imports that work with sys.path modification
 from .bedrock_client_manager import BedrockClientManager
 from .iterative_planner import IterativePlanner
+from .logging_config import configure_logging
 from .utils import generate_plan, reflect_plan
 from .workflow_processor import WorkflowProcessor
 
@@ -26,4 +28,5 @@ __all__ = [
     # Helper components
     "BedrockClientManager",
     "WorkflowProcessor",
+    "configure_logging",
 ]
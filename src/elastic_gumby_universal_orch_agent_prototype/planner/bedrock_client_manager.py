@@ -6,22 +6,37 @@ for the workflow planner agent.
 """
 
 import json
+import logging
+import threading
 import time
 
 import boto3
-from colorama import Fore, Style
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of (system_prompt, tools) request templates kept per manager
+REQUEST_TEMPLATE_CACHE_SIZE = 4
 
 
 class BedrockClientManager:
     """
     Manages multiple Bedrock clients across different regions for load balancing
     and tracks usage statistics.
+
+    One manager may be shared by conversations running on several threads. Usage
+    accounting and the request template cache are guarded by locks, and each thread
+    keeps the serialized messages of its own conversation.
     """
 
     def __init__(self):
         """Initialize the Bedrock client manager."""
         self.bedrock_clients = self._initialize_bedrock_clients()
         self.client_usage = self._initialize_client_usage()
+        self._usage_lock = threading.Lock()
+        self._request_templates = {}
+        self._template_lock = threading.Lock()
+        # Per thread: id(message) -> (message, serialized message) for the conversation last sent
+        self._thread_state = threading.local()
 
     def _initialize_bedrock_clients(self):
         """
@@ -49,13 +64,9 @@ class BedrockClientManager:
                 )
                 clients[region] = client
                 successful_regions.append(region)
-                print(
-                    f"{Fore.GREEN}✓ Initialized Bedrock client for {region}{Style.RESET_ALL}"
-                )
+                logger.info("✓ Initialized Bedrock client for %s", region)
             except Exception as e:
-                print(
-                    f"{Fore.YELLOW}Warning: Failed to initialize Bedrock client for {region}: {e}{Style.RESET_ALL}"
-                )
+                logger.warning("Failed to initialize Bedrock client for %s: %s", region, e)
 
         if not clients:
             raise Exception("Failed to initialize any Bedrock clients")
@@ -70,13 +81,16 @@ class BedrockClientManager:
         - 6 requests per minute
         - 20,000 tokens per minute
 
+        Window start times use time.monotonic(), so wall-clock adjustments (e.g. NTP)
+        can neither skip a reset nor trigger a spurious long sleep.
+
         Returns:
             dict: Dictionary tracking current minute usage per region
         """
         usage = {}
         for region in self.bedrock_clients.keys():
             usage[region] = {
-                "current_minute_start": time.time(),
+                "current_minute_start": time.monotonic(),
                 "requests_this_minute": 0,
                 "tokens_this_minute": 0,
                 "total_requests": 0,
@@ -93,13 +107,23 @@ class BedrockClientManager:
         - 6 requests per minute
         - 20,000 tokens per minute
 
-        If all regions are exhausted, waits until the earliest region resets.
+        If all regions are exhausted, waits until the earliest region resets. Selection
+        holds the usage lock, so concurrent callers wait behind that reset as well.
 
         Returns:
             tuple: (selected_region, bedrock_client)
         """
+        with self._usage_lock:
+            return self._select_best_client_locked()
 
-        current_time = time.time()
+    def _select_best_client_locked(self):
+        """
+        Select the best client while the caller holds the usage lock.
+
+        Returns:
+            tuple: (selected_region, bedrock_client)
+        """
+        current_time = time.monotonic()
         best_region = None
         max_available_tokens = -1
         earliest_reset_time = float("inf")
@@ -130,21 +154,19 @@ class BedrockClientManager:
 
         # If all regions are exhausted (max_available_tokens <= 0), wait for the earliest one to reset
         if max_available_tokens <= 0:
-            print(
-                f"{Fore.YELLOW}All regions exhausted, waiting for rate limit reset...{Style.RESET_ALL}"
-            )
+            logger.warning("All regions exhausted, waiting for rate limit reset...")
 
             # Wait until the earliest region resets
             wait_time = max(0, earliest_reset_time - current_time)
             if wait_time > 0:
-                print(
-                    f"{Fore.YELLOW}Waiting {wait_time:.1f} seconds for {earliest_region} to reset...{Style.RESET_ALL}"
+                logger.warning(
+                    "Waiting %.1f seconds for %s to reset...", wait_time, earliest_region
                 )
                 time.sleep(wait_time)
 
                 # Reset the counters for the region that just reset
                 usage = self.client_usage[earliest_region]
-                usage["current_minute_start"] = time.time()
+                usage["current_minute_start"] = time.monotonic()
                 usage["requests_this_minute"] = 0
                 usage["tokens_this_minute"] = 0
 
@@ -163,8 +185,6 @@ class BedrockClientManager:
         if region not in self.client_usage:
             return
 
-        usage = self.client_usage[region]
-
         # Extract actual token usage from response metadata
         actual_tokens = 0
         if response_metadata and "usage" in response_metadata:
@@ -172,13 +192,87 @@ class BedrockClientManager:
             output_tokens = response_metadata["usage"].get("output_tokens", 0)
             actual_tokens = input_tokens + output_tokens
 
-        # Update current minute counters
-        usage["requests_this_minute"] += 1
-        usage["tokens_this_minute"] += actual_tokens
+        with self._usage_lock:
+            usage = self.client_usage[region]
+
+            # Update current minute counters
+            usage["requests_this_minute"] += 1
+            usage["tokens_this_minute"] += actual_tokens
+
+            # Update total counters
+            usage["total_requests"] += 1
+            usage["total_tokens"] += actual_tokens
+
+    def _get_request_template(self, system_prompt, tools):
+        """
+        Get the pre-serialized static part of the request body for a planning session.
+
+        The system prompt and tool definitions are constant across the interactions of
+        one planning run, so they are serialized once and only the messages and
+        max_tokens are spliced in per call. Tools and structured system prompts are keyed
+        by identity and kept referenced by the cache entry, so callers must not mutate
+        them in place.
+
+        Args:
+            system_prompt (str | list): System prompt for the model, plain or as text blocks
+            tools (list): Available tools for the model
+
+        Returns:
+            tuple: (prefix, suffix) bytes such that the full body is
+                   prefix + messages + b', "max_tokens": ' + max_tokens + suffix
+        """
+        if isinstance(system_prompt, str) or system_prompt is None:
+            system_key = system_prompt
+        else:
+            system_key = id(system_prompt)
+        key = (system_key, tuple(id(tool) for tool in tools or ()))
+        with self._template_lock:
+            template = self._request_templates.get(key)
+            if template is None:
+                static_fields = {"anthropic_version": "bedrock-2023-05-31"}
+                if system_prompt:
+                    static_fields["system"] = system_prompt
+                if tools:
+                    static_fields["tools"] = tools
+
+                prefix = (json.dumps(static_fields)[:-1] + ', "messages": ').encode()
+                template = (prefix, b"}", system_prompt, tools)
+
+                if len(self._request_templates) >= REQUEST_TEMPLATE_CACHE_SIZE:
+                    # Evict the oldest entry, dicts preserve insertion order
+                    del self._request_templates[next(iter(self._request_templates))]
+                self._request_templates[key] = template
+
+        return template[0], template[1]
+
+    def _serialize_messages(self, messages):
+        """
+        Serialize the conversation, reusing the JSON of messages sent by the previous call.
+
+        Planning conversations only grow by appending turns (and replacing the first
+        message when history is compressed), so re-encoding every earlier message on each
+        interaction makes a planning run quadratic in its history. Messages are memoized
+        by identity, per thread so concurrent conversations do not evict each other, and
+        must not be mutated in place once they have been sent.
+
+        Args:
+            messages (list): List of conversation messages
 
-        # Update total counters
-        usage["total_requests"] += 1
-        usage["total_tokens"] += actual_tokens
+        Returns:
+            bytes: JSON array identical to json.dumps(messages).encode()
+        """
+        previous = getattr(self._thread_state, "message_json", {})
+        current = {}
+        parts = []
+        for message in messages:
+            entry = previous.get(id(message))
+            if entry is None or entry[0] is not message:
+                entry = (message, json.dumps(message).encode())
+            current[id(message)] = entry
+            parts.append(entry[1])
+        # Only the messages of this thread's latest conversation are kept referenced
+        self._thread_state.message_json = current
+        return b"[" + b", ".join(parts) + b"]"
 
     def invoke_model(
         self,
@@ -187,16 +281,25 @@ class BedrockClientManager:
         max_tokens=4000,
         tools=None,
         model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
+        stream=False,
+        on_text=None,
     ):
         """
         Invoke Claude model via Bedrock using the client with most available tokens.
 
+        With stream=True the response is read from invoke_model_with_response_stream and
+        text is handed to on_text as it arrives, so output starts after the first token
+        instead of after the whole message. The returned dict has the same shape in both
+        modes.
+
         Args:
             messages (list): List of conversation messages
-            system_prompt (str): System prompt for the model
+            system_prompt (str | list): System prompt for the model, plain or as text blocks
             max_tokens (int): Maximum tokens to generate
             tools (list): Available tools for the model
             model_id (str): Bedrock model ID to use
+            stream (bool): Whether to stream the response
+            on_text (callable): Called with each text delta when streaming
 
         Returns:
             dict: Model response or error information
@@ -204,50 +307,115 @@ class BedrockClientManager:
         # Select best client (no token estimation needed)
         try:
             selected_region, bedrock_client = self.select_best_client()
-            print(f"{Fore.CYAN}Using Bedrock client in region: {selected_region} ")
+            logger.info("Using Bedrock client in region: %s", selected_region)
         except Exception as e:
             return {"error": f"Failed to select Bedrock client: {str(e)}", "region": "unknown"}
 
-        # Prepare request body
-        request_body = {
-            "messages": messages,
-            "max_tokens": max_tokens,
-            "anthropic_version": "bedrock-2023-05-31",
-        }
-
-        if system_prompt:
-            request_body["system"] = system_prompt
-
-        if tools:
-            request_body["tools"] = tools
+        # Prepare request body from the cached static template
+        prefix, suffix = self._get_request_template(system_prompt, tools)
+        request_body = (
+            prefix
+            + self._serialize_messages(messages)
+            + b', "max_tokens": '
+            + json.dumps(max_tokens).encode()
+            + suffix
+        )
 
         # Make the request
         try:
-            start_time = time.time()
+            start_time = time.monotonic()
 
-            response = bedrock_client.invoke_model(
-                modelId=model_id, body=json.dumps(request_body), contentType="application/json"
-            )
+            if stream:
+                response = bedrock_client.invoke_model_with_response_stream(
+                    modelId=model_id, body=request_body, contentType="application/json"
+                )
+                response_body = self._read_response_stream(response["body"], on_text, start_time)
+            else:
+                response = bedrock_client.invoke_model(
+                    modelId=model_id, body=request_body, contentType="application/json"
+                )
+                # Parse response
+                response_body = json.loads(response["body"].read())
 
-            end_time = time.time()
+            end_time = time.monotonic()
             response_time = end_time - start_time
 
-            # Parse response
-            response_body = json.loads(response["body"].read())
-
             # Update usage statistics with actual token usage from response
             self.update_client_usage(selected_region, response_body)
 
-            print(
-                f"{Fore.GREEN}✓ Model invocation successful (took {response_time:.2f}s){Style.RESET_ALL}"
-            )
+            logger.info("✓ Model invocation successful (took %.2fs)", response_time)
 
             return response_body
 
         except Exception as e:
 
-            self.client_usage[selected_region]["errors"] += 1
+            with self._usage_lock:
+                self.client_usage[selected_region]["errors"] += 1
 
             error_msg = f"Error invoking model in {selected_region}: {str(e)}"
-            print(f"{Fore.RED}{error_msg}{Style.RESET_ALL}")
+            logger.error(error_msg)
             return {"error": error_msg, "region": selected_region}
+
+    def _read_response_stream(self, event_stream, on_text, start_time):
+        """
+        Assemble a streamed Anthropic response into the non-streaming message format.
+
+        Text deltas are forwarded to on_text as they arrive. Tool use input arrives as
+        partial JSON strings and is parsed once its content block closes.
+
+        Args:
+            event_stream: Iterable of Bedrock response stream events
+            on_text (callable): Called with each text delta, may be None
+            start_time (float): time.monotonic() value when the request was sent
+
+        Returns:
+            dict: Message with content, stop_reason and usage like invoke_model returns
+
+        Raises:
+            Exception: If the stream carries an error event instead of a chunk
+        """
+        message = {"content": []}
+        parts = {}
+        first_token = True
+
+        for event in event_stream:
+            chunk = event.get("chunk")
+            if chunk is None:
+                raise Exception(f"Response stream error: {event}")
+
+            data = json.loads(chunk["bytes"])
+            event_type = data.get("type")
+
+            if event_type == "message_start":
+                message.update(data["message"])
+                message["content"] = []
+            elif event_type == "content_block_start":
+                block = dict(data["content_block"])
+                message["content"].append(block)
+                parts[data["index"]] = []
+            elif event_type == "content_block_delta":
+                delta = data["delta"]
+                if delta.get("type") == "text_delta":
+                    text = delta["text"]
+                    if first_token:
+                        first_token = False
+                        logger.info(
+                            "First token received after %.2fs", time.monotonic() - start_time
+                        )
+                    parts[data["index"]].append(text)
+                    if on_text is not None:
+                        on_text(text)
+                elif delta.get("type") == "input_json_delta":
+                    parts[data["index"]].append(delta["partial_json"])
+            elif event_type == "content_block_stop":
+                block = message["content"][data["index"]]
+                joined = "".join(parts.pop(data["index"], ()))
+                if block.get("type") == "tool_use":
+                    block["input"] = json.loads(joined) if joined else {}
+                elif block.get("type") == "text":
+                    block["text"] = block.get("text", "") + joined
+            elif event_type == "message_delta":
+                message.update(data.get("delta", {}))
+                message.setdefault("usage", {}).update(data.get("usage", {}))
+
+        return message
@@ -6,17 +6,30 @@ The generate_plan and reflect_plan methods are extracted as utility interfaces.
 """
 
 import json
+import logging
 from datetime import datetime
 from typing import Any, Dict, List
 
-from colorama import Fore, Style
+from colorama import Fore
 
 from elastic_gumby_universal_orch_agent_prototype.data_schema import get_workflow_schema
 from elastic_gumby_universal_orch_agent_prototype.visualizer.workflow_loader import WorkflowLoader
 
 from .bedrock_client_manager import BedrockClientManager
+from .logging_config import colorize, console_print, flush_logging
 from .workflow_processor import WorkflowProcessor
 
+logger = logging.getLogger(__name__)
+
+# Anthropic prompt caching breakpoint, marks the end of a static request prefix
+CACHE_CONTROL_EPHEMERAL = {"type": "ephemeral"}
+
+# Header of the text block that replaces compressed conversation turns
+HISTORY_SUMMARY_HEADER = "PREVIOUSLY_RECORDED_SECTIONS (earlier conversation turns were compressed):"
+
+# Maximum number of WorkflowLoader validators shared across IterativePlanner instances
+WORKFLOW_LOADER_CACHE_SIZE = 8
+
 
 class IterativePlanner:
     """
@@ -26,17 +39,28 @@ class IterativePlanner:
     generate_plan and reflect_plan are provided as utility interfaces.
     """
 
-    def __init__(self, model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0", max_interactions=20, max_tokens=8000):
+    # WorkflowLoader validators keyed by the serialized tools definition they validate
+    # against. Shared at class level so planners with different configurations reuse them.
+    _loader_cache: Dict[str, WorkflowLoader] = {}
+
+    def __init__(self, model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0", max_interactions=20, max_tokens=8000, history_window=6, stream=False):
         """
         Initialize the IterativePlanner with required components and configurations.
 
         Args:
             model_id (str): The Bedrock model ID to use for planning operations.
                           Defaults to Claude 3.7 Sonnet model.
+            history_window (int): Number of most recent assistant/user turn pairs resent
+                          verbatim to the model; older turns are compressed into a summary.
+            stream (bool): Stream model responses and print assistant text as it arrives.
         """
         self.model_id = model_id
         self.max_interactions = max_interactions
         self.max_tokens = max_tokens
+        self.history_window = history_window
+        self.stream = stream
+        # Whether streamed text has been printed since the last complete response
+        self._streamed_text = False
 
         # Initialize Claude messages history for session tracking
         self.claude_messages = {}
@@ -50,7 +74,17 @@ class IterativePlanner:
 
         self.workflowLoader = None
 
-        print(f"{Fore.GREEN}✓ IterativePlanner initialized successfully{Style.RESET_ALL}")
+        console_print(colorize(Fore.GREEN, "✓ IterativePlanner initialized successfully"))
+
+    def reset(self):
+        """
+        Drop the state of the previous planning run so a pooled planner can be reused.
+
+        claude_messages is rebound rather than cleared, since callers may still hold the
+        history returned by the previous run. Bedrock clients and caches are kept.
+        """
+        self.claude_messages = {}
+        self.workflowLoader = None
 
     def iterative_planning(self, messages, system_prompt, workflow_execution_tool, available_tools):
         """
@@ -61,7 +95,8 @@ class IterativePlanner:
 
         Args:
             messages (list): Conversation messages history for the planning session
-            system_prompt (str): System prompt defining the planning context and rules
+            system_prompt (str | list): System prompt defining the planning context and rules,
+                                        plain or as text blocks
             workflow_execution_tool (dict): Tool definition for workflow execution capabilities
             available_tools (list): list of available tools from Phase 1
 
@@ -72,27 +107,35 @@ class IterativePlanner:
         workflow_sections: List[Dict[str, Any]] = []
         final_metadata = None
         tools_definition = {tool["name"]: tool["parameters"] for tool in available_tools}
-        self.workflowLoader = WorkflowLoader(use_colors=True, tools_definition=tools_definition)
+        self.workflowLoader = self._get_workflow_loader(tools_definition)
+
+        # Static prefix of every request, marked once for server-side prompt caching
+        cached_system_prompt = self._with_cache_control(system_prompt)
+        cached_tools = [{**workflow_execution_tool, "cache_control": CACHE_CONTROL_EPHEMERAL}]
 
         # Execute main planning loop
         interaction_count = 0
         while interaction_count < self.max_interactions:
             interaction_count += 1
-            print(
-                f"\n{Fore.YELLOW}Interaction {interaction_count}: LLM analyzing and planning...{Style.RESET_ALL}"
-            )
+            logger.info("Interaction %d: LLM analyzing and planning...", interaction_count)
 
             # Get model response
             response = self.bedrock_manager.invoke_model(
                 messages=messages,
-                system_prompt=system_prompt,
+                system_prompt=cached_system_prompt,
                 max_tokens=self.max_tokens,
-                tools=[workflow_execution_tool],
+                tools=cached_tools,
                 model_id=self.model_id,
+                stream=self.stream,
+                on_text=self._print_text_delta if self.stream else None,
             )
+            if self._streamed_text:
+                # Streamed deltas are printed without newlines, end their line once the response is complete
+                console_print()
+                self._streamed_text = False
 
             if "error" in response:
-                print(f"{Fore.RED}Error in model invocation: {response['error']}{Style.RESET_ALL}")
+                logger.error("Error in model invocation: %s", response["error"])
                 break
 
             stop_reason = response.get("stop_reason", "")
@@ -101,17 +144,17 @@ class IterativePlanner:
             # Process response content
             if stop_reason == "tool_use":
                 self._process_tool_use(content_list, workflow_sections, messages)
+                self._compress_message_history(messages, workflow_sections)
             elif stop_reason == "end_turn":
                 final_metadata = self._process_final_message(content_list, messages)
                 break
             else:
-                print(
-                    f"{Fore.RED}Unexpected stop reason: {stop_reason}. Continuing with next interaction.{Style.RESET_ALL}"
+                logger.warning(
+                    "Unexpected stop reason: %s. Continuing with next interaction.", stop_reason
                 )
-                pass
 
         if interaction_count >= self.max_interactions:
-            print(f"{Fore.RED}Warning: Maximum interactions ({self.max_interactions}) reached without end_turn completion{Style.RESET_ALL}")
+            console_print(colorize(Fore.RED, f"Warning: Maximum interactions ({self.max_interactions}) reached without end_turn completion"))
 
         # Store conversation history and build final workflow
         self.claude_messages = {
@@ -119,7 +162,51 @@ class IterativePlanner:
             "interaction_count": interaction_count,
             "messages": messages,
         }
-        return self._build_final_workflow(workflow_sections, final_metadata)
+        final_workflow = self._build_final_workflow(workflow_sections, final_metadata)
+        flush_logging()
+        return final_workflow
+
+    def _with_cache_control(self, system_prompt):
+        """
+        Convert a system prompt into the structured form with a prompt caching breakpoint.
+
+        The system prompt is identical across all interactions of a planning run, so
+        marking it ephemeral lets Bedrock reuse the processed tools + system prefix
+        instead of re-reading it on every round-trip.
+
+        Args:
+            system_prompt (str | list): Plain system prompt or already structured text blocks
+
+        Returns:
+            list: System prompt text blocks, the last one carrying cache_control
+        """
+        if isinstance(system_prompt, str):
+            return [{"type": "text", "text": system_prompt, "cache_control": CACHE_CONTROL_EPHEMERAL}]
+        return system_prompt
+
+    def _get_workflow_loader(self, tools_definition):
+        """
+        Get a WorkflowLoader for the given tools definition, reusing a cached instance.
+
+        WorkflowLoader holds no per-session state besides its tools definition, so one
+        instance is shared by every planning run over the same set of tools, across
+        planner instances. The oldest loader is evicted beyond WORKFLOW_LOADER_CACHE_SIZE.
+
+        Args:
+            tools_definition (dict): Mapping of tool name to its parameter definitions
+
+        Returns:
+            WorkflowLoader: Loader validating workflows against the given tools
+        """
+        key = json.dumps(tools_definition, sort_keys=True)
+        loader = self._loader_cache.get(key)
+        if loader is None:
+            loader = WorkflowLoader(use_colors=True, tools_definition=tools_definition)
+            if len(self._loader_cache) >= WORKFLOW_LOADER_CACHE_SIZE:
+                # Evict the oldest entry, dicts preserve insertion order
+                del self._loader_cache[next(iter(self._loader_cache))]
+            self._loader_cache[key] = loader
+        return loader
 
     def _get_self_reflection_message(self, section_number):
         """
@@ -168,52 +255,87 @@ After completing this self-reflection:
         execution tool. Validates the tool input structure and routes to appropriate
         processing methods based on whether it's a new section or section update.
 
+        Independent sections may arrive as several tool_use blocks in one response
+        (parallel tool use). Each block is recorded in order and answered with its own
+        tool_result, so several sections cost a single model round trip. Blocks after the
+        first invalid one are answered as not recorded, since their section numbers
+        assume the invalid section exists.
+
         Args:
             content_list (list): List of content items from the LLM response
             workflow_sections (list): Current list of workflow sections
             messages (list): Conversation messages to update with tool results
         """
-        tool_use_id = ""
         assistant_text = ""
-        section_number = 0
-        workflow_plan = {}
+        tool_uses = []
 
         for content_item in content_list:
             if content_item.get("type") == "text":
                 text_content = content_item.get("text", "")
                 assistant_text += text_content
             elif content_item.get("type") == "tool_use":
-                workflow_plan = content_item.get("input", {})
-                tool_use_id = content_item.get("id", "")
-                # 1-based section count
-                section_number = workflow_plan.get("section_update", len(workflow_sections) + 1)
-        
-        if assistant_text:
+                tool_uses.append(content_item)
+
+        if not tool_uses:
+            # Still answer with a tool_result so the validation error reaches the model
+            tool_uses.append({})
+
+        if assistant_text and not self.stream:
+            # 1-based section count
+            section_number = tool_uses[0].get("input", {}).get(
+                "section_update", len(workflow_sections) + 1
+            )
             self._print_assistant_text(assistant_text, f"Workflow Section {section_number} Reasoning Statement")
 
-        # Prepare message structure for tool result
-        messages.append({"role": "assistant", "content": content_list})
-        messages.append(
+        # Prepare message structure for tool results
+        tool_results = [
             {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "tool_result",
-                        "tool_use_id": tool_use_id,
-                        "content": "To be decided...",
-                    }
-                ],
+                "type": "tool_result",
+                "tool_use_id": tool_use.get("id", ""),
+                "content": "To be decided...",
             }
-        )
+            for tool_use in tool_uses
+        ]
+        messages.append({"role": "assistant", "content": content_list})
+        messages.append({"role": "user", "content": tool_results})
+
+        rejected_after = None
+        for tool_use, tool_result in zip(tool_uses, tool_results):
+            if rejected_after is not None:
+                tool_result["content"] = (
+                    f"Not recorded: workflow section {rejected_after} earlier in this response was invalid. "
+                    "Resubmit this section after fixing it."
+                )
+                continue
+            workflow_plan = tool_use.get("input", {})
+            # 1-based section count, recorded sections extend workflow_sections as we go
+            section_number = workflow_plan.get("section_update", len(workflow_sections) + 1)
+            recorded, tool_result["content"] = self._record_workflow_section(
+                section_number, workflow_sections, workflow_plan
+            )
+            if not recorded:
+                rejected_after = section_number
+
+    def _record_workflow_section(self, section_number, workflow_sections, workflow_plan):
+        """
+        Validate one execute_workflow tool input and record it as a section.
+
+        Args:
+            section_number (int): 1-based section number the input creates or updates
+            workflow_sections (list): Current list of workflow sections
+            workflow_plan (dict): Tool input with the workflow section definition
 
+        Returns:
+            tuple: (recorded, content) where content is the tool_result text reporting the
+                   validation errors or the recorded section
+        """
         # Load and validate workflow plan
         result = self.workflowLoader.load_workflow_from_json_string(json.dumps(workflow_plan))
         if result["success"] is False:
             errors_str = '\n'.join(result['errors'])
-            messages[-1]["content"][0]["content"] = f"Invalid tool_input for workflow section {section_number}. Check the following errors:\n{errors_str}"
-            return
+            return False, f"Invalid tool_input for workflow section {section_number}. Check the following errors:\n{errors_str}"
         workflow_plan = result["workflow"] # use the normalized workflow structure
-        
+
         # Route to appropriate processing method
         if section_number <= len(workflow_sections):
             self._process_section_update(
@@ -224,12 +346,55 @@ After completing this self-reflection:
                 section_number, workflow_sections, workflow_plan
             )
 
-        # Set success response with self-reflection prompt
-        messages[-1]["content"][0]["content"] = (
+        # Success response with self-reflection prompt
+        return True, (
             f"Workflow section {section_number} received and recorded.\n"
             f"{self._get_self_reflection_message(section_number)}"
         )
 
+    def _compress_message_history(self, messages, workflow_sections):
+        """
+        Bound the conversation resent to the model with a sliding window.
+
+        Keeps the first user message (WORKFLOW_DESCRIPTION/USER_FEEDBACK) and the last
+        history_window assistant/user turn pairs. Older turns are dropped and replaced by a
+        summary of the recorded sections appended to the first user message, so the
+        user/assistant alternation and tool_use/tool_result pairing stay intact. Section
+        content itself is kept in workflow_sections, so nothing is lost for the final build.
+
+        Args:
+            messages (list): Conversation messages, modified in place
+            workflow_sections (list): Current list of workflow sections
+        """
+        window_size = 2 * self.history_window
+        if len(messages) <= window_size + 1:
+            return
+
+        del messages[1 : len(messages) - window_size]
+
+        sections_summary = [
+            {
+                "section_number": section.get("section_number"),
+                "name": section["workflow_plan"].get("name", ""),
+                "description": section["workflow_plan"].get("description", ""),
+            }
+            for section in workflow_sections
+        ]
+        summary_block = {
+            "type": "text",
+            "text": f"{HISTORY_SUMMARY_HEADER}\n{json.dumps(sections_summary)}",
+        }
+
+        first_content = messages[0]["content"]
+        if isinstance(first_content, str):
+            first_content = [{"type": "text", "text": first_content}]
+        else:
+            first_content = list(first_content)
+            if first_content and first_content[-1].get("text", "").startswith(HISTORY_SUMMARY_HEADER):
+                first_content.pop()  # Replace the summary of a previous compression
+        first_content.append(summary_block)
+        messages[0] = {**messages[0], "content": first_content}
+
     def _process_final_message(self, content_list, messages):
         """
         Process the final completion message from the LLM.
@@ -249,11 +414,12 @@ After completing this self-reflection:
         full_text = "".join(text_parts).strip()
 
         if full_text:
-            self._print_assistant_text(full_text, "Final Assistant Message")
+            if not self.stream:
+                self._print_assistant_text(full_text, "Final Assistant Message")
             final_metadata = self.workflow_processor.extract_final_metadata(full_text)
             if final_metadata:
-                print(
-                    f"{Fore.GREEN}✓ Extracted final metadata: {final_metadata['name']}{Style.RESET_ALL}"
+                console_print(
+                    colorize(Fore.GREEN, f"✓ Extracted final metadata: {final_metadata['name']}")
                 )
 
         messages.append({"role": "assistant", "content": content_list})
@@ -277,7 +443,7 @@ After completing this self-reflection:
         # Update the existing section
         section_index = section_number - 1
         workflow_sections[section_index]["workflow_plan"] = workflow_plan
-        print(f"{Fore.GREEN}✓ Updated workflow section {section_number}{Style.RESET_ALL}\n")
+        console_print(colorize(Fore.GREEN, f"✓ Updated workflow section {section_number}") + "\n")
 
     def _process_new_section(
         self, section_number, workflow_sections, workflow_plan
@@ -295,7 +461,7 @@ After completing this self-reflection:
         """
         # Add new section
         workflow_sections.append({"section_number": section_number, "workflow_plan": workflow_plan})
-        print(f"{Fore.GREEN}✓ Generated workflow section {section_number}{Style.RESET_ALL}\n")
+        console_print(colorize(Fore.GREEN, f"✓ Generated workflow section {section_number}") + "\n")
 
     def _build_final_workflow(self, workflow_sections, final_metadata):
         """
@@ -313,12 +479,13 @@ After completing this self-reflection:
                   or error dict if no valid sections were generated
         """
         if not workflow_sections:
-            print(f"{Fore.RED}Error: No valid workflow sections generated{Style.RESET_ALL}")
+            console_print(colorize(Fore.RED, "Error: No valid workflow sections generated"))
             return {"error": "No valid workflow sections generated"}
 
         # Combine workflow sections
-        print(
-            f"\n{Fore.BLUE}Planning completed: {len(workflow_sections)} section(s) workflow generated{Style.RESET_ALL}"
+        console_print(
+            "\n"
+            + colorize(Fore.BLUE, f"Planning completed: {len(workflow_sections)} section(s) workflow generated")
         )
         complete_workflow = self.workflow_processor.combine_workflow_sections(workflow_sections)
 
@@ -328,19 +495,33 @@ After completing this self-reflection:
 
         return complete_workflow
 
+    def _print_text_delta(self, text):
+        """
+        Print a streamed piece of assistant text without a trailing newline.
+
+        Streamed text is shown only here, so _print_assistant_text is skipped for
+        streaming planners.
+
+        Args:
+            text (str): Text delta received from the model
+        """
+        console_print(colorize(Fore.CYAN, text), end="", flush=True)
+        self._streamed_text = True
+
     def _print_assistant_text(self, assistant_text, context=""):
         """
         Display LLM assistant text with proper formatting and visual separation.
 
         Provides a consistent, readable format for displaying LLM responses with
         optional context headers and visual separators for better readability.
+        Emitted at DEBUG level, so the separators are not even built unless enabled.
 
         Args:
             assistant_text (str): The text content from the LLM assistant to display
             context (str, optional): Context description to show as a header.
                                     Defaults to "LLM Response" if not provided.
         """
-        print(f"{Fore.CYAN}{context}{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}{'─' * 80}{Style.RESET_ALL}")
-        print(assistant_text.strip())
-        print(f"{Fore.CYAN}{'─' * 80}{Style.RESET_ALL}")
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        separator = "─" * 80
+        logger.debug("%s\n%s\n%s\n%s", context, separator, assistant_text.strip(), separator)
@@ -0,0 +1,135 @@
+"""
+Planner Logging Configuration
+
+Provides the log formatter and handler setup used by the planner hot path
+(model invocation, tool use processing and assistant text display).
+"""
+
+import logging
+import logging.handlers
+import sys
+
+from colorama import Fore, Style
+
+PACKAGE_LOGGER_NAME = "elastic_gumby_universal_orch_agent_prototype"
+
+# Whether planner console output is decorated with ANSI colors, decided once at import
+USE_COLOR = hasattr(sys.stdout, "isatty") and sys.stdout.isatty()
+
+# Handler attached by configure_logging, flushed before planner console output
+_planner_handler = None
+
+
+def colorize(color, message):
+    """
+    Wrap a console message in a colorama color, or return it unchanged when not on a TTY.
+
+    Args:
+        color (str): colorama color code, e.g. Fore.GREEN
+        message (str): Message to print
+
+    Returns:
+        str: The message, colored only when stdout is a TTY
+    """
+    if not USE_COLOR:
+        return message
+    return f"{color}{message}{Style.RESET_ALL}"
+
+
+def flush_logging():
+    """
+    Write out log records buffered by the handler attached with configure_logging.
+    """
+    if _planner_handler is not None:
+        _planner_handler.flush()
+
+
+def console_print(*args, **kwargs):
+    """
+    Print planner console output after any buffered log records, so both appear in order.
+
+    Args:
+        *args: Positional arguments for print
+        **kwargs: Keyword arguments for print
+    """
+    flush_logging()
+    print(*args, **kwargs)
+
+
+class ColorFormatter(logging.Formatter):
+    """
+    Formatter that wraps records in ANSI color codes only when writing to a TTY.
+    """
+
+    LEVEL_COLORS = {
+        logging.DEBUG: Fore.CYAN,
+        logging.INFO: Fore.GREEN,
+        logging.WARNING: Fore.YELLOW,
+        logging.ERROR: Fore.RED,
+        logging.CRITICAL: Fore.RED,
+    }
+
+    def __init__(self, use_colors=False, fmt="%(message)s"):
+        """
+        Initialize the formatter.
+
+        Args:
+            use_colors (bool): Whether to inject ANSI color codes into the output
+            fmt (str): Logging format string
+        """
+        super().__init__(fmt)
+        self.use_colors = use_colors
+
+    def format(self, record):
+        """Format the record, coloring it by level if colors are enabled."""
+        message = super().format(record)
+        if not self.use_colors:
+            return message
+        return f"{self.LEVEL_COLORS.get(record.levelno, '')}{message}{Style.RESET_ALL}"
+
+
+def configure_logging(level=logging.INFO, stream=None, buffer_capacity=64):
+    """
+    Attach a handler to the package logger for CLI runs.
+
+    Colors are only emitted when the stream is a TTY. When the stream is redirected
+    to a pipe or file, records are batched through a MemoryHandler and written once
+    the buffer fills, a warning (or worse) is logged, or the planner prints to the
+    console through console_print. Records go to stdout by default, the stream the
+    planner and phases print to, so redirected output keeps its order.
+
+    Calling this more than once is a no-op, so the handler is never duplicated.
+
+    Args:
+        level (int): Logging level for the package logger
+        stream: Output stream, defaults to sys.stdout
+        buffer_capacity (int): Number of records to buffer when not attached to a TTY
+
+    Returns:
+        logging.Handler: The handler attached to the package logger
+    """
+    global _planner_handler
+
+    package_logger = logging.getLogger(PACKAGE_LOGGER_NAME)
+    for handler in package_logger.handlers:
+        if getattr(handler, "_planner_handler", False):
+            _planner_handler = handler
+            return handler
+
+    stream = stream or sys.stdout
+    is_tty = hasattr(stream, "isatty") and stream.isatty()
+
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(ColorFormatter(use_colors=is_tty))
+
+    handler: logging.Handler = stream_handler
+    if not is_tty:
+        handler = logging.handlers.MemoryHandler(
+            buffer_capacity, flushLevel=logging.WARNING, target=stream_handler
+        )
+
+    handler._planner_handler = True  # type: ignore[attr-defined]
+    _planner_handler = handler
+    package_logger.addHandler(handler)
+    package_logger.setLevel(level)
+    return handler
@@ -5,55 +5,36 @@ Utility functions for workflow planning that provide convenient interfaces
 to the core IterativePlanner.iterative_planning method.
 """
 
-import json
+import functools
+import math
+import re
+from datetime import datetime
 
-from colorama import Fore, Style
+from colorama import Fore
 
-from .iterative_planner import IterativePlanner
+from elastic_gumby_universal_orch_agent_prototype.json_utils import dumps_compact, loads
+from elastic_gumby_universal_orch_agent_prototype.visualizer.workflow_loader import WorkflowLoader
 
+from .iterative_planner import CACHE_CONTROL_EPHEMERAL, IterativePlanner
+from .logging_config import colorize, console_print
 
-def generate_plan(
-    workflow_description, 
-    available_tools, 
-    model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0", 
-    max_interactions=20, 
-    max_tokens=8000
-):
-    """
-    Generate a structured workflow plan based on the description using LLM-guided generative planning.
-
-    This utility function creates a IterativePlanner instance and uses its iterative_planning
-    method to generate a new workflow plan from scratch.
-
-    Args:
-        workflow_description (str): Natural language description of the workflow to be structured
-        available_tools (list): List of available tools
-        model_id (str): The Bedrock model ID to use for planning
+# Planners keyed by (model_id, max_interactions, max_tokens, stream), reused across calls
+_PLANNER_POOL = {}
+_PLANNER_POOL_SIZE = 4
 
-    Returns:
-        dict: The complete structured workflow plan as a dictionary following the workflow schema,
-              ready for execution by the workflow execution engine
-    """
-    print(
-        f"\n{Fore.BLUE}Starting LLM-guided generative workflow planning...{Style.RESET_ALL}"
-    )
+# execute_workflow tool definitions, keyed by tool description
+_EXECUTION_TOOL_CACHE = {}
 
-    # Create planner core instance
-    planner = IterativePlanner(model_id=model_id, max_interactions=max_interactions, max_tokens=max_tokens)
+# Shared by generate_plan and reflect_plan so both send an identical, cacheable tools prefix
+EXECUTION_TOOL_DESCRIPTION = "Execute a workflow plan section or complete workflow. This tool takes a structured workflow definition (following the workflow schema) as input. To update an existing section, include a 'section_update' property in the root level with the section number to update."
 
-    # Define the workflow execution tool
-    workflow_execution_tool = {
-        "name": "execute_workflow",
-        "description": "Execute a workflow plan section or complete workflow. This tool takes a structured workflow definition (following the workflow schema) as input. For iterative planning, include a 'section_update' property to update existing sections.",
-        "input_schema": planner.workflow_schema,
-    }
-
-    # Intelligent system prompt that lets LLM decide the approach
-    system_prompt = """
-You are an AI assistant specialized in workflow orchestration and planning. You will analyze the WORKFLOW_DESCRIPTION and AVAILABLE_TOOLS to determine the best planning approach.
+# Planning rules shared by generate_plan and reflect_plan. Both utilities send this block
+# first, behind a prompt caching breakpoint, so they share one cached prefix on the server.
+SYSTEM_PROMPT_COMMON = """
+You are an AI assistant specialized in workflow orchestration and planning. You will analyze the request and AVAILABLE_TOOLS to determine the best planning approach.
 
 **ADAPTIVE PLANNING STRATEGY:**
-First, analyze the WORKFLOW_DESCRIPTION and AVAILABLE_TOOLS to determine complexity:
+First, analyze the request and AVAILABLE_TOOLS to determine complexity:
 - **Simple workflows** (few steps, straightforward logic): Generate the complete workflow in ONE interaction
 - **Complex workflows** (many steps, complex logic, multiple branches): Use iterative planning with multiple sections
 
@@ -69,6 +50,7 @@ First, analyze the WORKFLOW_DESCRIPTION and AVAILABLE_TOOLS to determine complex
 
 **FOR COMPLEX WORKFLOWS:**
 - Break down into logical sections and use execute_workflow tool for each section
+- Sections that do not depend on each other can be generated together as multiple execute_workflow tool uses in one response
 - Iterative reflection: review previous sections and update if needed using input_schema with "section_update" property
 - Continue until all sections are complete, then respond with COMPLETION_SIGNAL
 
@@ -77,6 +59,54 @@ When the workflow is complete (whether simple or complex), respond with text onl
 {"name": "Workflow name", "description": "Brief description of what the workflow accomplishes"}
 No need to re-generate the combined workflow that includes all sections, that will be handled by the workflow execution engine.
 
+**WORKFLOW DESIGN PRINCIPLES:**
+- **Avoid unnecessary complexity** - don't add extra tool_call or user_input unless specifically required
+- **Tool_call must be from AVAILABLE_TOOLS list** - Never create tool_call nodes with tools not explicitly provided
+- **Event-based synchronization** - use wait_for_event when needed to synchronize workflow steps or receive notifications
+"""
+
+# Task specific suffix for generating a new workflow from a description
+SYSTEM_PROMPT_GENERATE_TASK = """
+**TASK: PLAN FROM A WORKFLOW_DESCRIPTION**
+The request is a WORKFLOW_DESCRIPTION. Generate a new workflow that implements it with the AVAILABLE_TOOLS.
+- **Keep workflows focused and minimal** - only include steps that directly address the core logic in WORKFLOW_DESCRIPTION
+- **Create meaningful conditions** - never use static comparisons that always evaluate the same way
+- **Cautious on branch and loop** - Only use branches and loops when there are genuine decision points
+- **Avoid nested containers** - use "sequence" only with multiple steps and "parallel" with multiple branches
+"""
+
+# Task specific suffix for continuous reflection with iterative updates
+SYSTEM_PROMPT_REFLECT_TASK = """
+**TASK: REFLECT ON AN EXISTING_WORKFLOW_PLAN**
+The request is an EXISTING_WORKFLOW_PLAN with USER_FEEDBACK. Work with me to generate a new workflow plan that incorporates the requested feedback.
+- **Focus only on changes requested** in the user feedback - do not add unrequested features
+- **Preserve existing workflow elements** that are not mentioned in the feedback
+"""
+
+# System prompts as text blocks: the shared rules carry the cache breakpoint, the task
+# suffix follows it uncached
+SYSTEM_PROMPT_GENERATE = [
+    {"type": "text", "text": SYSTEM_PROMPT_COMMON, "cache_control": CACHE_CONTROL_EPHEMERAL},
+    {"type": "text", "text": SYSTEM_PROMPT_GENERATE_TASK},
+]
+
+SYSTEM_PROMPT_REFLECT = [
+    {"type": "text", "text": SYSTEM_PROMPT_COMMON, "cache_control": CACHE_CONTROL_EPHEMERAL},
+    {"type": "text", "text": SYSTEM_PROMPT_REFLECT_TASK},
+]
+
+# Shorter generation prompt for workflows triaged as simple, without the multi-section guidance
+SYSTEM_PROMPT_GENERATE_SIMPLE = """
+You are an AI assistant specialized in workflow orchestration and planning. You will analyze the WORKFLOW_DESCRIPTION and AVAILABLE_TOOLS and generate the complete workflow in ONE interaction.
+
+**TOOL_USE STOP:**
+- Use execute_workflow tool ONCE with "name", "descripion", "root" properties describing the complete workflow
+- Always include "root" property with the structured workflow definition in input_schema
+
+**COMPLETION_SIGNAL:**
+After the workflow has been generated, respond with text only (no TOOL_USE) containing ONLY this JSON format:
+{"name": "Workflow name", "description": "Brief description of what the workflow accomplishes"}
+
 **WORKFLOW DESIGN PRINCIPLES:**
 - **Keep workflows focused and minimal** - only include steps that directly address the core logic in WORKFLOW_DESCRIPTION
 - **Avoid unnecessary complexity** - don't add extra tool_call or user_input unless specifically required
@@ -87,23 +117,368 @@ No need to re-generate the combined workflow that includes all sections, that wi
 - **Event-based synchronization** - use wait_for_event when needed to synchronize workflow steps or receive notifications
 """
 
+# Longest description, in words, that the rule-based fast path may plan without the model
+FAST_PATH_MAX_WORDS = 20
+
+# "param=value" assignments in a description, values may be quoted
+_PARAM_ASSIGNMENT_RE = re.compile(r"\b([A-Za-z_]\w*)\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s,;]+)")
+
+# Words a fast-path description may contain besides the tool name and its assignments
+FAST_PATH_FILLER_WORDS = frozenset((
+    "a", "and", "args", "arguments", "call", "execute", "for", "invoke", "of", "parameters",
+    "params", "please", "run", "set", "the", "tool", "use", "using", "with",
+))
+
+# Fast model used for the optional complexity triage before planning
+DEFAULT_TRIAGE_MODEL_ID = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+
+# System prompt for the complexity triage request
+SYSTEM_PROMPT_TRIAGE = """
+You classify workflow planning requests. Given a WORKFLOW_DESCRIPTION and the names of the AVAILABLE_TOOLS, decide whether the workflow is:
+- "simple": few steps, straightforward logic, can be generated in one response
+- "complex": many steps, complex logic or multiple branches, needs several sections
+
+Respond with ONLY this JSON format and nothing else:
+{"complexity": "simple" or "complex", "estimated_sections": number}
+"""
+
+
+
+def _get_planner(model_id, max_interactions, max_tokens, stream):
+    """
+    Get a pooled IterativePlanner for the given configuration, reset for a new run.
+
+    Creating a planner initializes a Bedrock client per region, which parses the service
+    model and sets up TLS connections. Pooled planners keep those clients, their rate
+    limit accounting and request templates warm across generate_plan / reflect_plan
+    calls. Planners are not safe for concurrent planning runs.
+
+    Args:
+        model_id (str): The Bedrock model ID to use for planning
+        max_interactions (int): Maximum number of model interactions per planning run
+        max_tokens (int): Maximum tokens per model response
+        stream (bool): Whether model responses are streamed
+
+    Returns:
+        IterativePlanner: Planner ready for a new planning run
+    """
+    key = (model_id, max_interactions, max_tokens, stream)
+    planner = _PLANNER_POOL.get(key)
+    if planner is None:
+        planner = IterativePlanner(
+            model_id=model_id, max_interactions=max_interactions, max_tokens=max_tokens, stream=stream
+        )
+        if len(_PLANNER_POOL) >= _PLANNER_POOL_SIZE:
+            # Evict the oldest entry, dicts preserve insertion order
+            del _PLANNER_POOL[next(iter(_PLANNER_POOL))]
+        _PLANNER_POOL[key] = planner
+    else:
+        planner.reset()
+    return planner
+
+
+def _get_execution_tool(description, workflow_schema):
+    """
+    Get the execute_workflow tool definition for a description and workflow schema.
+
+    The definition is built once and the same object is returned for later calls with
+    an equal schema, even when each planner has loaded its own schema copy.
+
+    Args:
+        description (str): Tool description shown to the model
+        workflow_schema (dict): Workflow schema used as the tool input_schema
+
+    Returns:
+        dict: The execute_workflow tool definition
+    """
+    tool = _EXECUTION_TOOL_CACHE.get(description)
+    if tool is not None and (
+        tool["input_schema"] is workflow_schema or tool["input_schema"] == workflow_schema
+    ):
+        return tool
+
+    tool = {
+        "name": "execute_workflow",
+        "description": description,
+        "input_schema": workflow_schema,
+    }
+    _EXECUTION_TOOL_CACHE[description] = tool
+    return tool
+
+
+def _triage_workflow_complexity(planner, workflow_description, available_tools, triage_model_id):
+    """
+    Classify a workflow description as simple or complex with a small, fast model call.
+
+    Only the tool names are sent, so the request stays a fraction of the size of a
+    planning request. Any failure falls back to "complex", the full planning path.
+
+    Args:
+        planner (IterativePlanner): Planner whose Bedrock client manager is used
+        workflow_description (str): Natural language description of the workflow
+        available_tools (list): List of available tools
+        triage_model_id (str): The Bedrock model ID to use for the triage request
+
+    Returns:
+        str: "simple" or "complex"
+    """
+    tool_names = ", ".join(tool.get("name", "") for tool in available_tools)
+    response = planner.bedrock_manager.invoke_model(
+        messages=[
+            {
+                "role": "user",
+                "content": f"WORKFLOW_DESCRIPTION:\n{workflow_description}\n\nAVAILABLE_TOOLS:\n{tool_names}",
+            }
+        ],
+        system_prompt=SYSTEM_PROMPT_TRIAGE,
+        max_tokens=100,
+        model_id=triage_model_id,
+    )
+
+    try:
+        text = "".join(
+            block.get("text", "") for block in response.get("content", []) if block.get("type") == "text"
+        )
+        triage = loads(text[text.index("{") : text.rindex("}") + 1])
+        complexity = triage.get("complexity")
+    except (AttributeError, TypeError, ValueError):
+        complexity = None
+
+    if complexity != "simple":
+        return "complex"
+
+    console_print(colorize(Fore.BLUE, "Workflow triaged as simple, generating it in one pass"))
+    return "simple"
+
+
+def _coerce_parameter_value(value, param_type):
+    """
+    Convert a parameter value written in a description to its declared JSON type.
+
+    Args:
+        value (str): Parameter value as written, without surrounding quotes
+        param_type (str): Declared type of the tool parameter, e.g. "number" or "boolean"
+
+    Returns:
+        The value converted to the declared type; strings and undeclared types are kept as-is
+
+    Raises:
+        ValueError: If the value does not fit the declared type, or the type is object or array
+    """
+    if param_type == "integer":
+        return int(value)
+    if param_type == "number":
+        try:
+            return int(value)
+        except ValueError:
+            number = float(value)
+        if not math.isfinite(number):
+            raise ValueError(f"Not a finite number: {value}")
+        return number
+    if param_type == "boolean":
+        lowered = value.lower()
+        if lowered not in ("true", "false"):
+            raise ValueError(f"Not a boolean: {value}")
+        return lowered == "true"
+    if param_type in ("object", "array"):
+        # Assignments stop at commas and whitespace, so structured values are left to the model
+        raise ValueError(f"Unsupported {param_type} parameter value: {value}")
+    return value
+
+
+@functools.lru_cache(maxsize=256)
+def _match_single_tool_call(workflow_description, tools_key):
+    """
+    Match a trivial description such as "call tool_name with param=value" to one tool.
+
+    The description must be short, name exactly one tool, assign a static value to
+    every parameter of that tool and nothing else, and hold no words besides
+    FAST_PATH_FILLER_WORDS, so follow-up intent is never dropped. Values are converted to the declared
+    parameter types, and a value that does not fit its type leaves the description to
+    the model. Anything less clear-cut is left to the model too.
+
+    Args:
+        workflow_description (str): Natural language description of the workflow
+        tools_key (tuple): (tool name, ((parameter name, parameter type), ...)) pairs of the available tools
+
+    Returns:
+        tuple: (tool name, ((parameter name, value), ...)) or None if there is no clean match
+    """
+    if len(workflow_description.split()) > FAST_PATH_MAX_WORDS or "{%" in workflow_description:
+        return None
+
+    # Drop assignments before looking for tool names, so values cannot name a tool
+    assignments = _PARAM_ASSIGNMENT_RE.findall(workflow_description)
+    prose = _PARAM_ASSIGNMENT_RE.sub(" ", workflow_description)
+    matches = [
+        (name, params)
+        for name, params in tools_key
+        if re.search(rf"(?<![\w-]){re.escape(name)}(?![\w-])", prose)
+    ]
+    if len(matches) != 1:
+        return None
+
+    tool_name, params = matches[0]
+    remaining_words = re.sub(rf"(?<![\w-]){re.escape(tool_name)}(?![\w-])", " ", prose)
+    if not set(re.findall(r"[^\W_]+", remaining_words.lower())) <= FAST_PATH_FILLER_WORDS:
+        return None
+    param_types = dict(params)
+    parameters = {key: value.strip("\"'") for key, value in assignments}
+    if len(parameters) != len(assignments) or set(parameters) != set(param_types):
+        return None
+    try:
+        parameters = {key: _coerce_parameter_value(value, param_types[key]) for key, value in parameters.items()}
+    except ValueError:
+        return None
+    return tool_name, tuple(sorted(parameters.items()))
+
+
+def _fast_path_plan(workflow_description, available_tools):
+    """
+    Build a single tool_call workflow for a trivial description without invoking the model.
+
+    The plan is loaded and validated with WorkflowLoader against the available tools,
+    like the model's workflow sections are.
+
+    Args:
+        workflow_description (str): Natural language description of the workflow
+        available_tools (list): List of available tools
+
+    Returns:
+        dict: Workflow plan with a single tool_call root, or None if the description is not
+              trivial or the plan does not validate
+    """
+    tools_key = tuple(
+        (tool["name"], tuple((param["name"], param.get("type")) for param in tool.get("parameters", [])))
+        for tool in available_tools
+    )
+    match = _match_single_tool_call(workflow_description.strip(), tools_key)
+    if match is None:
+        return None
+
+    tool_name, parameters = match
+    workflow_plan = {
+        "name": f"Call {tool_name}",
+        "description": workflow_description.strip(),
+        "root": {
+            "type": "tool_call",
+            "description": workflow_description.strip(),
+            "toolName": tool_name,
+            "parameters": dict(parameters),
+            "outputVariable": f"{tool_name}_result",
+        },
+    }
+
+    tools_definition = {tool["name"]: tool.get("parameters", []) for tool in available_tools}
+    loader = WorkflowLoader(use_colors=False, tools_definition=tools_definition, quiet=True)
+    result = loader.load_workflow_from_json_string(dumps_compact(workflow_plan))
+    if not result["success"]:
+        return None
+    return result["workflow"]
+
+
+def _build_initial_content(static_context, dynamic_context):
+    """
+    Build the first user message content with the static context behind a cache breakpoint.
+
+    The static context (AVAILABLE_TOOLS and, for reflection, EXISTING_WORKFLOW_PLAN) is
+    identical for every interaction of a planning run, so it is placed first and marked
+    ephemeral to extend the cached tools + system prefix. The per-request text follows.
+
+    Args:
+        static_context (str): Text that stays constant across the planning run
+        dynamic_context (str): Request specific instructions and inputs
+
+    Returns:
+        list: Text content blocks for the first user message
+    """
+    return [
+        {"type": "text", "text": static_context, "cache_control": CACHE_CONTROL_EPHEMERAL},
+        {"type": "text", "text": dynamic_context},
+    ]
+
+
+def generate_plan(
+    workflow_description, 
+    available_tools, 
+    model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0", 
+    max_interactions=20, 
+    max_tokens=8000,
+    stream=False,
+    triage_model_id=None,
+    fast_path=False
+):
+    """
+    Generate a structured workflow plan based on the description using LLM-guided generative planning.
+
+    This utility function gets a pooled IterativePlanner instance and uses its iterative_planning
+    method to generate a new workflow plan from scratch.
+
+    Args:
+        workflow_description (str): Natural language description of the workflow to be structured
+        available_tools (list): List of available tools
+        model_id (str): The Bedrock model ID to use for planning
+        stream (bool): Stream model responses so assistant text is shown as it arrives
+        triage_model_id (str): Optional fast model ID (e.g. DEFAULT_TRIAGE_MODEL_ID) used to
+                              classify the workflow first; simple workflows are then planned
+                              with the shorter single-pass system prompt
+        fast_path (bool): Plan trivial "call tool_name with param=value" descriptions
+                          directly as a single tool_call, without invoking the model
+
+    Returns:
+        dict: The complete structured workflow plan as a dictionary following the workflow schema,
+              ready for execution by the workflow execution engine
+    """
+    console_print(
+        "\n" + colorize(Fore.BLUE, "Starting LLM-guided generative workflow planning...")
+    )
+
+    if fast_path:
+        workflow_plan = _fast_path_plan(workflow_description, available_tools)
+        if workflow_plan is not None:
+            console_print(colorize(Fore.GREEN, f"✓ Planned as a single {workflow_plan['root']['toolName']} call"))
+            claude_messages = {
+                "timestamp": datetime.now().isoformat(),
+                "interaction_count": 0,
+                "messages": [],
+            }
+            return workflow_plan, claude_messages
+
+    # Reuse a pooled planner core instance
+    planner = _get_planner(model_id, max_interactions, max_tokens, stream)
+
+    # Define the workflow execution tool
+    workflow_execution_tool = _get_execution_tool(
+        EXECUTION_TOOL_DESCRIPTION, planner.workflow_schema
+    )
+
+    system_prompt = SYSTEM_PROMPT_GENERATE
+    if triage_model_id and (
+        _triage_workflow_complexity(planner, workflow_description, available_tools, triage_model_id)
+        == "simple"
+    ):
+        system_prompt = SYSTEM_PROMPT_GENERATE_SIMPLE
+
     # Initialize conversation
     messages = [
         {
             "role": "user",
-            "content": f"""
-Analyze this WORKFLOW_DESCRIPTION and create a structured workflow definition. Choose the most appropriate planning approach based on the complexity.
+            "content": _build_initial_content(
+                f"""
+AVAILABLE_TOOLS:
+{dumps_compact(available_tools)}
+""",
+                f"""
+Analyze this WORKFLOW_DESCRIPTION and create a structured workflow definition using the AVAILABLE_TOOLS above. Choose the most appropriate planning approach based on the complexity.
 
 WORKFLOW_DESCRIPTION:
 {workflow_description}
 
-AVAILABLE_TOOLS:
-{json.dumps(available_tools, indent=2)}
-
 Because of {max_tokens} max_tokens per response limitation, please analyze the overall complexity and break down the plan into multiple logical sections if needed.
 
 Start your analysis, then generate workflow section 1 via execute_workflow tool.
 """,
+            ),
         }
     ]
 
@@ -123,12 +498,13 @@ def reflect_plan(
     available_tools,
     model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
     max_interactions=20,
-    max_tokens=8000
+    max_tokens=8000,
+    stream=False
 ):
     """
     Reflect on and update an existing workflow plan based on user feedback using continuous Claude model interactions.
 
-    This utility function creates a IterativePlanner instance and uses its iterative_planning
+    This utility function gets a pooled IterativePlanner instance and uses its iterative_planning
     method to modify an existing workflow plan based on user feedback.
 
     Args:
@@ -136,89 +512,54 @@ def reflect_plan(
         user_feedback (str): User feedback describing what changes are needed
         available_tools (list): List of available tools
         model_id (str): The Bedrock model ID to use for planning
+        stream (bool): Stream model responses so assistant text is shown as it arrives
 
     Returns:
         dict: The updated structured workflow plan as a dictionary following the workflow schema,
               ready for execution by the workflow execution engine
     """
-    print(
-        f"\n{Fore.BLUE}Starting continuous workflow reflection process...{Style.RESET_ALL}"
+    console_print(
+        "\n" + colorize(Fore.BLUE, "Starting continuous workflow reflection process...")
     )
 
-    # Create planner core instance
-    planner = IterativePlanner(model_id=model_id, max_interactions=max_interactions, max_tokens=max_tokens)
+    # Reuse a pooled planner core instance
+    planner = _get_planner(model_id, max_interactions, max_tokens, stream)
 
     # Define the workflow execution tool - same as generate_plan
-    workflow_execution_tool = {
-        "name": "execute_workflow",
-        "description": "Execute a partial workflow plan section or update an existing section. This tool takes a structured workflow definition (following the workflow schema) as input for a specific section of the overall workflow. To update an existing section, include a 'section_update' property in the root level with the section number to update.",
-        "input_schema": planner.workflow_schema,
-    }
-
-    # Construct the system prompt for continuous reflection with iterative updates
-    system_prompt = """
-You are an AI assistant specialized in workflow orchestration and planning. You will work with me to analyze an EXISTING_WORKFLOW_PLAN and USER_FEEDBACK, then generate a new workflow plan that incorporates the requested feedback.
-
-**ADAPTIVE PLANNING STRATEGY:**
-First, analyze the EXISTING_WORKFLOW_PLAN and USER_FEEDBACK to determine complexity:
-- **Simple workflows** (few steps, straightforward logic): Generate the complete workflow in ONE interaction
-- **Complex workflows** (many steps, complex logic, multiple branches): Use iterative planning with multiple sections
-
-**TOOL_USE STOP:**
-- To generate new section, use execute_workflow tool with "name", "descripion", "root" properties
-- To update previous section, use execute_workflow tool with "name", "descripion", "root" and "section_update" properties
-- Always include "root" property with the structured workflow definition in input_schema
-
-**FOR SIMPLE WORKFLOWS:**
-- Use execute_workflow tool ONCE with the complete workflow structure
-- Include all necessary steps in a well-structured workflow
-- Focus on efficiency and completeness
-
-**FOR COMPLEX WORKFLOWS:**
-- Break down into logical sections and use execute_workflow tool for each section
-- Iterative reflection: review previous sections and update if needed using input_schema with "section_update" property
-- Continue until all sections are complete, then respond with COMPLETION_SIGNAL
-
-**COMPLETION_SIGNAL:**
-When the workflow is complete (whether simple or complex), respond with text only (no TOOL_USE) containing ONLY this JSON format:
-{"name": "Workflow name", "description": "Brief description of what the workflow accomplishes"}
-No need to re-generate the combined workflow that includes all sections, that will be handled by the workflow execution engine.
-
-**WORKFLOW DESIGN PRINCIPLES:**
-- **Focus only on changes requested** in the user feedback - do not add unrequested features
-- **Preserve existing workflow elements** that are not mentioned in the feedback
-- **Avoid unnecessary complexity** - don't add extra tool_call or user_input unless specifically required
-- **Tool_call must be from AVAILABLE_TOOLS list** - Never create tool_call nodes with tools not explicitly provided
-- **Event-based synchronization** - use wait_for_event when needed to synchronize workflow steps or receive notifications
-"""
+    workflow_execution_tool = _get_execution_tool(
+        EXECUTION_TOOL_DESCRIPTION, planner.workflow_schema
+    )
 
     # Initialize conversation with the existing workflow and feedback
     messages = [
         {
             "role": "user",
-            "content": f"""
-I need you to help me generate a new workflow plan based on EXISTING_WORKFLOW_PLAN, specific USER_FEEDBACK and AVAILABLE_TOOLS.
+            "content": _build_initial_content(
+                f"""
+AVAILABLE_TOOLS:
+{dumps_compact(available_tools)}
 
 EXISTING_WORKFLOW_PLAN:
-{json.dumps(existing_workflow_plan, indent=2)}
+{dumps_compact(existing_workflow_plan)}
+""",
+                f"""
+I need you to help me generate a new workflow plan based on the EXISTING_WORKFLOW_PLAN and AVAILABLE_TOOLS above, and the specific USER_FEEDBACK below.
 
 USER_FEEDBACK:
 {user_feedback}
 
-AVAILABLE_TOOLS:
-{json.dumps(available_tools, indent=2)}
-
 Because of {max_tokens} max_tokens per response limitation, please analyze the overall complexity and break down the plan into multiple logical sections if needed.
 
 Start your analysis, then generate workflow section 1 via execute_workflow tool.
 """,
+            ),
         }
     ]
 
     # Execute the reflection process using the core method
     updated_plan = planner.iterative_planning(
         messages=messages,
-        system_prompt=system_prompt,
+        system_prompt=SYSTEM_PROMPT_REFLECT,
         workflow_execution_tool=workflow_execution_tool,
         available_tools=available_tools,
     )
@@ -5,7 +5,15 @@ Handles workflow data processing, section combination, and metadata extraction.
 """
 
 import re
-from colorama import Fore, Style
+from colorama import Fore
+
+from elastic_gumby_universal_orch_agent_prototype.json_utils import loads
+
+from .logging_config import colorize, console_print
+
+# Patterns for the COMPLETION_SIGNAL metadata: {"name": "...", "description": "..."}
+_NAME_RE = re.compile(r'"name"\s*:\s*"([^"]*)"')
+_DESC_RE = re.compile(r'"description"\s*:\s*"([^"]*)"')
 
 
 class WorkflowProcessor:
@@ -22,6 +30,9 @@ class WorkflowProcessor:
         Extract name and description from Claude's final text response.
         Expected format: {"name": "...", "description": "..."}
 
+        The trailing {...} object is parsed as JSON first, which also handles escaped
+        quotes; the regex scan is only the fallback for responses that are not valid JSON.
+
         Args:
             text_response (str): The final text response from Claude
 
@@ -31,11 +42,12 @@ class WorkflowProcessor:
         try:
             text_response = text_response.strip()
 
-            name_pattern = r'"name"\s*:\s*"([^"]*)"'
-            desc_pattern = r'"description"\s*:\s*"([^"]*)"'
+            metadata = self._parse_metadata_json(text_response)
+            if metadata:
+                return metadata
 
-            name_match = re.search(name_pattern, text_response)
-            desc_match = re.search(desc_pattern, text_response)
+            name_match = _NAME_RE.search(text_response)
+            desc_match = _DESC_RE.search(text_response)
 
             if name_match and desc_match:
                 return {
@@ -43,21 +55,91 @@ class WorkflowProcessor:
                     "description": desc_match.group(1).strip(),
                 }
 
-            print(
-                f"{Fore.YELLOW}Warning: Could not extract final metadata from response{Style.RESET_ALL}"
+            console_print(
+                colorize(Fore.YELLOW, "Warning: Could not extract final metadata from response")
             )
             return {}
 
         except Exception as e:
-            print(
-                f"{Fore.YELLOW}Warning: Error extracting final metadata: {e}{Style.RESET_ALL}"
+            console_print(
+                colorize(Fore.YELLOW, f"Warning: Error extracting final metadata: {e}")
             )
             return {}
 
+    def _parse_metadata_json(self, text_response):
+        """
+        Parse the metadata object that closes the response.
+
+        The COMPLETION_SIGNAL object is expected at the end of the response, so the scan
+        starts from the last "}" and walks backwards to its matching "{", touching only
+        the suffix instead of the whole text. If that span is not valid JSON (e.g. a
+        brace inside a string value), the outermost {...} span is tried instead.
+
+        Args:
+            text_response (str): The stripped final text response from Claude
+
+        Returns:
+            dict: Dictionary with 'name' and 'description' keys, or empty dict if no span
+                  is a JSON object with both string fields
+        """
+        end = text_response.rfind("}")
+        if end == -1:
+            return {}
+
+        depth = 0
+        start = -1
+        for index in range(end, -1, -1):
+            char = text_response[index]
+            if char == "}":
+                depth += 1
+            elif char == "{":
+                depth -= 1
+                if depth == 0:
+                    start = index
+                    break
+
+        metadata = self._load_metadata(text_response, start, end)
+        if not metadata:
+            outer_start = text_response.find("{")
+            if outer_start != start:
+                metadata = self._load_metadata(text_response, outer_start, end)
+        return metadata
+
+    def _load_metadata(self, text_response, start, end):
+        """
+        Load text_response[start:end + 1] as a metadata object.
+
+        Args:
+            text_response (str): The stripped final text response from Claude
+            start (int): Index of the opening "{", or -1 if there is none
+            end (int): Index of the closing "}"
+
+        Returns:
+            dict: Dictionary with 'name' and 'description' keys, or empty dict if the span
+                  is not a JSON object with both string fields
+        """
+        if start == -1 or end < start:
+            return {}
+
+        try:
+            data = loads(text_response[start : end + 1])
+        except ValueError:
+            return {}
+
+        if not isinstance(data, dict):
+            return {}
+        name = data.get("name")
+        description = data.get("description")
+        if not isinstance(name, str) or not isinstance(description, str):
+            return {}
+        return {"name": name.strip(), "description": description.strip()}
+
     def combine_workflow_sections(self, workflow_sections):
         """
         Combine multiple workflow sections into a single cohesive workflow.
 
+        A single section with a root is returned directly without printing progress.
+
         Args:
             workflow_sections (list): List of workflow section dictionaries
 
@@ -67,8 +149,20 @@ class WorkflowProcessor:
         if not workflow_sections:
             return {"error": "No workflow sections to combine"}
 
-        print(
-            f"{Fore.BLUE}Combining {len(workflow_sections)} workflow sections...{Style.RESET_ALL}"
+        # A single complete section is already the combined workflow
+        if len(workflow_sections) == 1:
+            section_plan = workflow_sections[0]["workflow_plan"]
+            if "root" in section_plan:
+                return {
+                    "name": section_plan.get("name", "Combined Workflow"),
+                    "description": section_plan.get(
+                        "description", "Multi-section workflow execution"
+                    ),
+                    "root": section_plan["root"],
+                }
+
+        console_print(
+            colorize(Fore.BLUE, f"Combining {len(workflow_sections)} workflow sections...")
         )
 
         # Extract metadata from first section
@@ -77,19 +171,17 @@ class WorkflowProcessor:
         combined_description = first_section.get("description", "Multi-section workflow execution")
 
         # Collect all steps from all sections
-        all_steps = []
-        for i, section in enumerate(workflow_sections):
-            section_plan = section["workflow_plan"]
-            section_number = section.get("section_number", i + 1)
-
-            if "root" not in section_plan:
-                print(
-                    f"{Fore.YELLOW}Warning: Section {section_number} missing 'root' element{Style.RESET_ALL}"
-                )
-                continue
-
-            # flattened_steps = self.flatten_workflow_section(section_plan["root"], section_number)
-            all_steps.append(section_plan["root"])
+        section_plans = [section["workflow_plan"] for section in workflow_sections]
+        all_steps = [plan["root"] for plan in section_plans if "root" in plan]
+
+        # Section numbers are only needed to report sections without a root
+        if len(all_steps) != len(section_plans):
+            for i, section in enumerate(workflow_sections):
+                if "root" not in section_plans[i]:
+                    section_number = section.get("section_number", i + 1)
+                    console_print(
+                        colorize(Fore.YELLOW, f"Warning: Section {section_number} missing 'root' element")
+                    )
 
         # Create combined workflow - simplified logic
         combined_root = (
@@ -109,13 +201,18 @@ class WorkflowProcessor:
             "root": combined_root,
         }
 
-        print(f"{Fore.GREEN}✓ Successfully combined workflow sections{Style.RESET_ALL}")
+        console_print(colorize(Fore.GREEN, "✓ Successfully combined workflow sections"))
         return combined_workflow
 
     def flatten_workflow_section(self, workflow_node, section_number):
         """
         Flatten a workflow section node into a list of executable steps.
 
+        Sequences are inlined into their parent list and each parallel branch is
+        flattened on its own, wrapped in a sequence when it yields several steps.
+        The tree is walked with an explicit stack, so deeply nested workflows do
+        not hit the recursion limit.
+
         Args:
             workflow_node (dict): The workflow node to flatten
             section_number (int): Section number for naming
@@ -123,60 +220,65 @@ class WorkflowProcessor:
         Returns:
             list: List of flattened workflow steps
         """
-        if not isinstance(workflow_node, dict):
-            return []
-
-        node_type = workflow_node.get("type")
-
-        # Handle container types
-        if node_type == "sequence":
-            return self._flatten_sequence_steps(workflow_node, section_number)
-        elif node_type == "parallel":
-            return self._flatten_parallel_branches(workflow_node, section_number)
-        else:
-            # All other node types (tool_call, user_input, branch, loop, wait_for_event)
-            return [workflow_node]
-
-    def _flatten_sequence_steps(self, workflow_node, section_number):
-        """Helper method to flatten sequence steps."""
-        steps = workflow_node.get("steps", [])
+        # Group metadata is shared by every parallel group and branch wrapper of the section
+        branch_name = f"Branch from section {section_number}"
+        branch_description = f"Sequential steps from section {section_number}"
+        parallel_description = f"Parallel execution from section {section_number}"
+
         flattened_steps = []
+        # Work items are (node, output list) to visit, or (None, (branch steps, branches))
+        # to close a parallel branch once all of its steps have been flattened
+        stack = [(workflow_node, flattened_steps)]
+        # Bound once, the loop runs per node
+        pop = stack.pop
+        push = stack.append
+
+        while stack:
+            node, output = pop()
+
+            if node is None:
+                branch_steps, flattened_branches = output
+                # Simplify branch handling
+                if len(branch_steps) == 1:
+                    flattened_branches.append(branch_steps[0])
+                elif branch_steps:  # len > 1
+                    flattened_branches.append(
+                        {
+                            "type": "sequence",
+                            "name": branch_name,
+                            "description": branch_description,
+                            "steps": branch_steps,
+                        }
+                    )
+                continue
+
+            if not isinstance(node, dict):
+                continue
 
-        for step in steps:
-            flattened_steps.extend(self.flatten_workflow_section(step, section_number))
+            node_type = node.get("type")
 
-        return flattened_steps
+            # Handle container types
+            if node_type == "sequence":
+                stack.extend((step, output) for step in reversed(node.get("steps", [])))
+            elif node_type == "parallel":
+                branches = node.get("branches", [])
+                if not branches:
+                    continue
 
-    def _flatten_parallel_branches(self, workflow_node, section_number):
-        """Helper method to flatten parallel branches."""
-        branches = workflow_node.get("branches", [])
-        if not branches:
-            return []
-
-        flattened_branches = []
-        for branch in branches:
-            branch_steps = self.flatten_workflow_section(branch, section_number)
-
-            # Simplify branch handling
-            if len(branch_steps) == 1:
-                flattened_branches.append(branch_steps[0])
-            elif branch_steps:  # len > 1
-                flattened_branches.append(
+                flattened_branches = []
+                output.append(
                     {
-                        "type": "sequence",
-                        "name": f"Branch from section {section_number}",
-                        "description": f"Sequential steps from section {section_number}",
-                        "steps": branch_steps,
+                        "type": "parallel",
+                        "branches": flattened_branches,
+                        "description": node.get("description", parallel_description),
                     }
                 )
+                for branch in reversed(branches):
+                    branch_steps = []
+                    push((None, (branch_steps, flattened_branches)))
+                    push((branch, branch_steps))
+            else:
+                # All other node types (tool_call, user_input, branch, loop, wait_for_event)
+                output.append(node)
 
-        # Create parallel container
-        parallel_container = {
-            "type": "parallel",
-            "branches": flattened_branches,
-            "description": workflow_node.get(
-                "description", f"Parallel execution from section {section_number}"
-            ),
-        }
-
-        return [parallel_container]
+        return flattened_steps
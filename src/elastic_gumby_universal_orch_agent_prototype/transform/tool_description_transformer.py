@@ -1,16 +1,26 @@
-from typing import Any, Dict
-from colorama import Fore, Style
-import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+from colorama import Fore
 
 from elastic_gumby_universal_orch_agent_prototype.data_schema import get_tools_schema
 from elastic_gumby_universal_orch_agent_prototype.visualizer.tools_loader import ToolsLoader
 from elastic_gumby_universal_orch_agent_prototype.planner.bedrock_client_manager import BedrockClientManager
+from elastic_gumby_universal_orch_agent_prototype.planner.logging_config import USE_COLOR, colorize
+
+# Maximum number of tool descriptions transformed concurrently by transform_descriptions
+TRANSFORM_MAX_WORKERS = 8
 
 class ToolDescriptionTransformer:
     """
     Transforms tool descriptions into structured ToolDefinition format.
     """
 
+    SYSTEM_PROMPT = """
+            You are a tool description transformer. Your task is to transform the TOOL_DESCRIPTION into the pre-defined format in input_schema of tool_validator.
+            Please provide the transformed tool functionality via tool_use stop for tool_validator.
+            If the required properties in input_schema are not provided in TOOL_DESCRIPTION, you should directly stop via end_trun and provide detailed error message in text.
+        """
+
     def __init__(self, model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0"):
         """
         Initialize the transformer with the input schema.
@@ -26,7 +36,7 @@ class ToolDescriptionTransformer:
             "input_schema": self.tool_schema,
         }
         self.bedrock_manager = BedrockClientManager()
-        self.tools_loader = ToolsLoader()
+        self.tools_loader = ToolsLoader(use_colors=USE_COLOR)
         self.max_interactions = 5
 
     def transform_description(self, tool_description: str) -> Dict[str, Any]:
@@ -40,11 +50,6 @@ class ToolDescriptionTransformer:
             Structured ToolDefinition dictionary.
         """
         transformed_tool = {}
-        system_prompt = f"""
-            You are a tool description transformer. Your task is to transform the TOOL_DESCRIPTION into the pre-defined format in input_schema of tool_validator.
-            Please provide the transformed tool functionality via tool_use stop for tool_validator.
-            If the required properties in input_schema are not provided in TOOL_DESCRIPTION, you should directly stop via end_trun and provide detailed error message in text.
-        """ 
         messages = [
             {
                 "role": "user",
@@ -55,13 +60,13 @@ class ToolDescriptionTransformer:
         ]
 
         # Execute main planning loop
-        print(f"\n{Fore.CYAN}🤖 Processing tool description...{Style.RESET_ALL}")
+        print("\n" + colorize(Fore.CYAN, "🤖 Processing tool description..."))
         interaction_count = 0
         while interaction_count < self.max_interactions:
             interaction_count += 1
             response = self.bedrock_manager.invoke_model(
                 messages=messages,
-                system_prompt=system_prompt,
+                system_prompt=self.SYSTEM_PROMPT,
                 max_tokens=1000,
                 tools=[self.tool_validator],
                 model_id=self.model_id,
@@ -78,7 +83,7 @@ class ToolDescriptionTransformer:
                     self._print_assistant_text(full_text, "Error Message")
                 break
             else:
-                print(f"{Fore.RED}Unexpected stop reason: {stop_reason}. Continuing with next interaction.{Style.RESET_ALL}")
+                print(colorize(Fore.RED, f"Unexpected stop reason: {stop_reason}. Continuing with next interaction."))
                 pass
 
             if transformed_tool: # Already get valid transformed tool, no need waste resource for end_turn interaction  
@@ -86,6 +91,29 @@ class ToolDescriptionTransformer:
         
         return transformed_tool
     
+    def transform_descriptions(
+        self, tool_descriptions: List[str], max_workers: int = TRANSFORM_MAX_WORKERS
+    ) -> List[Dict[str, Any]]:
+        """
+        Transform several tool descriptions concurrently.
+
+        Each description runs its own conversation through transform_description, so the
+        Bedrock round-trips of different tools overlap instead of running back to back.
+        All conversations share this transformer's Bedrock client manager.
+
+        Args:
+            tool_descriptions: Raw tool descriptions to transform.
+            max_workers: Maximum number of descriptions transformed at once.
+
+        Returns:
+            Structured ToolDefinition dictionaries in input order, empty for failed descriptions.
+        """
+        if len(tool_descriptions) <= 1:
+            return [self.transform_description(description) for description in tool_descriptions]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tool_descriptions))) as pool:
+            return list(pool.map(self.transform_description, tool_descriptions))
+
     def process_tool_use(self, content_list, messages):
         """
         Process tool_use content from the response.
@@ -119,7 +147,7 @@ class ToolDescriptionTransformer:
             }
         )
 
-        result = self.tools_loader.load_tools_from_json_string(json.dumps(transformed_tool))
+        result = self.tools_loader.load_tools_from_dict(transformed_tool)
 
         if not result["success"]:
             messages[-1]["content"][0]["content"] = "Transformed tool definition in tool_use input is received with errors. Please rectify it to strictly follow input_schema of tool_validator."
@@ -139,7 +167,8 @@ class ToolDescriptionTransformer:
             context (str, optional): Context description to show as a header.
                                     Defaults to "LLM Response" if not provided.
         """
-        print(f"{Fore.CYAN}{context}{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}{'─' * 80}{Style.RESET_ALL}")
+        separator = colorize(Fore.CYAN, "─" * 80)
+        print(colorize(Fore.CYAN, context))
+        print(separator)
         print(assistant_text.strip())
-        print(f"{Fore.CYAN}{'─' * 80}{Style.RESET_ALL}")
\ No newline at end of file
+        print(separator)
\ No newline at end of file
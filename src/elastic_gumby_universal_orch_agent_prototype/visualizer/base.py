@@ -6,7 +6,6 @@ shared across different visualizer implementations.
 """
 
 import re
-from typing import Any
 
 class Colors:
     """ANSI color codes for terminal output."""
@@ -76,6 +75,15 @@ class Icons:
 class BaseVisualizer:
     """Base class for all visualizers with common functionality."""
 
+    # Match $variable, $variable.property in group 1
+    _VARIABLE_RE = re.compile(r"(\$[a-zA-Z_][\w\.]*)")
+    _VARIABLE_HIGHLIGHT = Colors.VARIABLE + r"\g<1>" + Colors.RESET
+    _ANSI_ESCAPE_RE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+
+    # Tree drawing characters, shared by all instances
+    indent_char = " "
+    branch_chars = {"pipe": "│", "tee": "├──", "last": "└──", "space": " " * 3}
+
     def __init__(self, indent_size: int = 4, use_colors: bool = True, use_icons: bool = True):
         """Initialize the base visualizer.
 
@@ -85,15 +93,21 @@ class BaseVisualizer:
             use_icons: Whether to use Unicode icons in output
         """
         self.indent_size = indent_size
-        self.indent_char = " "
         self.use_colors = use_colors
         self.use_icons = use_icons
-        self.branch_chars = {"pipe": "│", "tee": "├──", "last": "└──", "space": " " * 3}
+        if not use_colors:
+            # Colors are fixed per visualizer, so plain output skips the check on every call
+            self._colorize = self._plain
 
     def _colorize(self, text: str, color: str) -> str:
         """Apply color to text if colors are enabled."""
         if self.use_colors:
-            return f"{color}{text}{Colors.RESET}"
+            return color + text + Colors.RESET
+        return text
+
+    @staticmethod
+    def _plain(text: str, color: str) -> str:
+        """Return text unchanged, used as _colorize when colors are disabled."""
         return text
 
     def _iconize(self, icon: str) -> str:
@@ -104,18 +118,12 @@ class BaseVisualizer:
 
     def _highlight_variables(self, text: str) -> str:
         """Highlight variable references in the format ${variableName}."""
-        if not self.use_colors:
+        if not self.use_colors or "$" not in text:
             return text
-
-        pattern = r"(\$[a-zA-Z_][\w\.]*)"  # Match $variable, $variable.property in group 1
-
-        def replace_var(match: Any) -> str:
-            var_name = match.group(1)
-            return self._colorize(var_name, Colors.VARIABLE)
-
-        return re.sub(pattern, replace_var, text)
+        return self._VARIABLE_RE.sub(self._VARIABLE_HIGHLIGHT, text)
 
     def _strip_ansi_codes(self, text: str) -> str:
         """Remove ANSI color codes from text for clean file output."""
-        ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
-        return ansi_escape.sub("", text)
\ No newline at end of file
+        if "\x1b" not in text:
+            return text  # Plain text, e.g. rendered with use_colors=False, skips the regex
+        return self._ANSI_ESCAPE_RE.sub("", text)
\ No newline at end of file
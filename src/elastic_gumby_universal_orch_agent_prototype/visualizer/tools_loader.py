@@ -15,6 +15,17 @@ from .base import Colors
 class ToolsLoader:
     """Handles loading and processing of tool definitions from various sources."""
 
+    # Required fields in reporting order, with frozensets for the missing-field check
+    _TOOL_FIELD_ORDER = ("name", "description", "resource", "parameters", "return")
+    _PARAM_FIELD_ORDER = ("name", "type", "description")
+    _RETURN_FIELD_ORDER = ("type", "description")
+    _REQUIRED_TOOL_FIELDS = frozenset(_TOOL_FIELD_ORDER)
+    _REQUIRED_PARAM_FIELDS = frozenset(_PARAM_FIELD_ORDER)
+    _REQUIRED_RETURN_FIELDS = frozenset(_RETURN_FIELD_ORDER)
+
+    # Keys that may hold the tools list in a container object, in lookup order
+    _CONTAINER_KEYS = ("available_tools", "tools", "tool_definitions")
+
     def __init__(self, use_colors: bool = True):
         """Initialize the tools loader.
 
@@ -45,11 +56,32 @@ class ToolsLoader:
                 - 'success': bool indicating if loading was successful
                 - 'tools': List of loaded tools (empty if failed)
         """
-        result = {"success": False, "tools": []}
-
         try:
             data = json.loads(json_input.strip())
+        except json.JSONDecodeError as e:
+            self._print_status(f"✘ Invalid JSON format: {e}", Colors.RED)
+            return {"success": False, "tools": []}
+        except Exception as e:
+            self._print_status(f"✘ Error loading tools from JSON: {e}", Colors.RED)
+            return {"success": False, "tools": []}
+
+        return self.load_tools_from_dict(data)
+
+    def load_tools_from_dict(self, data: Union[Dict[str, Any], List[Any]]) -> Dict[str, Any]:
+        """
+        Load processed tools from already parsed JSON data.
 
+        Args:
+            data: Parsed JSON data containing tool definitions
+
+        Returns:
+            Dict containing:
+                - 'success': bool indicating if loading was successful
+                - 'tools': List of loaded tools (empty if failed)
+        """
+        result = {"success": False, "tools": []}
+
+        try:
             # Extract tools list from different possible structures
             tools_list = self._extract_tools_from_data(data)
 
@@ -64,9 +96,6 @@ class ToolsLoader:
             )
             return result
 
-        except json.JSONDecodeError as e:
-            self._print_status(f"✘ Invalid JSON format: {e}", Colors.RED)
-            return result
         except Exception as e:
             self._print_status(f"✘ Error loading tools from JSON: {e}", Colors.RED)
             return result
@@ -87,15 +116,13 @@ class ToolsLoader:
             # Direct list of tools
             return data
 
-        elif isinstance(data, dict):
+        if isinstance(data, dict):
             # Check for common container structures
-            if "available_tools" in data:
-                return data["available_tools"]
-            elif "tools" in data:
-                return data["tools"]
-            elif "tool_definitions" in data:
-                return data["tool_definitions"]
-            elif "name" in data and "description" in data:
+            for key in self._CONTAINER_KEYS:
+                tools = data.get(key)
+                if tools is not None:
+                    return tools
+            if "name" in data and "description" in data:
                 # Single tool definition
                 return [data]
 
@@ -150,11 +177,14 @@ class ToolsLoader:
         validation_result: Dict[str, Any] = {"valid": True, "errors": error_list}
 
         # Check required fields
-        required_fields = ["name", "description", "resource", "parameters", "return"]
-        for field in required_fields:
-            if field not in tool:
-                error_list.append(f"Missing required field: {field}")
-                validation_result["valid"] = False
+        missing = self._REQUIRED_TOOL_FIELDS - tool.keys()
+        if missing:
+            error_list.extend(
+                f"Missing required field: {field}"
+                for field in self._TOOL_FIELD_ORDER
+                if field in missing
+            )
+            validation_result["valid"] = False
 
         # Validate parameters structure if present
         if "parameters" in tool:
@@ -192,9 +222,12 @@ class ToolsLoader:
         if not isinstance(param, dict):
             raise ValueError(f"{structure_type} at index {index} should be a dictionary")
 
-        required_fields = ["name", "type", "description"] if structure_type == "Parameter" else ["type", "description"]
-        for field in required_fields:
-            if field not in param:
-                raise ValueError(
-                    f"{structure_type} at index {index} missing required field: {field}"
-                )
+        if structure_type == "Parameter":
+            required_fields, field_order = self._REQUIRED_PARAM_FIELDS, self._PARAM_FIELD_ORDER
+        else:
+            required_fields, field_order = self._REQUIRED_RETURN_FIELDS, self._RETURN_FIELD_ORDER
+
+        missing = required_fields - param.keys()
+        if missing:
+            field = next(field for field in field_order if field in missing)
+            raise ValueError(f"{structure_type} at index {index} missing required field: {field}")
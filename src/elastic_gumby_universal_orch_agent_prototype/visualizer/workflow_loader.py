@@ -8,22 +8,111 @@ Designed to make workflow_visualizer.py more testable and modular.
 
 import json
 import re
-from typing import Any, Dict, List, Set
+import sys
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 
+from ..json_utils import loads
 from .base import Colors
 
+# A single "{% $varName %}" reference, with the variable path in group 1 and its root name in group 2
+_VAR_REF_RE = re.compile(r"\{\%\s*\$(([a-zA-Z_]\w*)[\w\.]*)\s*\%\}")
+# A JSONata parameter expression referencing at least one variable, without brackets or parentheses
+_PARAM_RE = re.compile(r"\{\%[^\[\]\(\)]*\$[a-zA-Z_][\w\.]*[^\[\]\(\)]*\%\}")
+# Every $varName reference, with the root name (without sub-properties) in group 1
+_VAR_ROOTS_RE = re.compile(r"\$([a-zA-Z_]\w*)")
+
+# Exact types of JSON number and boolean literals, checked with type() since parsed JSON holds no subclasses
+_SCALAR_TYPES = frozenset((int, float, bool))
+# Scalar parameter values, which may also be null
+_PARAMETER_SCALAR_TYPES = _SCALAR_TYPES | {type(None)}
+
+# Marks a node property as absent, since present properties may hold None
+_MISSING = object()
+
+# Work item actions of WorkflowLoader._run_validation
+_VISIT = 0  # Validate a node in the given variable scope
+_VISIT_SCOPED = 1  # Validate a node in a copy of the given variable scope
+_STEPS = 2  # Check a node's steps container and queue its steps
+_REFERENCES = 3  # Check a node's entityId or prompt once its children are done, then queue onTimeout
+_BRANCHES = 4  # Check a node's branches container and queue its branches
+
+
+class _Scope:
+    """
+    Variable scope of the validation walk, chained to the scope it was forked from.
+
+    Forking is O(1) instead of copying every defined name. Validation is depth-first,
+    so a scope only gains names once every scope forked from it has been walked, and
+    scopes that define nothing are skipped when forking to keep the chains short.
+    """
+
+    __slots__ = ("parent", "added")
+
+    def __init__(self, parent: Optional[Union["_Scope", Set[str]]] = None):
+        self.parent = parent
+        self.added: Set[str] = set()
+
+    def add(self, name: str) -> None:
+        self.added.add(name)
+
+    def fork(self) -> "_Scope":
+        return _Scope(self if self.added else self.parent)
+
+    def __contains__(self, name: str) -> bool:
+        scope = self
+        while type(scope) is _Scope:
+            if name in scope.added:
+                return True
+            scope = scope.parent
+        return scope is not None and name in scope
+
+
+def _loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document with json_utils.loads (orjson when installed).
+
+    Documents the fast parser rejects are parsed again with the json module, which
+    accepts extensions orjson does not (NaN, Infinity) and otherwise raises
+    json.JSONDecodeError with its usual message and position.
+
+    Args:
+        data: JSON document as str or bytes
+
+    Returns:
+        Parsed Python object
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON
+    """
+    try:
+        return loads(data)
+    except json.JSONDecodeError:
+        return json.loads(data)
+
 class WorkflowLoader:
     """Handles loading and processing of workflow definitions from various sources."""
 
-    def __init__(self, use_colors: bool = True, tools_definition: Dict[str, Any] = None):
+    # Node properties that may hold a JSON string instead of an object
+    _JSON_PROPERTIES = ("parameters", "outputVariable", "condition", "onTimeout", "errorHandler")
+    # Node properties holding a list of nested nodes
+    _NODE_LIST_PROPERTIES = ("steps", "branches")
+    # Node properties holding a single nested node
+    _NODE_PROPERTIES = ("onTimeout", "errorHandler")
+
+    def __init__(self, use_colors: bool = True, tools_definition: Dict[str, Any] = None, quiet: bool = False):
         """Initialize the workflow loader.
 
         Args:
             use_colors: Whether to use colored output for messages
             tools_definition: Dictionary containing available tools and their parameter definitions
+            quiet: Whether to suppress status messages, e.g. when validating workflows in batch.
+                   Errors are still returned in the load result
         """
         self.use_colors = use_colors
+        self.quiet = quiet
         self.tools_definition: Dict[str, Any] = tools_definition
+        # Valid parameter names per tool, built on first use since tools_definition is fixed per loader
+        self._tool_param_names: Dict[str, FrozenSet[str]] = {}
 
     def _colorize(self, text: str, color: str) -> str:
         """Apply color formatting to text if colors are enabled.
@@ -46,9 +135,11 @@ class WorkflowLoader:
             message: Status message to print
             color: Color code to apply (defaults to white)
         """
+        if self.quiet:
+            return
         print(self._colorize(message, color))
 
-    def load_workflow_from_json_string(self, json_string: str) -> Dict[str, Any]:
+    def load_workflow_from_json_string(self, json_string: Union[str, bytes]) -> Dict[str, Any]:
         """
         Load and validate workflow from a JSON string with comprehensive error handling.
 
@@ -56,7 +147,7 @@ class WorkflowLoader:
         validates the workflow, and provides detailed feedback with colored output.
 
         Args:
-            json_string: JSON string containing workflow data
+            json_string: JSON string (or UTF-8 bytes) containing workflow data
 
         Returns:
             Dict with validation result containing:
@@ -66,7 +157,7 @@ class WorkflowLoader:
         """
         result = {"success": False, "workflow": None, "errors": []}
         try:
-            data = json.loads(json_string.strip())
+            data = _loads(json_string)  # Surrounding whitespace is valid JSON, no need to strip
             result['workflow'] = self._extract_workflow_from_data(data)
             result['workflow'] = self._normalize_workflow_structure(result['workflow'])
 
@@ -114,7 +205,7 @@ class WorkflowLoader:
         """
         def _is_valid_workflow(data: Dict[str, Any]) -> bool:
             """Check if data has required workflow fields."""
-            return isinstance(data, dict) and all(field in data for field in ["root", "name", "description"])
+            return isinstance(data, dict) and "root" in data and "name" in data and "description" in data
 
         workflow = None
 
@@ -153,7 +244,7 @@ class WorkflowLoader:
         root = workflow["root"]
         if isinstance(root, str):
             try:
-                root = json.loads(root)
+                root = _loads(root)
             except json.JSONDecodeError as e:
                 self._print_status(f"✘ Invalid JSON in 'root': {e}", Colors.RED)
                 raise e
@@ -168,12 +259,14 @@ class WorkflowLoader:
 
     def _normalize_node_structure(self, node: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Recursively normalize node structures ensuring proper dictionary types.
+        Normalize node structures ensuring proper dictionary types.
 
         Converts JSON string properties to dictionaries for common node properties
         (parameters, outputVariable, condition, onTimeout, errorHandler) and
-        recursively processes nested structures like steps, branches, onTimeout,
-        and errorHandler. Follows immutability principle by creating a copy.
+        processes nested structures like steps, branches, onTimeout, and errorHandler.
+        Follows immutability principle by creating a copy of every node. Nested nodes
+        are walked with an explicit stack, in the same depth-first order as a recursive
+        walk, so deep workflows cannot hit the recursion limit.
 
         Args:
             node: Node dictionary to normalize
@@ -184,42 +277,53 @@ class WorkflowLoader:
         Raises:
             json.JSONDecodeError: If JSON string parsing fails for any property
         """
-        normalized = node.copy() # follows the principle of immutability 
-
-        # Handle common node properties that might be JSON strings
-        json_properties = ["parameters", "outputVariable", "condition", "onTimeout", "errorHandler"]
-
-        for prop in json_properties:
-            if prop in normalized and isinstance(normalized[prop], str):
-                try:
-                    # Try to parse as JSON if it looks like JSON
-                    prop_value = normalized[prop].strip()
-                    if prop_value.startswith(("{", "[")):
-                        normalized[prop] = json.loads(prop_value)
-                except json.JSONDecodeError as e:
-                    self._print_status(f"✘ Invalid JSON in '{prop}': {normalized[prop]}", Colors.RED)
-                    raise e
-                
-        # Recursively handle nested structures
-        if "steps" in normalized and isinstance(normalized["steps"], list):
-            normalized["steps"] = [
-                self._normalize_node_structure(step) if isinstance(step, dict) else step
-                for step in normalized["steps"]
-            ]
-
-        if "branches" in normalized and isinstance(normalized["branches"], list):
-            normalized["branches"] = [
-                self._normalize_node_structure(branch) if isinstance(branch, dict) else branch
-                for branch in normalized["branches"]
-            ]
-
-        if "onTimeout" in normalized and isinstance(normalized["onTimeout"], dict):
-            normalized["onTimeout"] = self._normalize_node_structure(normalized["onTimeout"])
-
-        if "errorHandler" in normalized and isinstance(normalized["errorHandler"], dict):
-            normalized["errorHandler"] = self._normalize_node_structure(normalized["errorHandler"])
-
-        return normalized
+        normalized_root = node.copy() # follows the principle of immutability 
+        stack = [normalized_root]
+
+        while stack:
+            normalized = stack.pop()
+
+            # Share one string object per node type, so node_types and type checks compare by identity
+            node_type = normalized.get("type")
+            if type(node_type) is str:
+                normalized["type"] = sys.intern(node_type)
+
+            # Handle common node properties that might be JSON strings
+            for prop in self._JSON_PROPERTIES:
+                if prop in normalized and isinstance(normalized[prop], str):
+                    try:
+                        # Try to parse as JSON if it looks like JSON. Only values with leading
+                        # whitespace are copied, the parser accepts trailing whitespace as is
+                        prop_value = normalized[prop]
+                        if prop_value[:1].isspace():
+                            prop_value = prop_value.lstrip()
+                        if prop_value.startswith(("{", "[")):
+                            normalized[prop] = _loads(prop_value)
+                    except json.JSONDecodeError as e:
+                        self._print_status(f"✘ Invalid JSON in '{prop}': {normalized[prop]}", Colors.RED)
+                        raise e
+
+            # Copy nested structures, then normalize them depth-first in document order
+            children: List[Dict[str, Any]] = []
+            for prop in self._NODE_LIST_PROPERTIES:
+                nodes = normalized.get(prop)
+                if type(nodes) is list:  # Parsed JSON only holds exact lists and dicts
+                    # One copy of the list, with its node dicts replaced by their copies in place
+                    nodes = normalized[prop] = nodes.copy()
+                    for i, child in enumerate(nodes):
+                        if type(child) is dict:
+                            nodes[i] = child = child.copy()
+                            children.append(child)
+
+            for prop in self._NODE_PROPERTIES:
+                child = normalized.get(prop)
+                if type(child) is dict:
+                    normalized[prop] = child = child.copy()
+                    children.append(child)
+
+            stack.extend(reversed(children))
+
+        return normalized_root
 
     def validate_workflow(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -258,24 +362,26 @@ class WorkflowLoader:
 
             # Check for name
             if "name" in workflow:
-                validation_result["is_valid"] &= isinstance(workflow["name"], str)
+                if not isinstance(workflow["name"], str):
+                    errors.append("Workflow 'name' property must be a string")
             else:
                 errors.append("Workflow must have a 'name' property")
 
             # Check for description
             if "description" in workflow:
-                validation_result["is_valid"] &= isinstance(workflow["description"], str)
+                if not isinstance(workflow["description"], str):
+                    errors.append("Workflow 'description' property must be a string")
             else:
                 errors.append("Workflow must have a 'description' property")
     
             # Check for root structure
             if "root" in workflow:
-                validation_result["is_valid"] &= isinstance(workflow["root"], dict)
-                self._validate_node_content(workflow["root"], validation_result, path="root", defined_vars=set())
+                # A root that is not a dictionary fails on its first lookup and is reported below
+                self._validate_node_content(workflow["root"], validation_result, path="root", defined_vars=_Scope())
             else:
                 errors.append("Workflow must have a 'root' property")
 
-            validation_result["is_valid"] &= (len(errors) == 0 and validation_result["node_count"] > 0)
+            validation_result["is_valid"] = len(errors) == 0 and validation_result["node_count"] > 0
 
         except Exception as e:
             errors.append(f"Workflow validation error: {e}")
@@ -285,10 +391,10 @@ class WorkflowLoader:
 
     def _validate_node_content(self, node: Dict[str, Any], validation_result: Dict[str, Any], path: str, defined_vars: Set[str]) -> None:
         """
-        Recursively validate node content, count nodes, collect types, and track variable scope.
+        Validate node content, count nodes, collect types, and track variable scope.
 
         Validates node structure, conditions, parameters, variable references, and
-        recursively processes child nodes (errorHandler, ifTrue/ifFalse, body, steps, branches).
+        processes child nodes (errorHandler, ifTrue/ifFalse, body, steps, branches, onTimeout).
         Maintains variable scope tracking to ensure variables are defined before use.
         Updates validation_result with node counts, types, and error messages.
 
@@ -298,74 +404,137 @@ class WorkflowLoader:
             path: Current path in the workflow for detailed error reporting
             defined_vars: Set of variable names defined in current execution context
         """
-        # Count this node and its type
-        validation_result["node_count"] += 1
-        validation_result["node_types"].add(node["type"])
-        path += f".{node['type']}" 
-
-        if "condition" in node:
-            if node["condition"]["type"] == "comparison":
-                self._validate_condition(node["condition"], validation_result, path + ".condition", defined_vars)
-            elif node["condition"]["type"] == "logical":
-                for condition in node["condition"]["conditions"]:
-                    self._validate_condition(condition, validation_result, path + ".condition.conditions", defined_vars)
-
-        if "parameters" in node:
-            self._validate_parameters(node, validation_result, path + ".parameters", defined_vars)
-        
-        if "outputVariable" in node:
-            defined_vars.add(node["outputVariable"])
+        self._run_validation([(_VISIT, node, path, defined_vars)], validation_result)
 
-        # Process children for tool_call
-        if "errorHandler" in node:
-            self._validate_node_content(node["errorHandler"], validation_result, path + ".errorHandler", defined_vars)
-        
-        # Process children for branch
-        if "ifTrue" in node:
-            self._validate_node_content(node["ifTrue"], validation_result, path + ".ifTrue", defined_vars.copy())
-        if "ifFalse" in node:
-            self._validate_node_content(node["ifFalse"], validation_result, path + ".ifFalse", defined_vars.copy())
-        
-        # Process children for loop
-        if "body" in node:
-            self._validate_node_content(node["body"], validation_result, path + ".body", defined_vars)
+    def _run_validation(self, stack: List[Tuple[int, Dict[str, Any], str, Set[str]]], validation_result: Dict[str, Any]) -> None:
+        """
+        Validate nodes from an explicit work stack instead of recursing.
 
-        # Process children for sequence
-        if "steps" in node:
-            self._validate_container(node, validation_result, path + ".steps", defined_vars)
-        
-        if "branches" in node:   
-            self._validate_container(node, validation_result, path + ".branches", defined_vars)
+        Each item is (action, node, path, defined_vars). Items are pushed in reverse so they
+        pop in document order, and work that follows a node's children (the variable
+        references checked by _validate_node_references, then onTimeout) is pushed as a
+        separate item, so errors and variable scopes come out exactly as a recursive walk
+        would produce them. Scopes that must be isolated (ifTrue/ifFalse and parallel
+        branches) are forked when their item is popped, after earlier siblings ran.
+
+        Args:
+            stack: Work items to process, the last one first
+            validation_result: Validation result dictionary to update with counts, types, and errors
+        """
+        # Counted in locals and written back once, also when a malformed node raises
+        node_count = 0
+        node_types: Set[str] = set()
+        add_node_type = node_types.add
+        try:
+            while stack:
+                action, node, path, defined_vars = stack.pop()
+
+                if action == _STEPS:
+                    self._validate_container_items(node["type"], node["steps"], "steps", validation_result, path, defined_vars, stack)
+                    continue
+                if action == _BRANCHES:
+                    self._validate_container_items(node["type"], node["branches"], "branches", validation_result, path, defined_vars, stack)
+                    continue
+                if action == _REFERENCES:
+                    self._validate_node_references(node, validation_result, path, defined_vars)
+                    on_timeout = node.get("onTimeout", _MISSING)
+                    if on_timeout is not _MISSING:
+                        stack.append((_VISIT, on_timeout, path + ".onTimeout", defined_vars))
+                    continue
+                if action == _VISIT_SCOPED:
+                    defined_vars = defined_vars.fork() if type(defined_vars) is _Scope else _Scope(defined_vars)
+
+                # Count this node and its type
+                node_count += 1
+                node_type = node["type"]
+                add_node_type(node_type)
+                path = f"{path}.{node_type}"
+
+                condition = node.get("condition", _MISSING)
+                if condition is not _MISSING:
+                    if condition["type"] == "comparison":
+                        self._validate_condition(condition, validation_result, path + ".condition", defined_vars)
+                    elif condition["type"] == "logical":
+                        conditions_path = path + ".condition.conditions"
+                        for sub_condition in condition["conditions"]:
+                            self._validate_condition(sub_condition, validation_result, conditions_path, defined_vars)
+
+                if "parameters" in node:
+                    self._validate_parameters(node, validation_result, path + ".parameters", defined_vars)
+            
+                output_variable = node.get("outputVariable", _MISSING)
+                if output_variable is not _MISSING:
+                    defined_vars.add(output_variable)
+
+                pending = []
+                # Process children for tool_call
+                error_handler = node.get("errorHandler", _MISSING)
+                if error_handler is not _MISSING:
+                    pending.append((_VISIT, error_handler, path + ".errorHandler", defined_vars))
             
-        # Process children for wait_for_event
-        if "entityId" in node:
-            match = re.fullmatch(r"^\{\%\s*\$([a-zA-Z_][\w\.]*)\s*\%\}$", node["entityId"])
+                # Process children for branch
+                if_true = node.get("ifTrue", _MISSING)
+                if if_true is not _MISSING:
+                    pending.append((_VISIT_SCOPED, if_true, path + ".ifTrue", defined_vars))
+                if_false = node.get("ifFalse", _MISSING)
+                if if_false is not _MISSING:
+                    pending.append((_VISIT_SCOPED, if_false, path + ".ifFalse", defined_vars))
+            
+                # Process children for loop
+                body = node.get("body", _MISSING)
+                if body is not _MISSING:
+                    pending.append((_VISIT, body, path + ".body", defined_vars))
+
+                # Process children for sequence and parallel
+                if "steps" in node:
+                    pending.append((_STEPS, node, path + ".steps", defined_vars))
+            
+                if "branches" in node:   
+                    pending.append((_BRANCHES, node, path + ".branches", defined_vars))
+
+                # Process wait_for_event / user_input references and onTimeout after the children
+                pending.append((_REFERENCES, node, path, defined_vars))
+                stack.extend(reversed(pending))
+        finally:
+            if node_count:
+                validation_result["node_count"] += node_count
+                validation_result["node_types"].update(node_types)
+
+    def _validate_node_references(self, node: Dict[str, Any], validation_result: Dict[str, Any], path: str, defined_vars: Set[str]) -> None:
+        """
+        Validate the entityId of wait_for_event nodes or the prompt of user_input nodes.
+
+        Args:
+            node: Node dictionary to validate
+            validation_result: Validation result dictionary to update with errors
+            path: Path of the node in the workflow for detailed error reporting
+            defined_vars: Set of variable names defined in current execution context
+        """
+        entity_id = node.get("entityId", _MISSING)
+        if entity_id is not _MISSING:
+            match = _VAR_REF_RE.fullmatch(entity_id)
             if not match:
                 validation_result["errors"].append(
-                    f"Variable reference in '{node['entityId']}' at {path}.entityId should follow {{% $varName %}} format"
+                    f"Variable reference in '{entity_id}' at {path}.entityId should follow {{% $varName %}} format"
                 )
-            elif match.group(1).split(".", 1)[0] not in defined_vars:
+            elif match.group(2) not in defined_vars:
                 validation_result["errors"].append(
-                    f"Variable reference in '{node['entityId']}' at '{path}.entityId' is not defined before use in its execution context"
+                    f"Variable reference in '{entity_id}' at '{path}.entityId' is not defined before use in its execution context"
                 )
-        elif "prompt" in node:
-            if "{% " in node["prompt"] and "%}" in node["prompt"]:
-                if not node["prompt"].startswith("{%") or not node["prompt"].endswith("%}"):
-                    validation_result["errors"].append(
-                        f"Variable reference in '{node['prompt']}' at {path}.prompt should follow {{% 'Prompt guidance text' & $varName & ' end' %}} format"
-                    )
-                else:
-                    var_names = re.findall(r"\$([a-zA-Z_][\w\.]*)", node["prompt"])
-                    for var_name in var_names:
-                        var_name = var_name.split(".", 1)[0]
-                        if var_name not in defined_vars:
-                            validation_result["errors"].append(
-                                f"Variable '{var_name}' in '{node['prompt']}' at '{path}.prompt' is not defined before use in its execution context"
-                            )
-    
-        if "onTimeout" in node:
-            self._validate_node_content(node["onTimeout"], validation_result, path + ".onTimeout", defined_vars)
+            return
 
+        prompt = node.get("prompt", _MISSING)
+        if prompt is not _MISSING and "{% " in prompt and "%}" in prompt:
+            if not prompt.startswith("{%") or not prompt.endswith("%}"):
+                validation_result["errors"].append(
+                    f"Variable reference in '{prompt}' at {path}.prompt should follow {{% 'Prompt guidance text' & $varName & ' end' %}} format"
+                )
+            else:
+                for var_name in _VAR_ROOTS_RE.findall(prompt):
+                    if var_name not in defined_vars:
+                        validation_result["errors"].append(
+                            f"Variable '{var_name}' in '{prompt}' at '{path}.prompt' is not defined before use in its execution context"
+                        )
 
     def _validate_condition(self, condition, validation_result: Dict[str, Any], path: str, defined_vars: Set[str]) -> None:
         """
@@ -381,49 +550,58 @@ class WorkflowLoader:
             path: Current path in the workflow for detailed error reporting
             defined_vars: Set of variable names defined in current execution context
         """
-        single_var_ref_pattern = r"^\{\%\s*\$([a-zA-Z_][\w\.]*)\s*\%\}$"
-        def _validate_variable_in_condition(operand: str, validation_result: Dict[str, Any], path: str) -> None:
-            """Helper function to validate variable references in conditions."""
-            match = re.fullmatch(single_var_ref_pattern, operand)
-            if not match:
-                if "{% " in operand and "%}" in operand:
-                    if "[" in operand or "(" in operand:
-                        validation_result["errors"].append(
-                            f"Condition operand: '{operand}' at '{path}' should NOT contain brackets or parentheses in JSONata expression {{% ... %}}"
-                        )
-                    elif path.endswith(".right") and "$" not in operand:
-                        validation_result["errors"].append(
-                            f"Right operand with static value '{operand}' at '{path}' should be string without {{% ... %}} wrapping"
-                        )
-                    else:
-                        validation_result["errors"].append(
-                            f"Condition operand: '{operand}' at '{path}' should follow {{% $varName %}} format"
-                        )
-                elif path.endswith(".left"):
-                    validation_result["errors"].append(
-                        f"Left operand '{operand}' at '{path}' should follow {{% $varName %}} format"
-                    )
-                else:
-                    pass # pure string right operand
-            elif match.group(1).split(".", 1)[0] not in defined_vars:
-                validation_result["errors"].append(
-                    f"Variable '{match.group(1)}' at '{path}' is not defined before use in its execution context"
-                )
+        errors = validation_result["errors"]
 
         if isinstance(condition["left"], str):
-            _validate_variable_in_condition(condition["left"], validation_result, path + ".left")
-        elif isinstance(condition["left"], (int, float, bool)):
-            validation_result["errors"].append(
+            self._validate_condition_operand(condition["left"], errors, path + ".left", defined_vars)
+        elif type(condition["left"]) in _SCALAR_TYPES:
+            errors.append(
                 f"Invalid left operand type {type(condition['left']).__name__} at '{path}.left'"
             )
         
         if isinstance(condition["right"], str):
-            _validate_variable_in_condition(condition["right"], validation_result, path + ".right")
-        elif not isinstance(condition["right"], (int, float, bool)):
-            validation_result["errors"].append(
+            self._validate_condition_operand(condition["right"], errors, path + ".right", defined_vars)
+        elif type(condition["right"]) not in _SCALAR_TYPES:
+            errors.append(
                 f"Invalid right operand type : {type(condition['right']).__name__} at '{path}.right'"
             )
 
+    def _validate_condition_operand(self, operand: str, errors: List[str], path: str, defined_vars: Set[str]) -> None:
+        """
+        Validate a string condition operand as a {% $varName %} reference or a plain right literal.
+
+        Args:
+            operand: Left or right operand of a comparison
+            errors: Error list to append validation errors to
+            path: Path of the operand, ending in .left or .right
+            defined_vars: Set of variable names defined in current execution context
+        """
+        match = _VAR_REF_RE.fullmatch(operand)
+        if not match:
+            if "{% " in operand and "%}" in operand:
+                if "[" in operand or "(" in operand:
+                    errors.append(
+                        f"Condition operand: '{operand}' at '{path}' should NOT contain brackets or parentheses in JSONata expression {{% ... %}}"
+                    )
+                elif path.endswith(".right") and "$" not in operand:
+                    errors.append(
+                        f"Right operand with static value '{operand}' at '{path}' should be string without {{% ... %}} wrapping"
+                    )
+                else:
+                    errors.append(
+                        f"Condition operand: '{operand}' at '{path}' should follow {{% $varName %}} format"
+                    )
+            elif path.endswith(".left"):
+                errors.append(
+                    f"Left operand '{operand}' at '{path}' should follow {{% $varName %}} format"
+                )
+            else:
+                pass # pure string right operand
+        elif match.group(2) not in defined_vars:
+            errors.append(
+                f"Variable '{match.group(1)}' at '{path}' is not defined before use in its execution context"
+            )
+
     def _validate_parameters(self, node: Dict[str, Any], validation_result: Dict[str, Any], path: str, defined_vars: Set[str]) -> None:
         """
         Validate tool parameters including tool existence, parameter names, and variable references.
@@ -438,90 +616,117 @@ class WorkflowLoader:
             path: Current path in the workflow for detailed error reporting
             defined_vars: Set of variable names defined in current execution context
         """
-        parameter_pattern = r"^\{\%[^\[\]\(\)]*\$[a-zA-Z_][\w\.]*[^\[\]\(\)]*\%\}$"
-        
-        def _validate_value_in_parameters(value: Any, key: str, path: str) -> None:
-            """Helper function to validate values in parameters."""
-            if isinstance(value, str):
-                match = re.fullmatch(parameter_pattern, value)
-                if not match:
-                    if "{% " in value and "%}" in value:
-                        if "[" in value or "(" in value:
-                            validation_result["errors"].append(
-                                f"Parameter value '{key}': '{value}' at '{path}' should NOT contain brackets or parentheses in JSONata expression {{% ... %}}"
-                            )
-                        elif "$" not in value:
-                            validation_result["errors"].append(
-                                f"Parameter static value '{key}': '{value}' at '{path}' should be string without {{% ... %}} wrapping"
-                            )
-                        else:
-                            validation_result["errors"].append(
-                                f"Parameter value '{key}': '{value}' at '{path}' should follow {{% $varName1 & ' some text ' & $varName2 %}} format"
-                            )
-                    else: 
-                        pass # pure string parameter value
-                else:
-                    var_names = re.findall(r"\$([a-zA-Z_][\w\.]*)", value)
-                    for var_name in var_names:
-                        var_name = var_name.split(".", 1)[0] # Extract variable name without sub-properties
-                        if var_name not in defined_vars:
-                            validation_result["errors"].append(
-                                f"Variable '{var_name}' in parameter '{key}' at '{path}' is not defined before use in its execution context"
-                            )
-            elif not isinstance(value, (int, float, bool)) and value is not None:
-                validation_result["errors"].append(
-                    f"Invalid {type(value).__name__} parameter type for '{key}': '{value}' at '{path}'"
+        errors = validation_result["errors"]
+
+        valid_parameter_names = self._tool_param_names.get(node["toolName"])
+        if valid_parameter_names is None:
+            if node["toolName"] not in self.tools_definition:
+                errors.append(
+                    f"'{node['toolName']}' at '{path}' does NOT exist in AVAILABLE_TOOLS"
                 )
-            else:
-                pass # Valid types: int, float, bool, None
- 
-        if node["toolName"] not in self.tools_definition:
-            validation_result["errors"].append(
-                f"'{node['toolName']}' at '{path}' does NOT exist in AVAILABLE_TOOLS"
-            )
-            return
+                return
+            valid_parameter_names = frozenset(para['name'] for para in self.tools_definition[node["toolName"]])
+            self._tool_param_names[node["toolName"]] = valid_parameter_names
 
-        valid_parameter_names = set([para['name'] for para in self.tools_definition.get(node["toolName"])])
+        validate_value = self._validate_parameter_value
         for key, value in node["parameters"].items():
             if key not in valid_parameter_names:
-                validation_result["errors"].append(
+                errors.append(
                     f"Invalid parameter name '{key}' for '{node['toolName']}' at '{path}'"
                 )
                 continue
             if isinstance(value, dict):
                 for sub_key, sub_value in value.items():
-                    _validate_value_in_parameters(sub_value, f"{key}.{sub_key}", path)
+                    validate_value(sub_value, f"{key}.{sub_key}", errors, path, defined_vars)
             else:
-                _validate_value_in_parameters(value, key, path)
+                validate_value(value, key, errors, path, defined_vars)
+
+    def _validate_parameter_value(self, value: Any, key: str, errors: List[str], path: str, defined_vars: Set[str]) -> None:
+        """
+        Validate a single parameter value's type and JSONata variable references.
+
+        Args:
+            value: Parameter value to validate
+            key: Parameter name, dotted for nested parameter objects
+            errors: Error list to append validation errors to
+            path: Current path in the workflow for detailed error reporting
+            defined_vars: Set of variable names defined in current execution context
+        """
+        if isinstance(value, str):
+            match = _PARAM_RE.fullmatch(value)
+            if not match:
+                if "{% " in value and "%}" in value:
+                    if "[" in value or "(" in value:
+                        errors.append(
+                            f"Parameter value '{key}': '{value}' at '{path}' should NOT contain brackets or parentheses in JSONata expression {{% ... %}}"
+                        )
+                    elif "$" not in value:
+                        errors.append(
+                            f"Parameter static value '{key}': '{value}' at '{path}' should be string without {{% ... %}} wrapping"
+                        )
+                    else:
+                        errors.append(
+                            f"Parameter value '{key}': '{value}' at '{path}' should follow {{% $varName1 & ' some text ' & $varName2 %}} format"
+                        )
+                else: 
+                    pass # pure string parameter value
+            else:
+                for var_name in _VAR_ROOTS_RE.findall(value):
+                    if var_name not in defined_vars:
+                        errors.append(
+                            f"Variable '{var_name}' in parameter '{key}' at '{path}' is not defined before use in its execution context"
+                        )
+        elif type(value) not in _PARAMETER_SCALAR_TYPES:
+            errors.append(
+                f"Invalid {type(value).__name__} parameter type for '{key}': '{value}' at '{path}'"
+            )
+        else:
+            pass # Valid types: int, float, bool, None
     
-    def _validate_container(self, node: Dict[str, Any], validation_result: Dict[str, Any], path: str, defined_vars: Set[str]) -> None:
+    def _validate_container(self, node_type: str, container: List[Dict[str, Any]], container_type: str, validation_result: Dict[str, Any], path: str, defined_vars: Set[str]) -> None:
         """
         Validate container nodes (parallel, sequence) with specific container rules.
 
         Checks for empty containers, single-item containers (which should be unwrapped),
-        and recursively validates child nodes. Handles variable scope differently for
-        parallel branches (copied scope) vs sequential steps (shared scope).
+        and validates child nodes. Handles variable scope differently for
+        parallel branches (forked scope) vs sequential steps (shared scope).
+
+        Args:
+            node_type: Type of the node owning the container, used in error messages
+            container: The node's steps or branches list
+            container_type: "steps" or "branches"
+            validation_result: Validation result dictionary to update with errors
+            path: Current path in the workflow for detailed error reporting
+            defined_vars: Set of variable names defined in current execution context
+        """
+        stack: list = []
+        self._validate_container_items(node_type, container, container_type, validation_result, path, defined_vars, stack)
+        self._run_validation(stack, validation_result)
+
+    def _validate_container_items(self, node_type: str, container: List[Dict[str, Any]], container_type: str, validation_result: Dict[str, Any], path: str, defined_vars: Set[str], stack: list) -> None:
+        """
+        Check container rules and push the container's child nodes onto the work stack.
 
         Args:
-            node: Container node dictionary with steps or branches
+            node_type: Type of the node owning the container, used in error messages
+            container: The node's steps or branches list
+            container_type: "steps" or "branches"
             validation_result: Validation result dictionary to update with errors
             path: Current path in the workflow for detailed error reporting
             defined_vars: Set of variable names defined in current execution context
+            stack: Work stack of _run_validation
         """
-        container = node.get("steps", []) or node.get("branches", [])
         if not container:
             validation_result["errors"].append(
-                f"Remove empty '{node.get('type')}' container at '{path}'"
+                f"Remove empty '{node_type}' container at '{path}'"
             )
         elif len(container) == 1:
             validation_result["errors"].append(
-                f"Remove wrapper {node.get('type')} container with only one {container[0].get('type')} node at '{path}'"
+                f"Remove wrapper {node_type} container with only one {container[0].get('type')} node at '{path}'"
             )
-        elif path.endswith(".branches"):
-            for i, sub_node in enumerate(container):
-                # Copy defined_vars to avoid differnt branches affecting each other
-                self._validate_node_content(sub_node, validation_result, path + f"[{i}]", defined_vars.copy())
         else:
-            for i, sub_node in enumerate(container):
-                # All previous defined_vars should be valid in all steps
-                self._validate_node_content(sub_node, validation_result, path + f"[{i}]", defined_vars)
\ No newline at end of file
+            # Fork defined_vars to avoid differnt branches affecting each other, while all
+            # previous defined_vars should be valid in all steps
+            action = _VISIT_SCOPED if container_type == "branches" else _VISIT
+            for i in range(len(container) - 1, -1, -1):
+                stack.append((action, container[i], f"{path}[{i}]", defined_vars))
@@ -6,7 +6,6 @@ as colorful ASCII tree diagrams with icons for better visualization.
 """
 
 import json
-import re
 from datetime import datetime, timezone
 from typing import Any, Dict, List
 
@@ -119,11 +118,11 @@ class WorkflowVisualizer(BaseVisualizer):
         variable_params = []
         static_param_count = 0
 
-        jsonata_pattern = r'^\{\%[\s\S]*\%\}$'
         for key, value in parameters.items():
             if isinstance(value, str):
-                # Check if this parameter contains variable references
-                if re.fullmatch(jsonata_pattern, value.strip()):
+                # Check if this parameter is one "{% ... %}" JSONata block (prefix/suffix test, no regex needed)
+                stripped = value.strip()
+                if len(stripped) >= 4 and stripped.startswith("{%") and stripped.endswith("%}"):
                     # Highlight variables in string values
                     highlighted_value = self._highlight_variables(value)
                     variable_params.append(f"{key}={highlighted_value}")
@@ -0,0 +1,59 @@
+"""
+Shared pytest fixtures
+
+Tests designed for Coverlay compatibility:
+- BrazilPython-Pytest-6.x
+- Python-Pytest-cov-3.x and Coverage-6.x
+- BrazilPythonTestSupport-3.0
+"""
+
+import copy
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from elastic_gumby_universal_orch_agent_prototype.agent_main import AgentMainInterface
+
+
+# agent_main collaborators replaced by mocks when an AgentMainInterface is built in tests
+AGENT_MAIN_DEPENDENCIES = ("Path.mkdir", "ToolsVisualizer", "WorkflowVisualizer", "Phase1ToolsOnboarding",
+                           "Phase2PlanningReflecting", "Phase3TransformExecution")
+
+
+def _patch_agent_main_dependencies(stack):
+    """Enter patches for the agent_main dependencies and print, returning the mocks by name."""
+    mocks = {
+        target: stack.enter_context(patch(f"elastic_gumby_universal_orch_agent_prototype.agent_main.{target}"))
+        for target in AGENT_MAIN_DEPENDENCIES
+    }
+    mocks["print"] = stack.enter_context(patch("builtins.print"))
+    return mocks
+
+
+@pytest.fixture
+def mocked_deps():
+    """Patch the AgentMainInterface dependencies and print for one test, yielding the mocks by name."""
+    with ExitStack() as stack:
+        yield _patch_agent_main_dependencies(stack)
+
+
+@pytest.fixture(scope="module")
+def base_agent():
+    """Create one AgentMainInterface per test module with its dependencies mocked."""
+    with ExitStack() as stack:
+        _patch_agent_main_dependencies(stack)
+        return AgentMainInterface()
+
+
+@pytest.fixture
+def agent_instance(base_agent):
+    """Copy the module's AgentMainInterface with fresh session data and mocked collaborators."""
+    agent = copy.copy(base_agent)
+    agent.session_data = copy.deepcopy(base_agent.session_data)
+    agent.tools_visualizer = MagicMock()
+    agent.workflow_visualizer = MagicMock()
+    agent.phase1_handler = MagicMock()
+    agent.phase2_handler = MagicMock()
+    agent.phase3_handler = MagicMock()
+    return agent
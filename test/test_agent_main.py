@@ -8,25 +8,22 @@ Tests designed for Coverlay compatibility:
 """
 
 import json
+import re
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, mock_open
 
 import pytest
 
 from elastic_gumby_universal_orch_agent_prototype.agent_main import AgentMainInterface
 
+# Session IDs are "utoa_" followed by the UTC date and time: utoa_YYYYMMDD_HHMMSS
+_SESSION_ID_RE = re.compile(r"utoa_\d{8}_\d{6}")
+
 
 class TestAgentMainInterfaceInitialization:
     """Test AgentMainInterface initialization."""
 
-    @patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Path.mkdir')
-    @patch('elastic_gumby_universal_orch_agent_prototype.agent_main.ToolsVisualizer')
-    @patch('elastic_gumby_universal_orch_agent_prototype.agent_main.WorkflowVisualizer')
-    @patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase1ToolsOnboarding')
-    @patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase2PlanningReflecting')
-    @patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase3TransformExecution')
-    @patch('builtins.print')
-    def test_initialization_success(self, mock_print, mock_phase3, mock_phase2, mock_phase1, 
-                                  mock_workflow_viz, mock_tools_viz, mock_mkdir):
+    def test_initialization_success(self, mocked_deps):
         """Test successful initialization of AgentMainInterface."""
         # Create instance
         agent = AgentMainInterface()
@@ -42,100 +39,49 @@ class TestAgentMainInterfaceInitialization:
         assert agent.session_data["claude_messages"] == []
         
         # Verify session directory creation
-        mock_mkdir.assert_called_once_with(parents=True, exist_ok=True)
+        mocked_deps["Path.mkdir"].assert_called_once_with(parents=True, exist_ok=True)
         
         # Verify visualizers created
-        mock_tools_viz.assert_called_once()
-        mock_workflow_viz.assert_called_once()
+        mocked_deps["ToolsVisualizer"].assert_called_once()
+        mocked_deps["WorkflowVisualizer"].assert_called_once()
         
         # Verify phase handlers created
-        mock_phase1.assert_called_once()
-        mock_phase2.assert_called_once()
-        mock_phase3.assert_called_once()
+        mocked_deps["Phase1ToolsOnboarding"].assert_called_once()
+        mocked_deps["Phase2PlanningReflecting"].assert_called_once()
+        mocked_deps["Phase3TransformExecution"].assert_called_once()
         
         # Verify initialization message printed
-        mock_print.assert_called()
-
-    def test_generate_session_id_format(self):
-        """Test session ID generation format."""
-        with patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Path.mkdir'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.ToolsVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.WorkflowVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase1ToolsOnboarding'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase2PlanningReflecting'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase3TransformExecution'), \
-             patch('builtins.print'):
-            
-            agent = AgentMainInterface()
-            session_id = agent._generate_session_id()
-            
-            # Verify format: utoa_YYYYMMDD_HHMMSS
-            assert session_id.startswith("utoa_")
-            assert len(session_id) == 20  # utoa_ + 8 digits + _ + 6 digits
-            
-            # Verify it contains valid datetime components
-            date_time_part = session_id[5:]  # Remove "utoa_"
-            assert len(date_time_part) == 15  # YYYYMMDD_HHMMSS
-            assert date_time_part[8] == "_"  # Separator
-
-class TestAgentMainInterfaceUserInput:
-    """Test user input methods of AgentMainInterface."""
+        mocked_deps["print"].assert_called()
 
-    @pytest.fixture
-    def agent_instance(self):
-        """Create AgentMainInterface instance with mocked dependencies."""
-        with patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Path.mkdir'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.ToolsVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.WorkflowVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase1ToolsOnboarding'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase2PlanningReflecting'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase3TransformExecution'), \
-             patch('builtins.print'):
-            return AgentMainInterface()
+    def test_session_id_format(self, base_agent):
+        """Test session ID format (utoa_YYYYMMDD_HHMMSS) and its use in session data and directory."""
+        assert _SESSION_ID_RE.fullmatch(base_agent.session_id)
+        assert base_agent.session_data["session_id"] == base_agent.session_id
+        assert str(base_agent.session_dir).endswith(base_agent.session_id)
 
-    @patch.object(AgentMainInterface, '_editor')
-    @patch('builtins.print')
-    def test_get_user_input_text_type(self, mock_print, mock_editor, agent_instance):
-        """Test _get_user_input with text input type."""
-        mock_editor.return_value = "test input"
-        
-        result = agent_instance._get_user_input("Enter text:", "text")
-        
-        assert result == "test input"
-        mock_editor.assert_called_once_with(multiline=False)
 
-    @patch.object(AgentMainInterface, '_editor')
-    @patch('builtins.print')
-    def test_get_user_input_multiline_type(self, mock_print, mock_editor, agent_instance):
-        """Test _get_user_input with multiline input type."""
-        mock_editor.return_value = "line1\nline2"
-        
-        result = agent_instance._get_user_input("Enter multiline:", "multiline")
-        
-        assert result == "line1\nline2"
-        mock_editor.assert_called_once_with(multiline=True)
-
-    @patch.object(AgentMainInterface, '_editor')
-    @patch('builtins.print')
-    def test_get_user_input_file_type_quit(self, mock_print, mock_editor, agent_instance):
-        """Test _get_user_input with file input type - quit."""
-        mock_editor.return_value = "quit"
-        
-        result = agent_instance._get_user_input("Enter file content:", "file")
-        
-        assert result == "quit"
+class TestAgentMainInterfaceUserInput:
+    """Test user input methods of AgentMainInterface."""
 
+    @pytest.mark.parametrize("prompt,input_type,editor_return,expected,multiline,reads_file", [
+        ("Enter text:", "text", "test input", "test input", False, False),
+        ("Enter multiline:", "multiline", "line1\nline2", "line1\nline2", True, False),
+        ("Enter file content:", "file", "quit", "quit", False, False),
+        ("Enter file content:", "file", "file:test.txt", "file content", False, True),
+    ], ids=["text", "multiline", "file_quit", "file_path"])
     @patch.object(AgentMainInterface, '_editor')
     @patch('builtins.open', new_callable=mock_open, read_data="file content")
     @patch('builtins.print')
-    def test_get_user_input_file_type_file_path(self, mock_print, mock_file, mock_editor, agent_instance):
-        """Test _get_user_input with file input type - file path."""
-        mock_editor.return_value = "file:test.txt"
+    def test_get_user_input_types(self, mock_print, mock_file, mock_editor, agent_instance,
+                                  prompt, input_type, editor_return, expected, multiline, reads_file):
+        """Test _get_user_input with each input type."""
+        mock_editor.return_value = editor_return
         
-        result = agent_instance._get_user_input("Enter file content:", "file")
+        result = agent_instance._get_user_input(prompt, input_type)
         
-        assert result == "file content"
-        mock_file.assert_called_once()
+        assert result == expected
+        mock_editor.assert_called_once_with(multiline=multiline)
+        assert mock_file.called is reads_file
 
     @patch.object(AgentMainInterface, '_editor')
     @patch('builtins.open', side_effect=Exception("File not found"))
@@ -159,18 +105,6 @@ class TestAgentMainInterfaceUserInput:
 class TestAgentMainInterfaceSessionManagement:
     """Test session management methods of AgentMainInterface."""
 
-    @pytest.fixture
-    def agent_instance(self):
-        """Create AgentMainInterface instance with mocked dependencies."""
-        with patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Path.mkdir'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.ToolsVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.WorkflowVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase1ToolsOnboarding'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase2PlanningReflecting'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase3TransformExecution'), \
-             patch('builtins.print'):
-            return AgentMainInterface()
-
     def test_record_phase_transition(self, agent_instance):
         """Test _record_phase_transition method."""
         agent_instance._record_phase_transition(1, 2, "Test transition")
@@ -220,18 +154,6 @@ class TestAgentMainInterfaceSessionManagement:
 class TestAgentMainInterfaceVisualizationSaving:
     """Test visualization saving methods of AgentMainInterface."""
 
-    @pytest.fixture
-    def agent_instance(self):
-        """Create AgentMainInterface instance with mocked dependencies."""
-        with patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Path.mkdir'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.ToolsVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.WorkflowVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase1ToolsOnboarding'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase2PlanningReflecting'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase3TransformExecution'), \
-             patch('builtins.print'):
-            return AgentMainInterface()
-
     @patch('builtins.print')
     def test_save_visualization_no_data(self, mock_print, agent_instance):
         """Test _save_visualization with no tools or workflow data."""
@@ -263,18 +185,6 @@ class TestAgentMainInterfaceVisualizationSaving:
 class TestAgentMainInterfaceClaudeMessagesSaving:
     """Test Claude messages saving methods of AgentMainInterface."""
 
-    @pytest.fixture
-    def agent_instance(self):
-        """Create AgentMainInterface instance with mocked dependencies."""
-        with patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Path.mkdir'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.ToolsVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.WorkflowVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase1ToolsOnboarding'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase2PlanningReflecting'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase3TransformExecution'), \
-             patch('builtins.print'):
-            return AgentMainInterface()
-
     @patch('builtins.open', new_callable=mock_open)
     @patch('builtins.print')
     def test_save_claude_messages_with_data(self, mock_print, mock_file, agent_instance):
@@ -331,168 +241,60 @@ class TestAgentMainInterfaceClaudeMessagesSaving:
 class TestAgentMainInterfaceRunMethod:
     """Test main run method of AgentMainInterface."""
 
-    @pytest.fixture
-    def agent_instance(self):
-        """Create AgentMainInterface instance with mocked dependencies."""
-        with patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Path.mkdir'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.ToolsVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.WorkflowVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase1ToolsOnboarding'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase2PlanningReflecting'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase3TransformExecution'), \
-             patch('builtins.print'):
-            return AgentMainInterface()
-
-    @patch.object(AgentMainInterface, '_print_banner')
-    @patch.object(AgentMainInterface, '_save_session_data')
-    @patch.object(AgentMainInterface, '_print_farewell')
-    def test_run_phase1_to_phase2_to_phase3_complete(self, mock_farewell, mock_save, 
-                                                    mock_banner, agent_instance):
-        """Test run method with complete workflow from phase 1 to 3."""
-        # Mock phase handlers
-        agent_instance.phase1_handler.run = Mock(return_value=True)
-        agent_instance.phase2_handler.run = Mock(return_value="next")
-        agent_instance.phase3_handler.run = Mock(return_value="complete")
-        
-        agent_instance.run()
-        
-        # Verify banner printed
-        mock_banner.assert_called_once()
-        
-        # Verify all phases executed
-        agent_instance.phase1_handler.run.assert_called_once()
-        agent_instance.phase2_handler.run.assert_called_once()
-        agent_instance.phase3_handler.run.assert_called_once()
-        
-        # Verify final phase is 3
-        assert agent_instance.current_phase == 3
-        
-        # Verify phase transitions recorded
-        assert len(agent_instance.session_data["phase_history"]) == 2
-        
-        # Verify cleanup methods called
-        mock_save.assert_called_once()
-        mock_farewell.assert_called_once()
-
-    @patch.object(AgentMainInterface, '_print_banner')
-    @patch.object(AgentMainInterface, '_save_session_data')
-    @patch.object(AgentMainInterface, '_print_farewell')
-    def test_run_phase1_exit(self, mock_farewell, mock_save, mock_banner, agent_instance):
-        """Test run method with exit in phase 1."""
-        # Mock phase 1 to return False (exit)
-        agent_instance.phase1_handler.run = Mock(return_value=False)
-        
-        agent_instance.run()
-        
-        # Verify only phase 1 executed
-        agent_instance.phase1_handler.run.assert_called_once()
-        
-        # Verify still in phase 1
-        assert agent_instance.current_phase == 1
-        
-        # Verify no phase transitions
-        assert len(agent_instance.session_data["phase_history"]) == 0
-        
-        # Verify cleanup methods called
-        mock_save.assert_called_once()
-        mock_farewell.assert_called_once()
-
-    @patch.object(AgentMainInterface, '_print_banner')
-    @patch.object(AgentMainInterface, '_save_session_data')
-    @patch.object(AgentMainInterface, '_print_farewell')
-    def test_run_phase3_back_to_phase2(self, mock_farewell, mock_save, mock_banner, agent_instance):
-        """Test run method with phase 3 going back to phase 2."""
-        # Mock phase handlers
-        agent_instance.phase1_handler.run = Mock(return_value=True)
-        agent_instance.phase2_handler.run = Mock(side_effect=["next", "exit"])
-        agent_instance.phase3_handler.run = Mock(return_value="back")
-        
-        agent_instance.run()
-        
-        # Verify execution flow
-        agent_instance.phase1_handler.run.assert_called_once()
-        assert agent_instance.phase2_handler.run.call_count == 2
-        agent_instance.phase3_handler.run.assert_called_once()
-        
-        # Verify phase transitions recorded
-        assert len(agent_instance.session_data["phase_history"]) == 3
-
-    @patch.object(AgentMainInterface, '_print_banner')
-    @patch.object(AgentMainInterface, '_save_session_data')
-    @patch.object(AgentMainInterface, '_print_farewell')
-    def test_run_phase3_restart_to_phase1(self, mock_farewell, mock_save, mock_banner, agent_instance):
-        """Test run method with phase 3 restarting to phase 1."""
-        # Mock phase handlers
-        agent_instance.phase1_handler.run = Mock(side_effect=[True, False])
-        agent_instance.phase2_handler.run = Mock(return_value="next")
-        agent_instance.phase3_handler.run = Mock(return_value="restart")
+    @pytest.fixture(autouse=True)
+    def run_hooks(self):
+        """Patch the banner, session saving and farewell around run."""
+        with patch.object(AgentMainInterface, '_print_banner') as mock_banner, \
+             patch.object(AgentMainInterface, '_save_session_data') as mock_save, \
+             patch.object(AgentMainInterface, '_print_farewell') as mock_farewell:
+            yield SimpleNamespace(banner=mock_banner, save=mock_save, farewell=mock_farewell)
+
+    @pytest.mark.parametrize(
+        "phase1_effect,phase2_effect,phase3_effect,expected_calls,expected_transitions,expected_phase,expected_message",
+        [
+            pytest.param(True, "next", "complete", (1, 1, 1), 2, 3, None, id="phase1_to_phase2_to_phase3_complete"),
+            pytest.param(False, None, None, (1, 0, 0), 0, 1, None, id="phase1_exit"),
+            pytest.param(True, ["next", "exit"], "back", (1, 2, 1), 3, 2, None, id="phase3_back_to_phase2"),
+            pytest.param([True, False], "next", "restart", (2, 1, 1), 3, 1, None, id="phase3_restart_to_phase1"),
+            pytest.param(KeyboardInterrupt(), None, None, (1, 0, 0), 0, 1, "Process interrupted by user", id="keyboard_interrupt"),
+            pytest.param(Exception("Unexpected error"), None, None, (1, 0, 0), 0, 1, "Unexpected error", id="unexpected_error"),
+        ],
+    )
+    @patch('builtins.print')
+    def test_run_phase_transitions(self, mock_print, run_hooks, agent_instance, phase1_effect, phase2_effect,
+                                   phase3_effect, expected_calls, expected_transitions, expected_phase, expected_message):
+        """Test run method phase transitions, interruptions and errors."""
+        handlers = (agent_instance.phase1_handler, agent_instance.phase2_handler, agent_instance.phase3_handler)
+        for handler, effect in zip(handlers, (phase1_effect, phase2_effect, phase3_effect)):
+            if isinstance(effect, (list, BaseException)):
+                handler.run = Mock(side_effect=effect)
+            else:
+                handler.run = Mock(return_value=effect)
         
         agent_instance.run()
         
         # Verify execution flow
-        assert agent_instance.phase1_handler.run.call_count == 2
-        agent_instance.phase2_handler.run.assert_called_once()
-        agent_instance.phase3_handler.run.assert_called_once()
+        assert tuple(handler.run.call_count for handler in handlers) == expected_calls
+        assert agent_instance.current_phase == expected_phase
         
         # Verify phase transitions recorded
-        assert len(agent_instance.session_data["phase_history"]) == 3
-
-    @patch.object(AgentMainInterface, '_print_banner')
-    @patch.object(AgentMainInterface, '_save_session_data')
-    @patch.object(AgentMainInterface, '_print_farewell')
-    @patch('builtins.print')
-    def test_run_keyboard_interrupt(self, mock_print, mock_farewell, mock_save, mock_banner, agent_instance):
-        """Test run method with keyboard interrupt."""
-        # Mock phase 1 to raise KeyboardInterrupt
-        agent_instance.phase1_handler.run = Mock(side_effect=KeyboardInterrupt())
-        
-        agent_instance.run()
-        
-        # Verify interrupt message printed
-        interrupt_calls = [call for call in mock_print.call_args_list 
-                          if call[0] and "Process interrupted by user" in str(call[0][0])]
-        assert len(interrupt_calls) > 0
-        
-        # Verify cleanup methods still called
-        mock_save.assert_called_once()
-        mock_farewell.assert_called_once()
-
-    @patch.object(AgentMainInterface, '_print_banner')
-    @patch.object(AgentMainInterface, '_save_session_data')
-    @patch.object(AgentMainInterface, '_print_farewell')
-    @patch('builtins.print')
-    def test_run_unexpected_error(self, mock_print, mock_farewell, mock_save, mock_banner, agent_instance):
-        """Test run method with unexpected error."""
-        # Mock phase 1 to raise unexpected exception
-        agent_instance.phase1_handler.run = Mock(side_effect=Exception("Unexpected error"))
-        
-        agent_instance.run()
+        assert len(agent_instance.session_data["phase_history"]) == expected_transitions
         
-        # Verify error message printed
-        error_calls = [call for call in mock_print.call_args_list 
-                      if call[0] and "Unexpected error" in str(call[0][0])]
-        assert len(error_calls) > 0
+        # Verify interrupt or error message printed
+        if expected_message is not None:
+            message_calls = [call for call in mock_print.call_args_list 
+                             if call[0] and expected_message in str(call[0][0])]
+            assert len(message_calls) > 0
         
-        # Verify cleanup methods still called
-        mock_save.assert_called_once()
-        mock_farewell.assert_called_once()
+        # Verify banner printed and cleanup methods called
+        run_hooks.banner.assert_called_once()
+        run_hooks.save.assert_called_once()
+        run_hooks.farewell.assert_called_once()
 
 
 class TestAgentMainInterfaceIntegration:
     """Integration tests for AgentMainInterface combining multiple methods."""
 
-    @pytest.fixture
-    def agent_instance(self):
-        """Create AgentMainInterface instance with mocked dependencies."""
-        with patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Path.mkdir'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.ToolsVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.WorkflowVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase1ToolsOnboarding'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase2PlanningReflecting'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase3TransformExecution'), \
-             patch('builtins.print'):
-            return AgentMainInterface()
-
     @patch('builtins.open', new_callable=mock_open)
     @patch('builtins.print')
     def test_complete_session_workflow(self, mock_print, mock_file, agent_instance):
@@ -523,23 +325,3 @@ class TestAgentMainInterfaceIntegration:
         # Verify visualizers called
         agent_instance.tools_visualizer.save_tools_visualization.assert_called_once()
         agent_instance.workflow_visualizer.save_workflow_visualization.assert_called_once()
-
-    def test_session_id_format_consistency(self):
-        """Test that session IDs are properly formatted and contain expected components."""
-        with patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Path.mkdir'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.ToolsVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.WorkflowVisualizer'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase1ToolsOnboarding'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase2PlanningReflecting'), \
-             patch('elastic_gumby_universal_orch_agent_prototype.agent_main.Phase3TransformExecution'), \
-             patch('builtins.print'):
-            
-            agent = AgentMainInterface()
-            
-            # Verify session ID format and consistency
-            assert agent.session_id.startswith("utoa_")
-            assert len(agent.session_id) == 20  # utoa_ + 8 digits + _ + 6 digits
-            assert agent.session_id == agent.session_data["session_id"]
-            
-            # Verify session directory path contains session ID
-            assert str(agent.session_dir).endswith(agent.session_id)
@@ -9,6 +9,7 @@ Tests designed for Coverlay compatibility:
 
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch
 
 import pytest
@@ -81,14 +82,14 @@ class TestSelectBestClient:
         region = "us-east-1"
         manager.client_usage[region]["tokens_this_minute"] = 15000
         manager.client_usage[region]["requests_this_minute"] = 5
-        manager.client_usage[region]["current_minute_start"] = time.time() - 61  # 61 seconds ago
+        manager.client_usage[region]["current_minute_start"] = time.monotonic() - 61  # 61 seconds ago
 
         selected_region, client = manager.select_best_client()
 
         # Counters should be reset
         assert manager.client_usage[region]["tokens_this_minute"] == 0
         assert manager.client_usage[region]["requests_this_minute"] == 0
-        assert manager.client_usage[region]["current_minute_start"] > time.time() - 5
+        assert manager.client_usage[region]["current_minute_start"] > time.monotonic() - 5
 
     @patch("boto3.client")
     @patch("time.sleep")
@@ -98,7 +99,7 @@ class TestSelectBestClient:
 
         manager = BedrockClientManager()
 
-        current_time = time.time()
+        current_time = time.monotonic()
 
         # Set all regions to token limit with different start times
         manager.client_usage["us-east-1"]["tokens_this_minute"] = 20000
@@ -138,7 +139,7 @@ class TestSelectBestClient:
 
         manager = BedrockClientManager()
 
-        current_time = time.time()
+        current_time = time.monotonic()
 
         # Set all regions to token limit, but one has already passed the minute mark
         manager.client_usage["us-east-1"]["tokens_this_minute"] = 20000
@@ -160,6 +161,23 @@ class TestSelectBestClient:
         assert region == "us-east-2"
         assert client == manager.bedrock_clients["us-east-2"]
 
+    @patch("boto3.client")
+    @patch("time.sleep")
+    def test_select_best_client_ignores_wall_clock_jumps(self, mock_sleep, mock_boto_client):
+        """Test that a wall-clock jump does not affect the rate-limit windows."""
+        mock_boto_client.return_value = Mock()
+
+        manager = BedrockClientManager()
+        manager.client_usage["us-east-1"]["tokens_this_minute"] = 5000
+
+        # Simulate the wall clock jumping back by an hour
+        with patch("time.time", return_value=time.time() - 3600):
+            region, client = manager.select_best_client()
+
+        mock_sleep.assert_not_called()
+        assert manager.client_usage["us-east-1"]["tokens_this_minute"] == 5000
+        assert region in ("us-east-2", "us-west-2")
+
 
 class TestUpdateClientUsage:
     """Test update_client_usage method."""
@@ -349,3 +367,243 @@ class TestInvokeModel:
         request_body = json.loads(call_args[1]["body"])
         assert request_body["max_tokens"] == 8000
         assert call_args[1]["modelId"] == "custom-model-id"
+
+
+class TestSerializeMessages:
+    """Test _serialize_messages method."""
+
+    @patch("boto3.client")
+    def test_serialize_messages_matches_json_dumps(self, mock_boto_client):
+        """Test that output is byte-identical to serializing the whole list."""
+        manager = BedrockClientManager()
+        messages = [
+            {"role": "user", "content": [{"type": "text", "text": "Plan \"this\" ✓"}]},
+            {"role": "assistant", "content": [{"type": "tool_use", "id": "t1", "input": {}}]},
+        ]
+
+        assert manager._serialize_messages(messages) == json.dumps(messages).encode()
+        assert manager._serialize_messages([]) == b"[]"
+
+    @patch("boto3.client")
+    def test_serialize_messages_reuses_previous_turns(self, mock_boto_client):
+        """Test that already sent messages are not encoded again on the next interaction."""
+        manager = BedrockClientManager()
+        first = {"role": "user", "content": "first"}
+        second = {"role": "assistant", "content": "second"}
+        manager._serialize_messages([first])
+
+        with patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.bedrock_client_manager.json.dumps",
+            wraps=json.dumps,
+        ) as mock_dumps:
+            result = manager._serialize_messages([first, second])
+
+        mock_dumps.assert_called_once_with(second)
+        assert result == json.dumps([first, second]).encode()
+
+    @patch("boto3.client")
+    def test_serialize_messages_replaced_message(self, mock_boto_client):
+        """Test that a replaced message is re-encoded and dropped messages are released."""
+        manager = BedrockClientManager()
+        first = {"role": "user", "content": "original"}
+        manager._serialize_messages([first, {"role": "assistant", "content": "old"}])
+
+        replaced = {**first, "content": "compressed"}
+        result = manager._serialize_messages([replaced])
+
+        assert result == json.dumps([replaced]).encode()
+        assert list(manager._thread_state.message_json) == [id(replaced)]
+
+
+class TestConcurrentUse:
+    """Test sharing one manager between conversations on several threads."""
+
+    @patch("boto3.client")
+    def test_concurrent_invocations_account_every_request(self, mock_boto_client):
+        """Test that usage counters stay exact when threads invoke the model at once."""
+        mock_client = Mock()
+        mock_client.invoke_model.side_effect = lambda **kwargs: {
+            "body": Mock(read=Mock(return_value=json.dumps(
+                {"content": [], "usage": {"input_tokens": 10, "output_tokens": 5}}
+            ).encode()))
+        }
+        mock_boto_client.return_value = mock_client
+        manager = BedrockClientManager()
+
+        def converse(index):
+            messages = [{"role": "user", "content": f"conversation {index}"}]
+            for turn in range(5):
+                manager.invoke_model(messages)
+                messages.append({"role": "assistant", "content": f"turn {turn}"})
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(converse, range(8)))
+
+        usage = manager.client_usage.values()
+        assert sum(region["total_requests"] for region in usage) == 40
+        assert sum(region["total_tokens"] for region in usage) == 40 * 15
+
+    @patch("boto3.client")
+    def test_message_memo_is_kept_per_thread(self, mock_boto_client):
+        """Test that a conversation on another thread does not evict this thread's messages."""
+        manager = BedrockClientManager()
+        first = {"role": "user", "content": "first"}
+        second = {"role": "assistant", "content": "second"}
+        other = {"role": "user", "content": "other conversation"}
+
+        with ThreadPoolExecutor(max_workers=1) as thread_a, ThreadPoolExecutor(max_workers=1) as thread_b:
+            thread_a.submit(manager._serialize_messages, [first]).result()
+            thread_b.submit(manager._serialize_messages, [other]).result()
+
+            with patch(
+                "elastic_gumby_universal_orch_agent_prototype.planner.bedrock_client_manager.json.dumps",
+                wraps=json.dumps,
+            ) as mock_dumps:
+                result = thread_a.submit(manager._serialize_messages, [first, second]).result()
+
+        mock_dumps.assert_called_once_with(second)
+        assert result == json.dumps([first, second]).encode()
+
+
+def _stream_event(data):
+    """Wrap an Anthropic streaming event the way Bedrock delivers it."""
+    return {"chunk": {"bytes": json.dumps(data).encode()}}
+
+
+class TestInvokeModelStream:
+    """Test invoke_model with stream=True."""
+
+    STREAM_EVENTS = [
+        {
+            "type": "message_start",
+            "message": {
+                "id": "msg_1",
+                "role": "assistant",
+                "content": [],
+                "usage": {"input_tokens": 10, "output_tokens": 1},
+            },
+        },
+        {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+        {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Hel"}},
+        {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "lo"}},
+        {"type": "content_block_stop", "index": 0},
+        {
+            "type": "content_block_start",
+            "index": 1,
+            "content_block": {"type": "tool_use", "id": "tool_1", "name": "execute_workflow", "input": {}},
+        },
+        {
+            "type": "content_block_delta",
+            "index": 1,
+            "delta": {"type": "input_json_delta", "partial_json": '{"name": "Wor'},
+        },
+        {
+            "type": "content_block_delta",
+            "index": 1,
+            "delta": {"type": "input_json_delta", "partial_json": 'kflow"}'},
+        },
+        {"type": "content_block_stop", "index": 1},
+        {
+            "type": "message_delta",
+            "delta": {"stop_reason": "tool_use", "stop_sequence": None},
+            "usage": {"output_tokens": 25},
+        },
+        {"type": "message_stop"},
+    ]
+
+    @patch("boto3.client")
+    def test_invoke_model_stream_assembles_message(self, mock_boto_client):
+        """Test that streamed events are assembled into the non-streaming response shape."""
+        mock_client = Mock()
+        mock_client.invoke_model_with_response_stream.return_value = {
+            "body": [_stream_event(event) for event in self.STREAM_EVENTS]
+        }
+        mock_boto_client.return_value = mock_client
+
+        manager = BedrockClientManager()
+        deltas = []
+
+        result = manager.invoke_model(
+            [{"role": "user", "content": "Test message"}], stream=True, on_text=deltas.append
+        )
+
+        assert deltas == ["Hel", "lo"]
+        assert result["stop_reason"] == "tool_use"
+        assert result["content"] == [
+            {"type": "text", "text": "Hello"},
+            {"type": "tool_use", "id": "tool_1", "name": "execute_workflow", "input": {"name": "Workflow"}},
+        ]
+        assert result["usage"] == {"input_tokens": 10, "output_tokens": 25}
+        mock_client.invoke_model.assert_not_called()
+
+        region = next(r for r, u in manager.client_usage.items() if u["total_requests"])
+        assert manager.client_usage[region]["total_tokens"] == 35
+
+    @patch("boto3.client")
+    def test_invoke_model_stream_error_event(self, mock_boto_client):
+        """Test that an error event in the stream is reported like other invocation errors."""
+        mock_client = Mock()
+        mock_client.invoke_model_with_response_stream.return_value = {
+            "body": [{"throttlingException": {"message": "Too many requests"}}]
+        }
+        mock_boto_client.return_value = mock_client
+
+        manager = BedrockClientManager()
+
+        result = manager.invoke_model([{"role": "user", "content": "Test message"}], stream=True)
+
+        assert "Error invoking model" in result["error"]
+        assert "throttlingException" in result["error"]
+        assert manager.client_usage[result["region"]]["errors"] == 1
+
+
+class TestRequestTemplate:
+    """Test _get_request_template method."""
+
+    @patch("boto3.client")
+    def test_request_template_reused_for_same_session(self, mock_boto_client):
+        """Test that the template is built once per (system_prompt, tools) pair."""
+        mock_boto_client.return_value = Mock()
+
+        manager = BedrockClientManager()
+        tool = {"name": "test_tool", "description": "A test tool"}
+
+        first = manager._get_request_template("system", [tool])
+        second = manager._get_request_template("system", [tool])
+
+        assert first[0] is second[0]
+        assert len(manager._request_templates) == 1
+
+    @patch("boto3.client")
+    def test_request_template_body_round_trip(self, mock_boto_client):
+        """Test that the spliced body decodes to the expected request."""
+        mock_boto_client.return_value = Mock()
+
+        manager = BedrockClientManager()
+        tools = [{"name": "test_tool", "description": "A test tool"}]
+        messages = [{"role": "user", "content": "Test message"}]
+
+        prefix, suffix = manager._get_request_template("system", tools)
+        body = prefix + json.dumps(messages).encode() + b', "max_tokens": 100' + suffix
+
+        assert json.loads(body) == {
+            "anthropic_version": "bedrock-2023-05-31",
+            "system": "system",
+            "tools": tools,
+            "messages": messages,
+            "max_tokens": 100,
+        }
+
+    @patch("boto3.client")
+    def test_request_template_cache_is_bounded(self, mock_boto_client):
+        """Test that the oldest template is evicted once the cache is full."""
+        mock_boto_client.return_value = Mock()
+
+        manager = BedrockClientManager()
+
+        for i in range(6):
+            manager._get_request_template(f"system {i}", None)
+
+        assert len(manager._request_templates) == 4
+        assert ("system 0", ()) not in manager._request_templates
+        assert ("system 5", ()) in manager._request_templates
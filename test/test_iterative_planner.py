@@ -7,9 +7,13 @@ Tests designed for Coverlay compatibility:
 - BrazilPythonTestSupport-3.0
 """
 
+import logging
 from unittest.mock import Mock, patch
 
-from elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner import IterativePlanner
+from elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner import (
+    WORKFLOW_LOADER_CACHE_SIZE,
+    IterativePlanner,
+)
 
 
 class TestGetSelfReflectionMessage:
@@ -256,6 +260,63 @@ class TestProcessToolUse:
                 "First part Second part", "Workflow Section 1 Reasoning Statement"
             )
 
+    @patch.object(IterativePlanner, "_get_self_reflection_message", return_value="reflection")
+    def test_process_tool_use_multiple_sections(self, mock_reflection):
+        """Test that several valid tool_use blocks in one response are each recorded and answered."""
+        content_list = [
+            {"type": "tool_use", "id": "tool_a", "input": {"root": {"name": "a"}}},
+            {"type": "tool_use", "id": "tool_b", "input": {"root": {"name": "b"}}},
+        ]
+        workflow_sections = []
+        messages = []
+
+        mock_workflow_loader = Mock()
+        mock_workflow_loader.load_workflow_from_json_string.side_effect = [
+            {"success": True, "workflow": {"root": {"name": "a"}}},
+            {"success": True, "workflow": {"root": {"name": "b"}}},
+        ]
+        self.planner.workflowLoader = mock_workflow_loader
+
+        with patch("builtins.print"):
+            self.planner._process_tool_use(content_list, workflow_sections, messages)
+
+        assert [section["section_number"] for section in workflow_sections] == [1, 2]
+        tool_results = messages[1]["content"]
+        assert [result["tool_use_id"] for result in tool_results] == ["tool_a", "tool_b"]
+        assert "Workflow section 1 received and recorded" in tool_results[0]["content"]
+        assert "Workflow section 2 received and recorded" in tool_results[1]["content"]
+
+    @patch.object(IterativePlanner, "_get_self_reflection_message", return_value="reflection")
+    def test_process_tool_use_invalid_block_between_valid_ones(self, mock_reflection):
+        """Test that blocks after an invalid one are rejected instead of taking over its section number."""
+        content_list = [
+            {"type": "tool_use", "id": "tool_a", "input": {"root": {"name": "a"}}},
+            {"type": "tool_use", "id": "tool_b", "input": {"root": {"name": "invalid"}}},
+            {"type": "tool_use", "id": "tool_c", "input": {"root": {"name": "c"}}},
+        ]
+        workflow_sections = []
+        messages = []
+
+        mock_workflow_loader = Mock()
+        mock_workflow_loader.load_workflow_from_json_string.side_effect = [
+            {"success": True, "workflow": {"root": {"name": "a"}}},
+            {"success": False, "errors": ["Bad node"]},
+        ]
+        self.planner.workflowLoader = mock_workflow_loader
+
+        with patch("builtins.print"):
+            self.planner._process_tool_use(content_list, workflow_sections, messages)
+
+        assert [section["section_number"] for section in workflow_sections] == [1]
+        assert mock_workflow_loader.load_workflow_from_json_string.call_count == 2
+
+        tool_results = messages[1]["content"]
+        assert [result["tool_use_id"] for result in tool_results] == ["tool_a", "tool_b", "tool_c"]
+        assert "Workflow section 1 received and recorded" in tool_results[0]["content"]
+        assert "Invalid tool_input for workflow section 2" in tool_results[1]["content"]
+        assert "Not recorded: workflow section 2 earlier in this response was invalid" in tool_results[2]["content"]
+        assert all("Workflow section 2 received" not in result["content"] for result in tool_results)
+
 
 class TestProcessFinalMessage:
     """Test _process_final_message method."""
@@ -468,12 +529,93 @@ class TestIterativePlanning:
             # Verify bedrock manager was called with correct parameters
             self.planner.bedrock_manager.invoke_model.assert_called_with(
                 messages=messages,
-                system_prompt=system_prompt,
+                system_prompt=[
+                    {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+                ],
                 max_tokens=8000,
-                tools=[workflow_tool],
+                tools=[{**workflow_tool, "cache_control": {"type": "ephemeral"}}],
                 model_id=self.planner.model_id,
+                stream=False,
+                on_text=None,
+            )
+            # The caller's tool definition must not be mutated
+            assert "cache_control" not in workflow_tool
+
+    @patch("builtins.print")
+    def test_iterative_planning_reuses_cached_prefix(self, mock_print):
+        """Test that the same system prompt and tools objects are sent on every interaction."""
+        messages = [{"role": "user", "content": [{"type": "text", "text": "test"}]}]
+        workflow_tool = {"name": "workflow_execution"}
+        available_tools = [{"name": "test_tool", "parameters": {}}]
+
+        unexpected_response = {"stop_reason": "max_tokens", "content": []}
+        end_response = {"stop_reason": "end_turn", "content": [{"type": "text", "text": "Done"}]}
+        self.planner.bedrock_manager.invoke_model = Mock(
+            side_effect=[unexpected_response, end_response]
+        )
+        self.planner.workflow_processor.combine_workflow_sections = Mock()
+
+        with patch.object(self.planner, "_process_final_message", return_value={}):
+            self.planner.iterative_planning(messages, "test prompt", workflow_tool, available_tools)
+
+        first_call, second_call = self.planner.bedrock_manager.invoke_model.call_args_list
+        assert first_call[1]["system_prompt"] is second_call[1]["system_prompt"]
+        assert first_call[1]["tools"] is second_call[1]["tools"]
+
+    @patch("builtins.print")
+    def test_iterative_planning_streaming(self, mock_print):
+        """Test that streaming planners request streamed responses and print text deltas."""
+        self.planner.stream = True
+        messages = [{"role": "user", "content": [{"type": "text", "text": "test"}]}]
+        available_tools = [{"name": "test_tool", "parameters": {}}]
+
+        end_response = {"stop_reason": "end_turn", "content": [{"type": "text", "text": "Done"}]}
+        self.planner.bedrock_manager.invoke_model = Mock(return_value=end_response)
+        self.planner.workflow_processor.combine_workflow_sections = Mock()
+
+        with patch.object(self.planner, "_process_final_message", return_value={}):
+            self.planner.iterative_planning(
+                messages, "test prompt", {"name": "workflow_execution"}, available_tools
+            )
+
+        call_kwargs = self.planner.bedrock_manager.invoke_model.call_args[1]
+        assert call_kwargs["stream"] is True
+        with patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.logging_config.USE_COLOR", True
+        ):
+            call_kwargs["on_text"]("partial text")
+        mock_print.assert_called_with(
+            "\x1b[36mpartial text\x1b[0m", end="", flush=True
+        )
+
+    @patch("builtins.print")
+    def test_iterative_planning_streamed_text_printed_once(self, mock_print, caplog):
+        """Test that streamed text is printed once and its line is ended after the response."""
+        self.planner.stream = True
+        messages = [{"role": "user", "content": [{"type": "text", "text": "test"}]}]
+        available_tools = [{"name": "test_tool", "parameters": {}}]
+
+        def stream_response(**kwargs):
+            kwargs["on_text"]("Planning ")
+            kwargs["on_text"]("done")
+            return {"stop_reason": "end_turn", "content": [{"type": "text", "text": "Planning done"}]}
+
+        self.planner.bedrock_manager.invoke_model = Mock(side_effect=stream_response)
+        self.planner.workflow_processor.extract_final_metadata = Mock(return_value={})
+
+        with caplog.at_level(logging.DEBUG), patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.logging_config.USE_COLOR", False
+        ):
+            self.planner.iterative_planning(
+                messages, "test prompt", {"name": "workflow_execution"}, available_tools
             )
 
+        printed = [call.args for call in mock_print.call_args_list]
+        assert printed.count(("Planning ",)) == 1
+        assert printed.count(("done",)) == 1
+        assert printed[printed.index(("done",)) + 1] == ()
+        assert "Planning done" not in caplog.text
+
     @patch("builtins.print")
     def test_iterative_planning_max_interactions_reached(self, mock_print):
         """Test iterative planning when max interactions limit is reached."""
@@ -520,6 +662,138 @@ class TestIterativePlanning:
                            if "Maximum interactions" in str(call)]
             assert len(warning_calls) > 0
 
+class TestGetWorkflowLoader:
+    """Test _get_workflow_loader method."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        with patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.BedrockClientManager"
+        ), patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.WorkflowProcessor"
+        ), patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.get_workflow_schema"
+        ), patch(
+            "builtins.print"
+        ):
+            self.planner = IterativePlanner()
+        IterativePlanner._loader_cache.clear()
+
+    def teardown_method(self):
+        """Drop loaders cached by these tests."""
+        IterativePlanner._loader_cache.clear()
+
+    def test_loader_reused_for_same_tools(self):
+        """Test that the same loader instance is returned for an equal tools definition."""
+        first = self.planner._get_workflow_loader({"test_tool": [{"name": "param1"}]})
+        second = self.planner._get_workflow_loader({"test_tool": [{"name": "param1"}]})
+
+        assert first is second
+        assert first.tools_definition == {"test_tool": [{"name": "param1"}]}
+
+    def test_loader_created_for_different_tools(self):
+        """Test that a new loader is created when the tools definition changes."""
+        first = self.planner._get_workflow_loader({"test_tool": [{"name": "param1"}]})
+        second = self.planner._get_workflow_loader({"test_tool": [{"name": "param2"}]})
+
+        assert first is not second
+        assert second.tools_definition == {"test_tool": [{"name": "param2"}]}
+
+    def test_loader_shared_across_planners(self):
+        """Test that a new planner, as created per generate_plan call, reuses the loader."""
+        with patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.BedrockClientManager"
+        ), patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.get_workflow_schema"
+        ), patch(
+            "builtins.print"
+        ):
+            other_planner = IterativePlanner()
+
+        first = self.planner._get_workflow_loader({"test_tool": [{"name": "param1"}]})
+        second = other_planner._get_workflow_loader({"test_tool": [{"name": "param1"}]})
+
+        assert first is second
+
+    def test_loader_cache_is_bounded(self):
+        """Test that the oldest loader is evicted beyond WORKFLOW_LOADER_CACHE_SIZE."""
+        first = self.planner._get_workflow_loader({"tool_0": []})
+        for i in range(1, WORKFLOW_LOADER_CACHE_SIZE + 1):
+            self.planner._get_workflow_loader({f"tool_{i}": []})
+
+        assert len(IterativePlanner._loader_cache) == WORKFLOW_LOADER_CACHE_SIZE
+        assert self.planner._get_workflow_loader({"tool_0": []}) is not first
+
+
+class TestCompressMessageHistory:
+    """Test _compress_message_history method."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        with patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.BedrockClientManager"
+        ), patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.WorkflowProcessor"
+        ), patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.get_workflow_schema"
+        ), patch(
+            "builtins.print"
+        ):
+            self.planner = IterativePlanner(history_window=2)
+
+    def _build_conversation(self, turn_pairs):
+        messages = [{"role": "user", "content": "WORKFLOW_DESCRIPTION: test"}]
+        workflow_sections = []
+        for i in range(1, turn_pairs + 1):
+            messages.append({"role": "assistant", "content": [{"type": "tool_use", "id": f"tool_{i}"}]})
+            messages.append(
+                {"role": "user", "content": [{"type": "tool_result", "tool_use_id": f"tool_{i}"}]}
+            )
+            workflow_sections.append(
+                {"section_number": i, "workflow_plan": {"name": f"Section {i}", "description": "desc"}}
+            )
+        return messages, workflow_sections
+
+    def test_history_within_window_untouched(self):
+        """Test that short conversations are not modified."""
+        messages, workflow_sections = self._build_conversation(2)
+        original = list(messages)
+
+        self.planner._compress_message_history(messages, workflow_sections)
+
+        assert messages == original
+
+    def test_history_compressed_to_window(self):
+        """Test that older turns are dropped and summarized in the first user message."""
+        messages, workflow_sections = self._build_conversation(4)
+
+        self.planner._compress_message_history(messages, workflow_sections)
+
+        assert len(messages) == 5
+        assert [m["role"] for m in messages] == ["user", "assistant", "user", "assistant", "user"]
+        assert messages[1]["content"][0]["id"] == "tool_3"
+        assert messages[-1]["content"][0]["tool_use_id"] == "tool_4"
+
+        first_content = messages[0]["content"]
+        assert first_content[0]["text"] == "WORKFLOW_DESCRIPTION: test"
+        assert "PREVIOUSLY_RECORDED_SECTIONS" in first_content[-1]["text"]
+        assert "Section 4" in first_content[-1]["text"]
+
+    def test_repeated_compression_replaces_summary(self):
+        """Test that a second compression replaces rather than appends the summary."""
+        messages, workflow_sections = self._build_conversation(4)
+        self.planner._compress_message_history(messages, workflow_sections)
+
+        messages.append({"role": "assistant", "content": [{"type": "tool_use", "id": "tool_5"}]})
+        messages.append({"role": "user", "content": [{"type": "tool_result", "tool_use_id": "tool_5"}]})
+        workflow_sections.append({"section_number": 5, "workflow_plan": {"name": "Section 5"}})
+        self.planner._compress_message_history(messages, workflow_sections)
+
+        assert len(messages) == 5
+        assert len(messages[0]["content"]) == 2
+        assert "Section 5" in messages[0]["content"][-1]["text"]
+
+
 class TestProcessNewSection:
     """Test _process_new_section method."""
 
@@ -630,3 +904,32 @@ class TestProcessSectionUpdate:
         assert workflow_sections[0]["workflow_plan"]["root"]["type"] == "tool_1"  # unchanged
         assert workflow_sections[1]["workflow_plan"] == new_workflow_plan  # updated
         assert workflow_sections[2]["workflow_plan"]["root"]["type"] == "tool_3"  # unchanged
+
+
+class TestReset:
+    """Test reset method."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        with patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.BedrockClientManager"
+        ), patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.WorkflowProcessor"
+        ), patch(
+            "elastic_gumby_universal_orch_agent_prototype.planner.iterative_planner.get_workflow_schema"
+        ), patch(
+            "builtins.print"
+        ):
+            self.planner = IterativePlanner()
+
+    def test_reset_rebinds_run_state(self):
+        """Test that reset drops run state without clearing history handed to callers."""
+        previous_messages = {"interaction_count": 3, "messages": [{"role": "user"}]}
+        self.planner.claude_messages = previous_messages
+        self.planner.workflowLoader = Mock()
+
+        self.planner.reset()
+
+        assert self.planner.claude_messages == {}
+        assert self.planner.workflowLoader is None
+        assert previous_messages["interaction_count"] == 3
@@ -0,0 +1,81 @@
+"""
+Tests for JSON Utilities
+
+Tests designed for Coverlay compatibility:
+- BrazilPython-Pytest-6.x
+- Python-Pytest-cov-3.x and Coverage-6.x
+- BrazilPythonTestSupport-3.0
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from elastic_gumby_universal_orch_agent_prototype import json_utils
+from elastic_gumby_universal_orch_agent_prototype.json_utils import dumps_compact, dumps_pretty, loads
+
+
+class TestDumpsPretty:
+    """Test dumps_pretty function."""
+
+    def test_dumps_pretty_matches_json_indent(self):
+        """Test that output matches the json module's 2-space indentation."""
+        data = {"name": "tool", "parameters": [{"name": "p1", "required": True}], "count": 3}
+
+        assert dumps_pretty(data) == json.dumps(data, indent=2)
+
+    def test_dumps_pretty_keeps_non_ascii(self):
+        """Test that non-ASCII characters are not escaped."""
+        assert dumps_pretty({"name": "café"}) == '{\n  "name": "café"\n}'
+
+    def test_dumps_pretty_non_string_keys_fallback(self):
+        """Test that objects orjson rejects still serialize through the json module."""
+        assert json.loads(dumps_pretty({1: "one"})) == {"1": "one"}
+
+    def test_dumps_pretty_without_orjson(self):
+        """Test the standard library fallback when orjson is not installed."""
+        data = {"name": "tool", "values": [1, 2]}
+
+        with patch.object(json_utils, "orjson", None):
+            assert dumps_pretty(data) == json.dumps(data, indent=2)
+
+
+class TestLoads:
+    """Test loads function."""
+
+    def test_loads_str_and_bytes(self):
+        """Test parsing both str and bytes documents."""
+        assert loads('{"a": [1, 2]}') == {"a": [1, 2]}
+        assert loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+
+    def test_loads_invalid_raises_value_error(self):
+        """Test that invalid JSON raises a ValueError subclass."""
+        with pytest.raises(ValueError):
+            loads("{not json}")
+
+    def test_loads_without_orjson(self):
+        """Test the standard library fallback when orjson is not installed."""
+        with patch.object(json_utils, "orjson", None):
+            assert loads('{"a": 1}') == {"a": 1}
+            with pytest.raises(json.JSONDecodeError):
+                loads("{not json}")
+
+
+class TestDumpsCompact:
+    """Test dumps_compact function."""
+
+    def test_dumps_compact_matches_stdlib(self):
+        """Test that output matches json.dumps with compact separators."""
+        data = {"name": "tool", "nested": {"values": [1, 2.5, None, True]}, "text": "café"}
+
+        assert dumps_compact(data) == json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    def test_dumps_compact_non_string_keys_fallback(self):
+        """Test that objects orjson rejects fall back to the json module."""
+        assert dumps_compact({1: "one"}) == '{"1":"one"}'
+
+    def test_dumps_compact_without_orjson(self):
+        """Test the standard library fallback when orjson is not installed."""
+        with patch.object(json_utils, "orjson", None):
+            assert dumps_compact({"a": [1, 2]}) == '{"a":[1,2]}'
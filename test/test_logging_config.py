@@ -0,0 +1,155 @@
+"""
+Tests for Planner Logging Configuration
+
+Tests designed for Coverlay compatibility:
+- BrazilPython-Pytest-6.x
+- Python-Pytest-cov-3.x and Coverage-6.x
+- BrazilPythonTestSupport-3.0
+"""
+
+import io
+import logging
+import logging.handlers
+from unittest.mock import Mock, patch
+
+import pytest
+from colorama import Fore
+
+from elastic_gumby_universal_orch_agent_prototype.planner import logging_config
+from elastic_gumby_universal_orch_agent_prototype.planner.logging_config import (
+    PACKAGE_LOGGER_NAME,
+    ColorFormatter,
+    colorize,
+    configure_logging,
+    console_print,
+    flush_logging,
+)
+
+
+@pytest.fixture
+def package_logger():
+    """Yield the package logger and restore its handlers and level afterwards."""
+    package_logger = logging.getLogger(PACKAGE_LOGGER_NAME)
+    original_handlers = list(package_logger.handlers)
+    original_level = package_logger.level
+    with patch.object(logging_config, "_planner_handler", None):
+        yield package_logger
+    package_logger.handlers = original_handlers
+    package_logger.setLevel(original_level)
+
+
+class TestColorFormatter:
+    """Test ColorFormatter class."""
+
+    def _make_record(self, level, message):
+        return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+    def test_format_without_colors(self):
+        """Test that no ANSI codes are injected when colors are disabled."""
+        formatter = ColorFormatter(use_colors=False)
+
+        result = formatter.format(self._make_record(logging.ERROR, "plain message"))
+
+        assert result == "plain message"
+
+    def test_format_with_colors(self):
+        """Test that records are wrapped in level color codes when colors are enabled."""
+        formatter = ColorFormatter(use_colors=True)
+
+        result = formatter.format(self._make_record(logging.ERROR, "colored message"))
+
+        assert result.startswith(ColorFormatter.LEVEL_COLORS[logging.ERROR])
+        assert "colored message" in result
+        assert result.endswith("\033[0m")
+
+
+class TestConfigureLogging:
+    """Test configure_logging function."""
+
+    def test_non_tty_stream_is_buffered(self, package_logger):
+        """Test that records are batched through a MemoryHandler for non-TTY streams."""
+        stream = io.StringIO()
+
+        handler = configure_logging(level=logging.INFO, stream=stream, buffer_capacity=10)
+        logging.getLogger(f"{PACKAGE_LOGGER_NAME}.planner").info("buffered message")
+
+        assert isinstance(handler, logging.handlers.MemoryHandler)
+        assert stream.getvalue() == ""
+
+        handler.flush()
+        assert stream.getvalue() == "buffered message\n"
+
+    def test_warning_flushes_buffer(self, package_logger):
+        """Test that warnings flush the buffered records immediately."""
+        stream = io.StringIO()
+
+        configure_logging(level=logging.INFO, stream=stream)
+        planner_logger = logging.getLogger(f"{PACKAGE_LOGGER_NAME}.planner")
+        planner_logger.info("first")
+        planner_logger.warning("second")
+
+        assert stream.getvalue() == "first\nsecond\n"
+
+    def test_tty_stream_is_colored_and_unbuffered(self, package_logger):
+        """Test that TTY streams get a colored StreamHandler without buffering."""
+        stream = Mock()
+        stream.isatty.return_value = True
+
+        handler = configure_logging(stream=stream)
+
+        assert isinstance(handler, logging.StreamHandler)
+        assert handler.formatter.use_colors is True
+
+    def test_configure_logging_is_idempotent(self, package_logger):
+        """Test that repeated configuration does not duplicate handlers."""
+        stream = io.StringIO()
+
+        first = configure_logging(stream=stream)
+        second = configure_logging(stream=stream)
+
+        assert first is second
+        assert package_logger.handlers.count(first) == 1
+
+    def test_default_stream_is_stdout(self, package_logger):
+        """Test that records go to stdout, the stream the planner prints to."""
+        stream = io.StringIO()
+
+        with patch("sys.stdout", stream):
+            configure_logging(buffer_capacity=10)
+            logging.getLogger(f"{PACKAGE_LOGGER_NAME}.planner").info("to stdout")
+            flush_logging()
+
+        assert stream.getvalue() == "to stdout\n"
+
+
+class TestConsolePrint:
+    """Test console_print and flush_logging functions."""
+
+    def test_console_print_flushes_buffered_records_first(self, package_logger):
+        """Test that buffered records are written before the printed message."""
+        stream = io.StringIO()
+        configure_logging(level=logging.INFO, stream=stream, buffer_capacity=10)
+        logging.getLogger(f"{PACKAGE_LOGGER_NAME}.planner").info("logged first")
+
+        with patch("sys.stdout", stream):
+            console_print("printed second")
+
+        assert stream.getvalue() == "logged first\nprinted second\n"
+
+    def test_flush_logging_without_handler(self, package_logger):
+        """Test that flushing is a no-op before configure_logging is called."""
+        flush_logging()
+
+
+class TestColorize:
+    """Test colorize function."""
+
+    def test_colorize_on_tty(self):
+        """Test that messages are wrapped in color codes when stdout is a TTY."""
+        with patch.object(logging_config, "USE_COLOR", True):
+            assert colorize(Fore.GREEN, "done") == f"{Fore.GREEN}done\033[0m"
+
+    def test_colorize_without_tty(self):
+        """Test that messages are returned unchanged when stdout is not a TTY."""
+        with patch.object(logging_config, "USE_COLOR", False):
+            assert colorize(Fore.GREEN, "done") == "done"
@@ -7,9 +7,35 @@ Tests designed for Coverlay compatibility:
 - BrazilPythonTestSupport-3.0
 """
 
+import json
 from unittest.mock import Mock, patch
 
-from elastic_gumby_universal_orch_agent_prototype.planner.utils import generate_plan, reflect_plan
+import pytest
+
+from elastic_gumby_universal_orch_agent_prototype.planner.utils import (
+    DEFAULT_TRIAGE_MODEL_ID,
+    FAST_PATH_MAX_WORDS,
+    EXECUTION_TOOL_DESCRIPTION,
+    _PLANNER_POOL,
+    _fast_path_plan,
+    _get_execution_tool,
+    _get_planner,
+    SYSTEM_PROMPT_COMMON,
+    SYSTEM_PROMPT_GENERATE,
+    SYSTEM_PROMPT_GENERATE_SIMPLE,
+    SYSTEM_PROMPT_REFLECT,
+    generate_plan,
+    reflect_plan,
+)
+
+
+
+@pytest.fixture(autouse=True)
+def clear_planner_pool():
+    """Keep pooled planners (often mocks) from leaking between tests."""
+    _PLANNER_POOL.clear()
+    yield
+    _PLANNER_POOL.clear()
 
 
 class TestGeneratePlan:
@@ -49,7 +75,8 @@ class TestGeneratePlan:
         mock_planner_class.assert_called_once_with(
             model_id=model_id,
             max_interactions=max_interactions,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            stream=False
         )
 
         # Verify iterative_planning was called with correct parameters
@@ -59,8 +86,13 @@ class TestGeneratePlan:
         # Check that messages contain the workflow description and tools
         messages = call_args[1]['messages']
         assert len(messages) == 1
-        assert workflow_description in messages[0]['content']
-        assert "data_processor" in messages[0]['content']
+        static_block, dynamic_block = messages[0]['content']
+        assert workflow_description in dynamic_block['text']
+        assert "data_processor" in static_block['text']
+
+        # Static tools context sits behind a prompt caching breakpoint
+        assert static_block['cache_control'] == {"type": "ephemeral"}
+        assert 'cache_control' not in dynamic_block
 
         # Check system prompt and tool are provided
         assert 'system_prompt' in call_args[1]
@@ -87,7 +119,8 @@ class TestGeneratePlan:
         mock_planner_class.assert_called_once_with(
             model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
             max_interactions=20,
-            max_tokens=8000
+            max_tokens=8000,
+            stream=False
         )
 
     @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
@@ -110,9 +143,64 @@ class TestGeneratePlan:
         mock_planner_class.assert_called_once_with(
             model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
             max_interactions=20,
-            max_tokens=8000
+            max_tokens=8000,
+            stream=False
         )
 
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
+    def test_generate_plan_triaged_simple(self, mock_planner_class):
+        """Test that a simple triage result switches to the single-pass system prompt."""
+        mock_planner = Mock()
+        mock_planner.workflow_schema = {"type": "object"}
+        mock_planner.bedrock_manager.invoke_model.return_value = {
+            "content": [{"type": "text", "text": '{"complexity": "simple", "estimated_sections": 1}'}]
+        }
+        mock_planner_class.return_value = mock_planner
+
+        with patch('builtins.print'):
+            generate_plan(
+                "Send one email",
+                [{"name": "send_email"}, {"name": "read_file"}],
+                triage_model_id=DEFAULT_TRIAGE_MODEL_ID,
+            )
+
+        triage_kwargs = mock_planner.bedrock_manager.invoke_model.call_args[1]
+        assert triage_kwargs["model_id"] == DEFAULT_TRIAGE_MODEL_ID
+        assert "send_email, read_file" in triage_kwargs["messages"][0]["content"]
+        planning_kwargs = mock_planner.iterative_planning.call_args[1]
+        assert planning_kwargs["system_prompt"] == SYSTEM_PROMPT_GENERATE_SIMPLE
+
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
+    def test_generate_plan_triage_failure_uses_full_prompt(self, mock_planner_class):
+        """Test that complex or unreadable triage results keep the full planning prompt."""
+        mock_planner = Mock()
+        mock_planner.workflow_schema = {"type": "object"}
+        mock_planner_class.return_value = mock_planner
+
+        for triage_response in (
+            {"content": [{"type": "text", "text": '{"complexity": "complex", "estimated_sections": 4}'}]},
+            {"content": [{"type": "text", "text": "not json"}]},
+            {"error": "Throttled", "region": "us-east-1"},
+        ):
+            mock_planner.bedrock_manager.invoke_model.return_value = triage_response
+            with patch('builtins.print'):
+                generate_plan("Process data", [], triage_model_id=DEFAULT_TRIAGE_MODEL_ID)
+
+            planning_kwargs = mock_planner.iterative_planning.call_args[1]
+            assert planning_kwargs["system_prompt"] == SYSTEM_PROMPT_GENERATE
+
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
+    def test_generate_plan_without_triage(self, mock_planner_class):
+        """Test that no triage request is made unless a triage model is given."""
+        mock_planner = Mock()
+        mock_planner.workflow_schema = {"type": "object"}
+        mock_planner_class.return_value = mock_planner
+
+        with patch('builtins.print'):
+            generate_plan("Process data", [])
+
+        mock_planner.bedrock_manager.invoke_model.assert_not_called()
+
 
 class TestReflectPlan:
     """Test reflect_plan function."""
@@ -157,7 +245,8 @@ class TestReflectPlan:
         mock_planner_class.assert_called_once_with(
             model_id=model_id,
             max_interactions=max_interactions,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            stream=False
         )
 
         # Verify iterative_planning was called
@@ -167,10 +256,11 @@ class TestReflectPlan:
         # Check that messages contain the existing plan, feedback, and tools
         messages = call_args[1]['messages']
         assert len(messages) == 1
-        message_content = messages[0]['content']
-        assert "original_workflow" in message_content
-        assert user_feedback in message_content
-        assert "error_handler" in message_content
+        static_block, dynamic_block = messages[0]['content']
+        assert "original_workflow" in static_block['text']
+        assert "error_handler" in static_block['text']
+        assert user_feedback in dynamic_block['text']
+        assert static_block['cache_control'] == {"type": "ephemeral"}
 
         # Check system prompt and tool are provided
         assert 'system_prompt' in call_args[1]
@@ -200,7 +290,8 @@ class TestReflectPlan:
         mock_planner_class.assert_called_once_with(
             model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
             max_interactions=20,
-            max_tokens=8000
+            max_tokens=8000,
+            stream=False
         )
 
     @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
@@ -225,11 +316,236 @@ class TestReflectPlan:
         # Check that empty feedback is still passed to the planner
         call_args = mock_planner.iterative_planning.call_args
         messages = call_args[1]['messages']
-        assert empty_feedback in messages[0]['content']
+        assert "USER_FEEDBACK:\n\n" in messages[0]['content'][1]['text']
         
         # Verify default parameters are used
         mock_planner_class.assert_called_once_with(
             model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0",
             max_interactions=20,
-            max_tokens=8000
-        )
\ No newline at end of file
+            max_tokens=8000,
+            stream=False
+        )
+
+
+class TestPromptJson:
+    """Test the JSON context sent in the first planning message."""
+
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
+    def test_reflect_plan_context_is_compact(self, mock_planner_class):
+        """Test that the tools and existing plan carry no indentation or separator whitespace."""
+        mock_planner = Mock()
+        mock_planner.workflow_schema = {"type": "object"}
+        mock_planner.iterative_planning.return_value = {}
+        mock_planner_class.return_value = mock_planner
+
+        with patch('builtins.print'):
+            reflect_plan({"root": {"type": "tool_call"}}, "Add a step", [{"name": "tool_c", "parameters": []}])
+
+        static_context = mock_planner.iterative_planning.call_args[1]["messages"][0]["content"][0]["text"]
+        assert '[{"name":"tool_c","parameters":[]}]' in static_context
+        assert '{"root":{"type":"tool_call"}}' in static_context
+
+
+class TestGetExecutionTool:
+    """Test _get_execution_tool helper."""
+
+    def test_execution_tool_reused_for_equal_schema(self):
+        """Test that equal schema copies return the same tool object."""
+        first = _get_execution_tool(EXECUTION_TOOL_DESCRIPTION, {"type": "object"})
+        second = _get_execution_tool(EXECUTION_TOOL_DESCRIPTION, {"type": "object"})
+
+        assert first is second
+        assert first["name"] == "execute_workflow"
+        assert first["description"] == EXECUTION_TOOL_DESCRIPTION
+
+    def test_execution_tool_rebuilt_for_changed_schema(self):
+        """Test that a different schema produces a new tool definition."""
+        first = _get_execution_tool("Custom description", {"type": "object"})
+        second = _get_execution_tool("Custom description", {"type": "array"})
+
+        assert first is not second
+        assert second["input_schema"] == {"type": "array"}
+        assert second["description"] == "Custom description"
+
+
+class TestSharedPromptPrefix:
+    """Test that generate_plan and reflect_plan share one cacheable request prefix."""
+
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
+    def test_generate_and_reflect_share_prefix(self, mock_planner_class):
+        """Test that both utilities send the same tool and the same cached system block first."""
+        mock_planner = Mock()
+        mock_planner.workflow_schema = {"type": "object", "properties": {}}
+        mock_planner.iterative_planning.return_value = {}
+        mock_planner_class.return_value = mock_planner
+
+        with patch('builtins.print'):
+            generate_plan("Process data", [])
+            generate_kwargs = mock_planner.iterative_planning.call_args[1]
+            reflect_plan({"root": {}}, "Add a step", [])
+            reflect_kwargs = mock_planner.iterative_planning.call_args[1]
+
+        assert generate_kwargs["workflow_execution_tool"] is reflect_kwargs["workflow_execution_tool"]
+        assert generate_kwargs["system_prompt"] is SYSTEM_PROMPT_GENERATE
+        assert reflect_kwargs["system_prompt"] is SYSTEM_PROMPT_REFLECT
+        assert SYSTEM_PROMPT_GENERATE[0] == SYSTEM_PROMPT_REFLECT[0]
+        assert SYSTEM_PROMPT_GENERATE[0]["text"] == SYSTEM_PROMPT_COMMON
+        assert SYSTEM_PROMPT_GENERATE[0]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in SYSTEM_PROMPT_GENERATE[1]
+        assert "WORKFLOW_DESCRIPTION" in SYSTEM_PROMPT_GENERATE[1]["text"]
+        assert "USER_FEEDBACK" in SYSTEM_PROMPT_REFLECT[1]["text"]
+
+
+class TestFastPathPlan:
+    """Test the rule-based fast path for trivial workflow descriptions."""
+
+    TOOLS = [
+        {"name": "send_email", "parameters": [{"name": "to"}, {"name": "subject"}]},
+        {"name": "read_file", "parameters": [{"name": "path"}]},
+    ]
+
+    def test_fast_path_single_tool_with_all_parameters(self):
+        """Test that a single named tool with every parameter assigned becomes one tool_call."""
+        result = _fast_path_plan('Call send_email with to=ops@example.com subject="Daily run"', self.TOOLS)
+
+        assert result["root"] == {
+            "type": "tool_call",
+            "description": 'Call send_email with to=ops@example.com subject="Daily run"',
+            "toolName": "send_email",
+            "parameters": {"to": "ops@example.com", "subject": "Daily run"},
+            "outputVariable": "send_email_result",
+        }
+
+    def test_fast_path_rejects_unclear_descriptions(self):
+        """Test that anything other than a clean single-tool match is left to the model."""
+        descriptions = [
+            "Call send_email with to=ops@example.com",  # missing parameter
+            "Call read_file with path=a.txt mode=r",  # unknown parameter
+            "Call read_file with path=a.txt then send_email with to=x subject=y",  # two tools
+            "Call read_file with path={% $previous.path %}",  # variable reference
+            "Summarize the latest report and notify the team",  # no tool named
+            "Call read_file with path=a.txt " + "please " * FAST_PATH_MAX_WORDS,  # too long
+            "Call read_file with path=a.txt and summarize it",  # follow-up intent
+        ]
+
+        for description in descriptions:
+            assert _fast_path_plan(description, self.TOOLS) is None, description
+
+    def test_fast_path_rejects_zero_parameter_tool_with_follow_up(self):
+        """Test that prose beyond filler words keeps a zero-parameter tool off the fast path."""
+        tools = [{"name": "ping", "parameters": []}, *self.TOOLS]
+
+        assert _fast_path_plan("ping the server then email the results to my boss", tools) is None
+        assert _fast_path_plan("Please run the ping tool", tools)["root"]["toolName"] == "ping"
+
+    def test_fast_path_coerces_declared_parameter_types(self):
+        """Test that values are converted to the declared number and boolean types."""
+        tools = [{"name": "resize", "parameters": [
+            {"name": "count", "type": "number"},
+            {"name": "enabled", "type": "boolean"},
+            {"name": "ratio", "type": "number"},
+        ]}]
+
+        result = _fast_path_plan("call resize with count=5 enabled=false ratio=0.5", tools)
+
+        assert result["root"]["parameters"] == {"count": 5, "enabled": False, "ratio": 0.5}
+
+    def test_fast_path_rejects_mistyped_parameters(self):
+        """Test that values not fitting their declared type are left to the model."""
+        tools = [{"name": "resize", "parameters": [
+            {"name": "count", "type": "integer"},
+            {"name": "enabled", "type": "boolean"},
+        ]}]
+
+        assert _fast_path_plan("call resize with count=five enabled=false", tools) is None
+        assert _fast_path_plan("call resize with count=5 enabled=maybe", tools) is None
+        assert _fast_path_plan("call resize with count=5.5 enabled=true", tools) is None
+
+    def test_fast_path_rejects_structured_parameters(self):
+        """Test that object and array parameters are left to the model."""
+        tools = [{"name": "tag", "parameters": [
+            {"name": "labels", "type": "array"},
+            {"name": "options", "type": "object"},
+        ]}]
+
+        assert _fast_path_plan('call tag with labels=["a"] options={"fast":true}', tools) is None
+
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.WorkflowLoader')
+    def test_fast_path_plan_is_validated(self, mock_loader_class):
+        """Test that a matched plan is loaded by the WorkflowLoader and dropped when it fails."""
+        mock_loader = mock_loader_class.return_value
+        mock_loader.load_workflow_from_json_string.return_value = {"success": False, "errors": ["Bad plan"]}
+
+        assert _fast_path_plan("Call read_file with path=/tmp/validated.txt", self.TOOLS) is None
+
+        loaded_plan = json.loads(mock_loader.load_workflow_from_json_string.call_args[0][0])
+        assert loaded_plan["root"]["parameters"] == {"path": "/tmp/validated.txt"}
+        assert mock_loader_class.call_args[1]["tools_definition"]["read_file"] == [{"name": "path"}]
+
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
+    def test_generate_plan_fast_path_skips_planner(self, mock_planner_class):
+        """Test that generate_plan with fast_path returns without creating a planner."""
+        with patch('builtins.print'):
+            workflow_plan, claude_messages = generate_plan(
+                "Call read_file with path=/tmp/input.txt", self.TOOLS, fast_path=True
+            )
+
+        mock_planner_class.assert_not_called()
+        assert workflow_plan["root"]["toolName"] == "read_file"
+        assert claude_messages["interaction_count"] == 0
+        assert claude_messages["messages"] == []
+
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
+    def test_generate_plan_fast_path_falls_back_to_planner(self, mock_planner_class):
+        """Test that non-trivial descriptions still go through the planner."""
+        mock_planner = Mock()
+        mock_planner.workflow_schema = {"type": "object"}
+        mock_planner.iterative_planning.return_value = {"name": "planned"}
+        mock_planner_class.return_value = mock_planner
+
+        with patch('builtins.print'):
+            workflow_plan, _ = generate_plan("Read a file and email it", self.TOOLS, fast_path=True)
+
+        assert workflow_plan == {"name": "planned"}
+        mock_planner.iterative_planning.assert_called_once()
+
+
+class TestGetPlanner:
+    """Test _get_planner pooling."""
+
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
+    def test_planner_reused_and_reset_for_same_configuration(self, mock_planner_class):
+        """Test that the same configuration reuses one planner and resets it between runs."""
+        first = _get_planner("model-a", 20, 8000, False)
+        second = _get_planner("model-a", 20, 8000, False)
+
+        assert first is second
+        mock_planner_class.assert_called_once_with(
+            model_id="model-a", max_interactions=20, max_tokens=8000, stream=False
+        )
+        first.reset.assert_called_once_with()
+
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
+    def test_planner_created_per_configuration(self, mock_planner_class):
+        """Test that a different configuration gets its own planner."""
+        mock_planner_class.side_effect = lambda **kwargs: Mock()
+
+        first = _get_planner("model-a", 20, 8000, False)
+        second = _get_planner("model-b", 20, 8000, False)
+
+        assert first is not second
+        assert mock_planner_class.call_count == 2
+
+    @patch('elastic_gumby_universal_orch_agent_prototype.planner.utils.IterativePlanner')
+    def test_generate_and_reflect_share_pooled_planner(self, mock_planner_class):
+        """Test that consecutive utility calls reuse the planner created by the first."""
+        mock_planner = Mock()
+        mock_planner.workflow_schema = {"type": "object"}
+        mock_planner_class.return_value = mock_planner
+
+        with patch('builtins.print'):
+            generate_plan("Process data", [])
+            reflect_plan({"root": {}}, "Add a step", [])
+
+        mock_planner_class.assert_called_once()
+        assert mock_planner.iterative_planning.call_count == 2
@@ -10,6 +10,7 @@ Tests designed for Coverlay compatibility:
 import pytest
 from unittest.mock import patch
 
+from elastic_gumby_universal_orch_agent_prototype.planner import logging_config
 from elastic_gumby_universal_orch_agent_prototype.transform.tool_description_transformer import ToolDescriptionTransformer
 
 class TestTransformDescription:
@@ -102,7 +103,7 @@ class TestTransformDescription:
         invalid_validation = {"success": False, "tools": []}
         
         transformer.bedrock_manager.invoke_model.return_value = invalid_response
-        transformer.tools_loader.load_tools_from_json_string.return_value = invalid_validation
+        transformer.tools_loader.load_tools_from_dict.return_value = invalid_validation
         
         tool_description = "A tool description"
         result = transformer.transform_description(tool_description)
@@ -163,7 +164,7 @@ class TestProcessToolUse:
             }]
         }
         
-        transformer.tools_loader.load_tools_from_json_string.return_value = mock_validation_result
+        transformer.tools_loader.load_tools_from_dict.return_value = mock_validation_result
         
         with patch.object(transformer, '_print_assistant_text') as mock_print:
             result = transformer.process_tool_use(content_list, messages)
@@ -199,7 +200,7 @@ class TestProcessToolUse:
         
         # Mock validation failure
         mock_validation_result = {"success": False, "tools": []}
-        transformer.tools_loader.load_tools_from_json_string.return_value = mock_validation_result
+        transformer.tools_loader.load_tools_from_dict.return_value = mock_validation_result
         
         result = transformer.process_tool_use(content_list, messages)
         
@@ -282,7 +283,7 @@ class TestIntegrationScenarios:
         }
         
         transformer.bedrock_manager.invoke_model.return_value = mock_response
-        transformer.tools_loader.load_tools_from_json_string.return_value = mock_validation_result
+        transformer.tools_loader.load_tools_from_dict.return_value = mock_validation_result
         
         result = transformer.transform_description(tool_description)
         
@@ -291,4 +292,52 @@ class TestIntegrationScenarios:
         assert len(result["parameters"]) == 2
         assert result["parameters"][1]["default_value"]["format"] == "json"
         assert "schema" in result["return"]
-        assert "properties" in result["return"]["schema"]
\ No newline at end of file
+        assert "properties" in result["return"]["schema"]
+
+
+class TestTransformDescriptions:
+    """Test transform_descriptions method."""
+
+    @pytest.fixture
+    def transformer(self):
+        """Create ToolDescriptionTransformer instance with mocked dependencies."""
+        with patch('elastic_gumby_universal_orch_agent_prototype.transform.tool_description_transformer.get_tools_schema') as mock_schema, \
+             patch('elastic_gumby_universal_orch_agent_prototype.transform.tool_description_transformer.BedrockClientManager'), \
+             patch('elastic_gumby_universal_orch_agent_prototype.transform.tool_description_transformer.ToolsLoader'):
+
+            mock_schema.return_value = {"type": "object"}
+            return ToolDescriptionTransformer()
+
+    def test_transform_descriptions_keeps_input_order(self, transformer):
+        """Test that concurrent transformations are returned in input order."""
+        descriptions = [f"tool {index}" for index in range(5)]
+
+        with patch.object(transformer, "transform_description", side_effect=lambda d: {"name": d}) as mock_transform:
+            results = transformer.transform_descriptions(descriptions, max_workers=3)
+
+        assert results == [{"name": description} for description in descriptions]
+        assert mock_transform.call_count == 5
+
+    def test_transform_descriptions_uses_shared_system_prompt(self, transformer):
+        """Test that every conversation is sent the class-level system prompt."""
+        transformer.bedrock_manager.invoke_model.return_value = {"stop_reason": "end_turn", "content": []}
+
+        with patch.object(transformer, "_print_assistant_text"):
+            results = transformer.transform_descriptions(["first", "second"])
+
+        assert results == [{}, {}]
+        for call in transformer.bedrock_manager.invoke_model.call_args_list:
+            assert call.kwargs["system_prompt"] is ToolDescriptionTransformer.SYSTEM_PROMPT
+
+
+class TestPrintAssistantText:
+    """Test _print_assistant_text method."""
+
+    def test_print_without_tty_has_no_color_codes(self, capsys):
+        """Test that assistant text is printed without ANSI codes when stdout is not a TTY."""
+        transformer = ToolDescriptionTransformer.__new__(ToolDescriptionTransformer)
+
+        with patch.object(logging_config, "USE_COLOR", False):
+            transformer._print_assistant_text("  reasoning  ", "Context")
+
+        assert capsys.readouterr().out == f"Context\n{'─' * 80}\nreasoning\n{'─' * 80}\n"
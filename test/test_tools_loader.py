@@ -136,6 +136,47 @@ class TestLoadToolsFromJsonString:
         assert result["tools"] == []
 
 
+class TestLoadToolsFromDict:
+    """Test load_tools_from_dict method."""
+
+    def test_load_parsed_tool_without_reserializing(self):
+        """Test that parsed tool data is validated and returned as-is."""
+        tool = {
+            "name": "test_tool",
+            "description": "A test tool",
+            "resource": "arn:aws:lambda:us-west-2:123456789012:function:test_function",
+            "parameters": [],
+            "return": {"type": "string", "description": "Test result"},
+        }
+
+        loader = ToolsLoader(use_colors=False)
+
+        with patch.object(loader, "_print_status"), patch("json.loads") as mock_loads:
+            result = loader.load_tools_from_dict(tool)
+
+        mock_loads.assert_not_called()
+        assert result["success"] is True
+        assert result["tools"] == [tool]
+
+    def test_load_invalid_parsed_tool(self):
+        """Test that invalid parsed tool data is rejected."""
+        loader = ToolsLoader(use_colors=False)
+
+        with patch.object(loader, "_print_status"):
+            result = loader.load_tools_from_dict({"name": "tool", "description": "No resource"})
+
+        assert result == {"success": False, "tools": []}
+
+    def test_json_string_delegates_to_dict(self):
+        """Test that load_tools_from_json_string parses once and delegates."""
+        loader = ToolsLoader(use_colors=False)
+
+        with patch.object(loader, "load_tools_from_dict", return_value={"success": True, "tools": []}) as mock_load:
+            loader.load_tools_from_json_string(' [{"name": "tool"}] ')
+
+        mock_load.assert_called_once_with([{"name": "tool"}])
+
+
 class TestExtractToolsFromData:
     """Test _extract_tools_from_data method."""
 
@@ -176,6 +217,15 @@ class TestExtractToolsFromData:
 
         assert result == [{"name": "tool1"}]
 
+    def test_extract_prefers_container_keys_in_order(self):
+        """Test that container keys are checked in order and null containers are skipped."""
+        loader = ToolsLoader()
+        data = {"tool_definitions": [{"name": "tool2"}], "tools": [{"name": "tool1"}], "available_tools": None}
+
+        result = loader._extract_tools_from_data(data)
+
+        assert result == [{"name": "tool1"}]
+
     def test_extract_from_invalid_data_type(self):
         """Test extracting from invalid data type."""
         loader = ToolsLoader()
@@ -286,6 +336,19 @@ class TestValidateToolStructure:
         assert any("Missing required field: parameters" in error for error in result["errors"])
         assert any("Missing required field: return" in error for error in result["errors"])
 
+    def test_validate_tool_missing_fields_reported_in_order(self):
+        """Test that missing required fields are reported in declaration order."""
+        loader = ToolsLoader()
+        result = loader._validate_tool_structure({})
+
+        assert result["errors"] == [
+            "Missing required field: name",
+            "Missing required field: description",
+            "Missing required field: resource",
+            "Missing required field: parameters",
+            "Missing required field: return",
+        ]
+
     def test_validate_tool_with_invalid_parameters_type(self):
         """Test validation of tool with invalid parameters type."""
         tool = {
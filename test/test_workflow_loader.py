@@ -8,6 +8,7 @@ Tests designed for Coverlay compatibility:
 """
 
 import json
+import sys
 from unittest.mock import patch
 
 import pytest
@@ -98,6 +99,57 @@ class TestLoadWorkflowFromJsonString:
         assert "ifTrue" in result["workflow"]["root"]
         assert "ifFalse" in result["workflow"]["root"]
 
+    def test_load_workflow_from_bytes_with_whitespace(self):
+        """Test loading a whitespace-padded workflow given as UTF-8 bytes."""
+        workflow_data = {
+            "name": "Bytes Workflow",
+            "description": "Workflow passed as bytes",
+            "root": {"type": "user_input", "prompt": "Continue?", "inputType": "boolean", "outputVariable": "ok"}
+        }
+
+        loader = WorkflowLoader(use_colors=False)
+
+        with patch.object(loader, "_print_status"):
+            result = loader.load_workflow_from_json_string(("\n  " + json.dumps(workflow_data) + "  \n").encode())
+
+        assert result["workflow"] == workflow_data
+
+    def test_load_workflow_falls_back_for_non_standard_json(self):
+        """Test that documents only the json module accepts (e.g. NaN) still load."""
+        workflow_json = (
+            '{"name": "NaN Workflow", "description": "Workflow with NaN", '
+            '"root": {"type": "tool_call", "toolName": "tool", "parameters": {"limit": NaN}}}'
+        )
+
+        loader = WorkflowLoader(use_colors=False)
+
+        with patch.object(loader, "_print_status"):
+            result = loader.load_workflow_from_json_string(workflow_json)
+
+        limit = result["workflow"]["root"]["parameters"]["limit"]
+        assert limit != limit  # NaN
+
+    def test_load_workflow_with_padded_json_string_properties(self):
+        """Test that whitespace-padded JSON string properties are parsed and plain strings kept."""
+        workflow_data = {
+            "name": "Padded Properties",
+            "description": "Workflow with padded JSON string properties",
+            "root": {
+                "type": "tool_call",
+                "toolName": "tool",
+                "parameters": '\n  {"limit": 5}  \n',
+                "outputVariable": "result"
+            }
+        }
+
+        loader = WorkflowLoader(use_colors=False)
+
+        with patch.object(loader, "_print_status"):
+            result = loader.load_workflow_from_json_string(json.dumps(workflow_data))
+
+        assert result["workflow"]["root"]["parameters"] == {"limit": 5}
+        assert result["workflow"]["root"]["outputVariable"] == "result"
+
     def test_load_workflow_with_json_string_parameters(self):
         """Test loading workflow with JSON string parameters."""
         workflow_data = {
@@ -144,6 +196,16 @@ class TestLoadWorkflowFromJsonString:
             Colors.RED
         )
 
+    def test_load_quiet_prints_nothing(self, capsys):
+        """Test that a quiet loader reports errors in the result without printing them."""
+        loader = WorkflowLoader(use_colors=False, quiet=True)
+
+        result = loader.load_workflow_from_json_string('{"name": "Invalid", "root": invalid json}')
+
+        assert result["success"] is False
+        assert result["errors"] == ["Invalid JSON format: Expecting value: line 1 column 29 (char 28)"]
+        assert capsys.readouterr().out == ""
+
     def test_load_workflow_no_valid_structure(self):
         """Test loading JSON without valid workflow structure."""
         invalid_data = {
@@ -271,6 +333,24 @@ class TestValidateWorkflow:
         assert result["is_valid"] is False
         assert "Workflow must have a 'description' property" in result["errors"]
 
+    def test_validate_workflow_non_string_name(self):
+        """Test that a non-string name is reported as an error."""
+        workflow = {
+            "name": 42,
+            "description": "Workflow with a numeric name",
+            "root": {
+                "type": "tool_call",
+                "toolName": "test_tool",
+                "parameters": {}
+            }
+        }
+
+        loader = WorkflowLoader(tools_definition={"test_tool": []})
+        result = loader.validate_workflow(workflow)
+
+        assert result["is_valid"] is False
+        assert result["errors"] == ["Workflow 'name' property must be a string"]
+
     def test_validate_workflow_missing_root(self):
         """Test validation of workflow missing root."""
         workflow = {
@@ -510,6 +590,34 @@ class TestValidateNodeContent:
         assert len(validation_result["errors"]) == 1
         assert "should follow {% $varName %} format" in validation_result["errors"][0]
 
+    def test_validate_sub_property_references(self):
+        """Test that $var.sub references in entityId and prompt are checked by their root name."""
+        node = {
+            "type": "wait_for_event",
+            "entityId": "{% $order.id %}",
+            "onTimeout": {
+                "type": "user_input",
+                "prompt": "{% 'Order ' & $order.id & ' for ' & $customer.name %}",
+                "inputType": "text",
+                "outputVariable": "answer"
+            }
+        }
+
+        loader = WorkflowLoader()
+        validation_result = {
+            "node_count": 0,
+            "node_types": set(),
+            "errors": []
+        }
+
+        loader._validate_node_content(node, validation_result, "root", {"order"})
+
+        assert validation_result["node_count"] == 2
+        assert validation_result["errors"] == [
+            "Variable 'customer' in '{% 'Order ' & $order.id & ' for ' & $customer.name %}' at "
+            "'root.wait_for_event.onTimeout.user_input.prompt' is not defined before use in its execution context"
+        ]
+
 
 class TestValidateCondition:
     """Test _validate_condition method."""
@@ -740,6 +848,19 @@ class TestValidateParameters:
         assert "should NOT contain brackets or parentheses" in error_messages
         assert "Invalid list parameter type" in error_messages
 
+    def test_validate_parameters_reuses_parameter_names(self):
+        """Test that a tool's parameter names are collected once and reused across nodes."""
+        tools_definition = {"test_tool": [{"name": "valid_param"}]}
+        loader = WorkflowLoader(tools_definition=tools_definition)
+        validation_result = {"errors": []}
+
+        loader._validate_parameters({"toolName": "test_tool", "parameters": {"valid_param": 1}}, validation_result, "root", set())
+        tools_definition["test_tool"] = None  # Would fail if the names were collected again
+        loader._validate_parameters({"toolName": "test_tool", "parameters": {"other": 1}}, validation_result, "root", set())
+
+        assert loader._tool_param_names == {"test_tool": frozenset({"valid_param"})}
+        assert validation_result["errors"] == ["Invalid parameter name 'other' for 'test_tool' at 'root'"]
+
 
 class TestValidateContainer:
     """Test _validate_container method."""
@@ -755,7 +876,7 @@ class TestValidateContainer:
         validation_result = {"errors": []}
         
         defined_vars = set()  # Add defined_vars parameter
-        loader._validate_container(node, validation_result, "root.steps", defined_vars)
+        loader._validate_container(node["type"], node["steps"], "steps", validation_result, "root.steps", defined_vars)
         
         assert len(validation_result["errors"]) == 1
         assert "Remove empty 'sequence' container" in validation_result["errors"][0]
@@ -785,7 +906,7 @@ class TestValidateContainer:
         }
         
         defined_vars = set()  # Add defined_vars parameter
-        loader._validate_container(node, validation_result, "root.steps", defined_vars)
+        loader._validate_container(node["type"], node["steps"], "steps", validation_result, "root.steps", defined_vars)
         
         assert len(validation_result["errors"]) == 1
         assert "Remove wrapper sequence container with only one tool_call node" in validation_result["errors"][0]
@@ -801,12 +922,121 @@ class TestValidateContainer:
         validation_result = {"errors": []}
         
         defined_vars = set()  # Add defined_vars parameter
-        loader._validate_container(node, validation_result, "root.steps", defined_vars)
+        loader._validate_container(node["type"], node.get("steps", []), "steps", validation_result, "root.steps", defined_vars)
         
         assert len(validation_result["errors"]) == 1
         assert "Remove empty 'sequence' container" in validation_result["errors"][0]
 
 
+class TestDeepWorkflowTraversal:
+    """Test that normalization and validation walk deep workflows without recursion."""
+
+    def _deep_loop_workflow(self, depth):
+        node = {"type": "user_input", "prompt": "{% 'Count ' & $count %}", "inputType": "text", "outputVariable": "answer"}
+        for _ in range(depth):
+            node = {
+                "type": "loop",
+                "condition": {"type": "comparison", "left": "{% $count %}", "operator": "<", "right": 3},
+                "body": node,
+            }
+        return {"name": "Deep", "description": "Deeply nested loops", "root": node}
+
+    def test_normalize_deep_workflow(self):
+        """Test that nested nodes deeper than the recursion limit are copied and normalized."""
+        depth = sys.getrecursionlimit() + 100
+        node = {"type": "tool_call", "toolName": "leaf", "parameters": '{"value": 1}'}
+        for _ in range(depth):
+            node = {"type": "tool_call", "toolName": "retry", "errorHandler": node}
+        workflow = {"name": "Deep", "description": "Deep error handlers", "root": node}
+
+        loader = WorkflowLoader(use_colors=False)
+        normalized = loader._normalize_workflow_structure(dict(workflow))["root"]
+
+        original = workflow["root"]
+        for _ in range(depth):
+            assert normalized is not original
+            normalized, original = normalized["errorHandler"], original["errorHandler"]
+        assert normalized["parameters"] == {"value": 1}
+        assert original["parameters"] == '{"value": 1}'
+
+    def test_normalize_interns_node_types(self):
+        """Test that node types parsed from separate documents share one string object."""
+        first = json.loads('{"type": "tool_call"}')
+        second = json.loads('{"type": "tool_call"}')
+        assert first["type"] is not second["type"]
+
+        loader = WorkflowLoader(use_colors=False)
+
+        assert loader._normalize_node_structure(first)["type"] is loader._normalize_node_structure(second)["type"]
+
+    def test_validate_deep_workflow(self):
+        """Test that validation errors are collected from nodes deeper than the recursion limit."""
+        depth = sys.getrecursionlimit() + 100
+
+        loader = WorkflowLoader(use_colors=False)
+        result = loader.validate_workflow(self._deep_loop_workflow(depth))
+
+        assert result["node_count"] == depth + 1
+        assert result["node_types"] == {"loop", "user_input"}
+        assert len(result["errors"]) == depth + 1
+        assert all("'count'" in error or "$count" in error for error in result["errors"])
+        assert result["errors"][-1].endswith("at 'root" + ".loop.body" * depth + ".user_input.prompt' is not defined before use in its execution context")
+
+    def test_references_checked_after_children(self):
+        """Test that entityId is checked after errorHandler and onTimeout after that."""
+        node = {
+            "type": "wait_for_event",
+            "entityId": "{% $order %}",
+            "errorHandler": {"type": "user_input", "prompt": "Order id?", "outputVariable": "order"},
+            "onTimeout": {"type": "user_input", "prompt": "{% 'Late ' & $missing %}", "outputVariable": "late"},
+        }
+        validation_result = {"node_count": 0, "node_types": set(), "errors": []}
+
+        loader = WorkflowLoader(use_colors=False)
+        loader._validate_node_content(node, validation_result, "root", set())
+
+        assert validation_result["node_count"] == 3
+        assert validation_result["errors"] == [
+            "Variable 'missing' in '{% 'Late ' & $missing %}' at 'root.wait_for_event.onTimeout.user_input.prompt' "
+            "is not defined before use in its execution context"
+        ]
+
+    def test_forked_scopes_are_isolated(self):
+        """Test that parallel branches and ifTrue see earlier variables but not each other's."""
+        def ask(prompt, output):
+            return {"type": "user_input", "prompt": prompt, "inputType": "text", "outputVariable": output}
+
+        workflow = {
+            "name": "Scopes",
+            "description": "Variables across forked scopes",
+            "root": {
+                "type": "sequence",
+                "steps": [
+                    ask("Name?", "name"),
+                    {
+                        "type": "parallel",
+                        "branches": [
+                            ask("{% 'Hi ' & $name %}", "first"),
+                            ask("{% 'Hi ' & $first %}", "second"),
+                        ],
+                    },
+                    {
+                        "type": "branch",
+                        "condition": {"type": "comparison", "left": "{% $name %}", "operator": "==", "right": "x"},
+                        "ifTrue": ask("{% 'Again ' & $name %}", "third"),
+                    },
+                    ask("{% $third & $second & $name %}", "last"),
+                ],
+            },
+        }
+
+        loader = WorkflowLoader(use_colors=False)
+        result = loader.validate_workflow(workflow)
+
+        undefined = [error.split("'")[1] for error in result["errors"]]
+        assert undefined == ["first", "third", "second"]
+
+
 class TestValidationIntegration:
     """Test integration of validation methods working together."""
 
@@ -42,6 +42,49 @@ class TestExtractFinalMetadata:
 
         assert result == {"name": "Spaced Workflow", "description": "Workflow with spaces"}
 
+    def test_extract_final_metadata_escaped_quotes(self):
+        """Test that escaped quotes inside values are preserved by the JSON fast path."""
+        processor = WorkflowProcessor()
+
+        text_response = 'Done.\n{"name": "The \\"Main\\" Workflow", "description": "Uses \\"quotes\\""}'
+
+        result = processor.extract_final_metadata(text_response)
+
+        assert result == {"name": 'The "Main" Workflow', "description": 'Uses "quotes"'}
+
+    def test_extract_final_metadata_braces_before_json(self):
+        """Test that braces in the reasoning text before the metadata object are skipped."""
+        processor = WorkflowProcessor()
+
+        text_response = (
+            'I used {% $order.id %} in section {2}.\n'
+            '{"name": "Order Flow", "description": "Handles {nested} orders"}'
+        )
+
+        result = processor.extract_final_metadata(text_response)
+
+        assert result == {"name": "Order Flow", "description": "Handles {nested} orders"}
+
+    def test_extract_final_metadata_unbalanced_brace_in_value(self):
+        """Test the outer span fallback when a string value contains an unbalanced brace."""
+        processor = WorkflowProcessor()
+
+        text_response = '{"name": "Brace", "description": "Ends with {"}'
+
+        result = processor.extract_final_metadata(text_response)
+
+        assert result == {"name": "Brace", "description": "Ends with {"}
+
+    def test_extract_final_metadata_regex_fallback(self):
+        """Test that the regex fallback still handles responses that are not valid JSON."""
+        processor = WorkflowProcessor()
+
+        text_response = '{"name": "Trailing Comma", "description": "Not strict JSON",}'
+
+        result = processor.extract_final_metadata(text_response)
+
+        assert result == {"name": "Trailing Comma", "description": "Not strict JSON"}
+
     def test_extract_final_metadata_partial_match(self):
         """Test extracting metadata when only one field is present."""
         processor = WorkflowProcessor()
@@ -187,6 +230,23 @@ class TestCombineWorkflowSections:
         # Should still process the valid section
         assert result["root"]["name"] == "valid_tool"
 
+    def test_combine_workflow_sections_missing_root_default_section_number(self):
+        """Test that the warning falls back to the 1-based position when section_number is absent."""
+        processor = WorkflowProcessor()
+
+        workflow_sections = [
+            {"workflow_plan": {"root": {"type": "tool_call", "name": "first"}}},
+            {"workflow_plan": {"root": {"type": "tool_call", "name": "second"}}},
+            {"workflow_plan": {"name": "No root"}},
+        ]
+
+        with patch("builtins.print") as mock_print:
+            result = processor.combine_workflow_sections(workflow_sections)
+
+        printed_args = [call.args[0] for call in mock_print.call_args_list]
+        assert any("Section 3 missing 'root' element" in msg for msg in printed_args)
+        assert [step["name"] for step in result["root"]["steps"]] == ["first", "second"]
+
     def test_combine_workflow_sections_default_metadata(self):
         """Test combining sections with missing name/description."""
         processor = WorkflowProcessor()
@@ -218,7 +278,12 @@ class TestCombineWorkflowSections:
                     "description": "Test description",
                     "root": {"type": "tool_call", "name": "test_tool", "description": "Test tool"},
                 }
-            }
+            },
+            {
+                "workflow_plan": {
+                    "root": {"type": "tool_call", "name": "other_tool", "description": "Other tool"},
+                }
+            },
         ]
 
         processor.combine_workflow_sections(workflow_sections)
@@ -237,9 +302,23 @@ class TestCombineWorkflowSections:
         success_messages = [msg for msg in printed_args if "✓ Successfully combined" in msg]
         assert len(success_messages) == 1
 
+    @patch("builtins.print")
+    def test_combine_workflow_sections_single_section_fast_path(self, mock_print):
+        """Test that a single complete section is returned without combining or printing."""
+        processor = WorkflowProcessor()
+        root = {"type": "tool_call", "name": "only_tool"}
+
+        result = processor.combine_workflow_sections(
+            [{"workflow_plan": {"name": "Only", "description": "Single", "root": root, "section_update": 1}}]
+        )
+
+        assert result == {"name": "Only", "description": "Single", "root": root}
+        assert result["root"] is root
+        mock_print.assert_not_called()
+
 
 class TestFlattenWorkflowSection:
-    """Test flatten_workflow_section method and helper methods."""
+    """Test flatten_workflow_section method."""
 
     def test_flatten_workflow_section_non_dict_input(self):
         """Test flattening with non-dictionary input."""
@@ -372,3 +451,47 @@ class TestFlattenWorkflowSection:
         # Second branch should remain as single step
         second_branch = result[0]["branches"][1]
         assert second_branch["name"] == "branch2_single"
+
+    def test_flatten_workflow_section_preserves_order_around_parallel(self):
+        """Test that steps before, inside and after a nested parallel keep their order."""
+        processor = WorkflowProcessor()
+
+        workflow_node = {
+            "type": "sequence",
+            "steps": [
+                {"type": "tool_call", "name": "first"},
+                {
+                    "type": "parallel",
+                    "branches": [
+                        {
+                            "type": "parallel",
+                            "branches": [{"type": "tool_call", "name": "inner"}],
+                        },
+                        {"type": "sequence", "steps": []},
+                    ],
+                },
+                {"type": "sequence", "steps": [{"type": "tool_call", "name": "last"}]},
+            ],
+        }
+
+        result = processor.flatten_workflow_section(workflow_node, 1)
+
+        assert [step.get("name") for step in result] == ["first", None, "last"]
+        outer_parallel = result[1]
+        assert outer_parallel["description"] == "Parallel execution from section 1"
+        assert len(outer_parallel["branches"]) == 1
+        assert outer_parallel["branches"][0]["type"] == "parallel"
+        assert outer_parallel["branches"][0]["branches"] == [{"type": "tool_call", "name": "inner"}]
+
+    def test_flatten_workflow_section_deeply_nested(self):
+        """Test that nesting deeper than the recursion limit does not raise RecursionError."""
+        processor = WorkflowProcessor()
+
+        leaf = {"type": "tool_call", "name": "leaf"}
+        workflow_node = leaf
+        for _ in range(5000):
+            workflow_node = {"type": "sequence", "steps": [workflow_node]}
+
+        result = processor.flatten_workflow_section(workflow_node, 1)
+
+        assert result == [leaf]
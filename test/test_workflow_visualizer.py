@@ -660,3 +660,43 @@ class TestWorkflowVisualizerEdgeCases:
         })
         assert "$test" in result
         assert "static param" in result
+
+    def test_format_parameters_jsonata_blocks(self):
+        """Test that only values wrapped in one {% ... %} block count as variable parameters."""
+        visualizer = WorkflowVisualizer(use_colors=False)
+
+        result = visualizer._format_parameters({
+            "multi_line": "{% $a +\n $b %}",
+            "padded": "  {% $c %}  ",
+            "too_short": "{%}",
+            "inline": "Hello {% $d %}"
+        })
+
+        assert "multi_line={% $a +\n $b %}" in result
+        assert "padded=  {% $c %}  " in result
+        assert "$d" not in result
+        assert "2 static param" in result
+
+    def test_strip_ansi_codes(self):
+        """Test that ANSI codes are removed and plain text is returned unchanged."""
+        visualizer = WorkflowVisualizer()
+        plain = "No colors here"
+
+        assert visualizer._strip_ansi_codes("\033[32mgreen\033[0m text") == "green text"
+        assert visualizer._strip_ansi_codes(plain) is plain
+
+    def test_colorize_respects_use_colors(self):
+        """Test that text is wrapped in color codes only when colors are enabled."""
+        colored = WorkflowVisualizer(use_colors=True)
+        plain = WorkflowVisualizer(use_colors=False)
+
+        assert colored._colorize("text", "\033[94m") == "\033[94mtext\033[0m"
+        assert plain._colorize("text", "\033[94m") == "text"
+
+    def test_highlight_variables_only_touches_references(self):
+        """Test that only $variable references are highlighted."""
+        visualizer = WorkflowVisualizer(use_colors=True)
+        plain = "No references here"
+
+        assert visualizer._highlight_variables(plain) is plain
+        assert visualizer._highlight_variables("Use $user.id") == "Use \033[33m$user.id\033[0m"